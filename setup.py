@@ -24,6 +24,7 @@ setup(
         'selenium',
         'webdriver-manager',
         'python-dateutil',
+        'numpy',
         'pyautogui',
         'opencv-python',
         'pandas',
@@ -3,6 +3,7 @@ import os
 import pandas as pd
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
+from aulas_jsonl import existe_historico, carregar_aulas
 
 def carregar_dados(data_path):
     """Carrega todos os arquivos JSON necessários para a análise."""
@@ -13,6 +14,10 @@ def carregar_dados(data_path):
     dados = {}
     try:
         for arquivo in arquivos:
+            if arquivo == 'aulas_coletadas.json' and existe_historico(data_path):
+                # O histórico pode estar em .jsonl (mais recente) ou no .json legado
+                dados[arquivo] = carregar_aulas(data_path)
+                continue
             with open(os.path.join(data_path, arquivo), 'r', encoding='utf-8-sig') as f:
                 # Caso especial para horarios_semanais_oficial que é uma lista
                 if arquivo == 'horarios_semanais_oficial.json':
@@ -0,0 +1,169 @@
+"""
+Histórico de aulas em JSON Lines (`data/aulas_coletadas.jsonl`).
+
+O Scraper acrescenta cada página de aulas ao arquivo assim que ela é extraída, em vez de
+montar a lista inteira e gravar um único JSON no final. Uma aula gravada mais de uma vez
+(ex: mudança de status) vale pela última ocorrência, identificada por
+(turma, componente, data da aula, horário).
+
+Leitura:
+- `iterar_aulas(data_path)`: gerador que percorre o histórico sem carregar o arquivo
+  inteiro na memória (apenas as chaves das aulas são mantidas para a deduplicação).
+- `carregar_aulas(data_path)`: a mesma coisa como lista, para quem precisa de várias passadas.
+Ambas usam o `aulas_coletadas.json` legado se o `.jsonl` ainda não existir.
+
+`compactar(data_path)` remove as ocorrências repetidas do `.jsonl` e regrava o
+`aulas_coletadas.json` legado, mantido para compatibilidade (notebooks, CSV, etc.).
+"""
+import json
+import os
+import threading
+
+ARQUIVO_AULAS_JSON = 'aulas_coletadas.json'
+ARQUIVO_AULAS_JSONL = 'aulas_coletadas.jsonl'
+SUFIXO_NOVA_GERACAO = '.nova' # Coleta completa em andamento: substitui o histórico ao final
+
+
+def chave_aula(aula):
+    """Identifica uma aula de forma única: (turma, componente, data da aula, horário)."""
+    return (aula.get('turma'), aula.get('componenteCurricular'), aula.get('dataAula'), aula.get('horario'))
+
+
+def caminho_jsonl(data_path):
+    return os.path.join(data_path, ARQUIVO_AULAS_JSONL)
+
+
+def caminho_json(data_path):
+    return os.path.join(data_path, ARQUIVO_AULAS_JSON)
+
+
+def existe_historico(data_path):
+    """True se houver histórico de aulas em qualquer um dos formatos."""
+    return os.path.exists(caminho_jsonl(data_path)) or os.path.exists(caminho_json(data_path))
+
+
+def _linhas_jsonl(caminho):
+    """Percorre as aulas válidas de um arquivo .jsonl, ignorando uma última linha incompleta."""
+    with open(caminho, 'r', encoding='utf-8') as f:
+        for linha in f:
+            linha = linha.strip()
+            if not linha:
+                continue
+            try:
+                yield json.loads(linha)
+            except json.JSONDecodeError:
+                continue
+
+
+def _iterar_jsonl(caminho):
+    # 1ª passada: posição da última ocorrência de cada aula. 2ª passada: só as últimas ocorrências.
+    ultima_posicao = {}
+    for posicao, aula in enumerate(_linhas_jsonl(caminho)):
+        ultima_posicao[chave_aula(aula)] = posicao
+    for posicao, aula in enumerate(_linhas_jsonl(caminho)):
+        if ultima_posicao.get(chave_aula(aula)) == posicao:
+            yield aula
+
+
+def iterar_aulas(data_path):
+    """Percorre o histórico de aulas (uma ocorrência por aula) sem carregá-lo por inteiro."""
+    if os.path.exists(caminho_jsonl(data_path)):
+        yield from _iterar_jsonl(caminho_jsonl(data_path))
+    elif os.path.exists(caminho_json(data_path)):
+        with open(caminho_json(data_path), 'r', encoding='utf-8-sig') as f:
+            yield from json.load(f)
+
+
+def carregar_aulas(data_path):
+    """Retorna o histórico de aulas como lista."""
+    return list(iterar_aulas(data_path))
+
+
+class GravadorAulas:
+    """
+    Acrescenta aulas ao histórico .jsonl à medida que são extraídas.
+
+    Com 'nova_geracao', as aulas vão para um arquivo separado que só substitui o
+    histórico em `concluir()` (coleta completa). Sem ela, são acrescentadas ao histórico
+    existente (coleta incremental e atualizações de status).
+    """
+
+    def __init__(self, data_path, nova_geracao=False, retomar=False):
+        self.data_path = data_path
+        self.destino = caminho_jsonl(data_path)
+        self.caminho = self.destino + SUFIXO_NOVA_GERACAO if nova_geracao else self.destino
+        self.trava = threading.Lock()
+        self.total = 0
+        os.makedirs(data_path, exist_ok=True)
+
+        if not nova_geracao:
+            migrar_json_legado(data_path)
+        elif not retomar and os.path.exists(self.caminho):
+            os.remove(self.caminho) # Sobras de uma coleta completa interrompida
+        self.arquivo = open(self.caminho, 'a', encoding='utf-8')
+
+    def acrescentar(self, aulas):
+        """Grava as aulas no final do arquivo (uma linha por aula)."""
+        if not aulas:
+            return
+        texto = ''.join(json.dumps(aula, ensure_ascii=False) + '\n' for aula in aulas)
+        with self.trava:
+            self.arquivo.write(texto)
+            self.arquivo.flush()
+            self.total += len(aulas)
+
+    def concluir(self):
+        """Fecha o arquivo e, se for uma nova geração, a promove a histórico oficial."""
+        with self.trava:
+            if self.arquivo.closed:
+                return
+            os.fsync(self.arquivo.fileno())
+            self.arquivo.close()
+            if self.caminho != self.destino:
+                os.replace(self.caminho, self.destino)
+
+    def fechar(self):
+        """Fecha o arquivo sem promover a nova geração (ex: a coleta falhou)."""
+        with self.trava:
+            if not self.arquivo.closed:
+                self.arquivo.close()
+
+
+def migrar_json_legado(data_path):
+    """Cria o .jsonl a partir do aulas_coletadas.json legado, se apenas este existir."""
+    if os.path.exists(caminho_jsonl(data_path)) or not os.path.exists(caminho_json(data_path)):
+        return
+    with open(caminho_json(data_path), 'r', encoding='utf-8-sig') as f:
+        aulas = json.load(f)
+    caminho_temp = caminho_jsonl(data_path) + '.tmp'
+    with open(caminho_temp, 'w', encoding='utf-8') as f:
+        for aula in aulas:
+            f.write(json.dumps(aula, ensure_ascii=False) + '\n')
+    os.replace(caminho_temp, caminho_jsonl(data_path))
+    print(f"[Histórico] '{ARQUIVO_AULAS_JSON}' convertido para '{ARQUIVO_AULAS_JSONL}' ({len(aulas)} aulas).")
+
+
+def compactar(data_path):
+    """
+    Reescreve o .jsonl sem ocorrências repetidas e gera o aulas_coletadas.json legado.
+    As duas gravações são feitas aula a aula, em arquivos temporários substituídos no final.
+    Retorna o total de aulas.
+    """
+    migrar_json_legado(data_path)
+    if not os.path.exists(caminho_jsonl(data_path)):
+        return 0
+
+    temp_jsonl = caminho_jsonl(data_path) + '.tmp'
+    temp_json = caminho_json(data_path) + '.tmp'
+    total = 0
+    with open(temp_jsonl, 'w', encoding='utf-8') as saida_jsonl, open(temp_json, 'w', encoding='utf-8') as saida_json:
+        saida_json.write('[')
+        for aula in _iterar_jsonl(caminho_jsonl(data_path)):
+            saida_jsonl.write(json.dumps(aula, ensure_ascii=False) + '\n')
+            item = json.dumps(aula, ensure_ascii=False, indent=4).replace('\n', '\n    ')
+            saida_json.write((',\n    ' if total else '\n    ') + item)
+            total += 1
+        saida_json.write('\n]\n' if total else ']\n')
+    os.replace(temp_jsonl, caminho_jsonl(data_path))
+    os.replace(temp_json, caminho_json(data_path))
+    return total
@@ -0,0 +1,257 @@
+"""
+Banco SQLite (`data/aulas.db`) com o histórico de aulas indexado para consultas.
+
+O histórico oficial continua sendo o `aulas_coletadas.jsonl` (ver `aulas_jsonl.py`); o banco
+é uma cópia indexada por turma, componente, data e status, reconstruída automaticamente
+quando o histórico muda. Assim as ferramentas fazem uma consulta por disciplina em vez de
+percorrer a lista inteira de aulas a cada passo do planejamento.
+
+Cada aula é uma linha identificada por (turma, componente, data da aula, horário): gravar
+de novo a mesma aula atualiza a linha existente (upsert). O registro original é guardado na
+coluna `dados`, o que permite exportar de volta para o formato do `aulas_coletadas.json`.
+
+Uso pela linha de comando:
+    python banco_aulas.py                       # Sincroniza o banco com o histórico
+    python banco_aulas.py --importar aulas.json # Acrescenta/atualiza aulas de um JSON
+    python banco_aulas.py --exportar aulas.json # Exporta o banco no formato do aulas_coletadas.json
+"""
+import json
+import os
+import sqlite3
+import sys
+from datetime import datetime
+from aulas_jsonl import caminho_json, caminho_jsonl, iterar_aulas, GravadorAulas, compactar
+
+ARQUIVO_BANCO = 'aulas.db'
+STATUS_CONFIRMADA = 'Aula confirmada'
+STATUS_PENDENTE = 'Aguardando confirmação'
+STATUS_CONTABILIZADOS = (STATUS_CONFIRMADA, STATUS_PENDENTE) # Contam como hora/aula dada
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS aulas (
+    turma TEXT NOT NULL,
+    componente TEXT NOT NULL,
+    data_aula TEXT NOT NULL,
+    horario TEXT NOT NULL,
+    data_iso TEXT,
+    status TEXT,
+    dados TEXT NOT NULL,
+    PRIMARY KEY (turma, componente, data_aula, horario)
+);
+CREATE INDEX IF NOT EXISTS idx_aulas_turma ON aulas (turma);
+CREATE INDEX IF NOT EXISTS idx_aulas_componente ON aulas (componente, turma);
+CREATE INDEX IF NOT EXISTS idx_aulas_data ON aulas (data_iso);
+CREATE INDEX IF NOT EXISTS idx_aulas_status ON aulas (status);
+CREATE TABLE IF NOT EXISTS meta (
+    chave TEXT PRIMARY KEY,
+    valor TEXT
+);
+"""
+
+SQL_UPSERT = """
+INSERT INTO aulas (turma, componente, data_aula, horario, data_iso, status, dados)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (turma, componente, data_aula, horario)
+DO UPDATE SET data_iso = excluded.data_iso, status = excluded.status, dados = excluded.dados
+"""
+
+
+def caminho_banco(data_path):
+    return os.path.join(data_path, ARQUIVO_BANCO)
+
+
+def _data_iso(data_aula):
+    """'dd/mm/aaaa' -> 'aaaa-mm-dd' (ordenável como texto). None se a data for inválida."""
+    try:
+        return datetime.strptime(data_aula, "%d/%m/%Y").strftime("%Y-%m-%d")
+    except (ValueError, TypeError):
+        return None
+
+
+def _linha(aula):
+    return (
+        aula.get('turma') or '',
+        aula.get('componenteCurricular') or '',
+        aula.get('dataAula') or '',
+        aula.get('horario') or '',
+        _data_iso(aula.get('dataAula')),
+        aula.get('status'),
+        json.dumps(aula, ensure_ascii=False),
+    )
+
+
+def assinatura_historico(data_path):
+    """Identifica a versão atual do histórico (tamanho e data de modificação dos arquivos)."""
+    partes = []
+    for caminho in (caminho_jsonl(data_path), caminho_json(data_path)):
+        if os.path.exists(caminho):
+            info = os.stat(caminho)
+            partes.append(f"{os.path.basename(caminho)}:{info.st_size}:{info.st_mtime_ns}")
+    return '|'.join(partes)
+
+
+class BancoAulas:
+    """Acesso ao banco de aulas. Use `BancoAulas.abrir(data_path)` para o banco sincronizado."""
+
+    def __init__(self, caminho=':memory:'):
+        self.caminho = caminho
+        self.conexao = sqlite3.connect(caminho)
+        self.conexao.executescript(ESQUEMA)
+
+    @classmethod
+    def abrir(cls, data_path):
+        """Abre `data/aulas.db`, reconstruindo-o se o histórico mudou desde a última sincronização."""
+        os.makedirs(data_path, exist_ok=True)
+        banco = cls(caminho_banco(data_path))
+        banco.sincronizar(data_path)
+        return banco
+
+    @classmethod
+    def de_lista(cls, aulas):
+        """Banco em memória com uma lista de aulas já carregada (ex: após atualizações online)."""
+        banco = cls()
+        banco.upsert(aulas)
+        return banco
+
+    def fechar(self):
+        self.conexao.close()
+
+    # --- Gravação ---
+
+    def upsert(self, aulas):
+        """Insere as aulas ou atualiza as já existentes com a mesma chave. Retorna o total gravado."""
+        with self.conexao:
+            cursor = self.conexao.executemany(SQL_UPSERT, (_linha(aula) for aula in aulas))
+        return cursor.rowcount
+
+    def sincronizar(self, data_path, forcar=False):
+        """Recarrega o banco a partir do histórico .jsonl/.json se ele tiver sido alterado."""
+        assinatura = assinatura_historico(data_path)
+        linha = self.conexao.execute("SELECT valor FROM meta WHERE chave = 'historico'").fetchone()
+        if not forcar and linha and linha[0] == assinatura:
+            return False
+        with self.conexao:
+            self.conexao.execute("DELETE FROM aulas")
+            self.conexao.executemany(SQL_UPSERT, (_linha(aula) for aula in iterar_aulas(data_path)))
+            self.conexao.execute(
+                "INSERT OR REPLACE INTO meta (chave, valor) VALUES ('historico', ?)", (assinatura,)
+            )
+        return True
+
+    def exportar_json(self, caminho):
+        """Grava todas as aulas no formato do aulas_coletadas.json. Retorna o total exportado."""
+        aulas = self.aulas()
+        caminho_temp = caminho + '.tmp'
+        with open(caminho_temp, 'w', encoding='utf-8') as f:
+            json.dump(aulas, f, indent=4, ensure_ascii=False)
+        os.replace(caminho_temp, caminho)
+        return len(aulas)
+
+    # --- Consultas ---
+
+    def aulas(self, turma=None, componente=None, status=None):
+        """Aulas filtradas (na ordem em que entraram no banco). 'status' pode ser um valor ou uma tupla."""
+        condicoes, parametros = [], []
+        if turma is not None:
+            condicoes.append("turma = ?")
+            parametros.append(turma)
+        if componente is not None:
+            condicoes.append("componente = ?")
+            parametros.append(componente)
+        if status is not None:
+            valores = (status,) if isinstance(status, str) else tuple(status)
+            condicoes.append(f"status IN ({', '.join('?' * len(valores))})")
+            parametros.extend(valores)
+        sql = "SELECT dados FROM aulas"
+        if condicoes:
+            sql += " WHERE " + " AND ".join(condicoes)
+        sql += " ORDER BY rowid"
+        return [json.loads(dados) for (dados,) in self.conexao.execute(sql, parametros)]
+
+    def total(self):
+        return self.conexao.execute("SELECT COUNT(*) FROM aulas").fetchone()[0]
+
+    def _contar(self, colunas, status):
+        marcadores = ', '.join('?' * len(status))
+        sql = (
+            f"SELECT {', '.join(colunas)}, COUNT(*) FROM aulas "
+            f"WHERE status IN ({marcadores}) GROUP BY {', '.join(colunas)}"
+        )
+        return self.conexao.execute(sql, status).fetchall()
+
+    def contagem_por_disciplina(self, status=STATUS_CONTABILIZADOS):
+        """{(turma, componente): total de aulas} considerando apenas os status informados."""
+        return {(turma, componente): total for turma, componente, total in self._contar(('turma', 'componente'), status)}
+
+    def contagem_por_componente(self, status=STATUS_CONTABILIZADOS):
+        """{componente: total de aulas} somando todas as turmas."""
+        return dict(self._contar(('componente',), status))
+
+    def contagem_por_turma(self, status=STATUS_CONTABILIZADOS):
+        """{turma: total de aulas}."""
+        return dict(self._contar(('turma',), status))
+
+    def contagem_por_data(self, status=STATUS_CONTABILIZADOS):
+        """[(date, total de aulas)] em ordem cronológica, ignorando datas inválidas."""
+        marcadores = ', '.join('?' * len(status))
+        sql = (
+            f"SELECT data_iso, COUNT(*) FROM aulas WHERE status IN ({marcadores}) AND data_iso IS NOT NULL "
+            "GROUP BY data_iso ORDER BY data_iso"
+        )
+        return [(datetime.strptime(data, "%Y-%m-%d").date(), total) for data, total in self.conexao.execute(sql, status)]
+
+    def datas_disciplina(self, turma, componente, status=STATUS_CONTABILIZADOS):
+        """(primeira data, última data) das aulas da disciplina na turma, ou (None, None)."""
+        marcadores = ', '.join('?' * len(status))
+        sql = (
+            "SELECT MIN(data_iso), MAX(data_iso) FROM aulas "
+            f"WHERE turma = ? AND componente = ? AND status IN ({marcadores}) AND data_iso IS NOT NULL"
+        )
+        primeira, ultima = self.conexao.execute(sql, (turma, componente, *status)).fetchone()
+        if primeira is None:
+            return None, None
+        return datetime.strptime(primeira, "%Y-%m-%d").date(), datetime.strptime(ultima, "%Y-%m-%d").date()
+
+    def slots(self, status=STATUS_CONFIRMADA):
+        """[(date, horário original, turma)] das aulas com o status informado."""
+        sql = "SELECT data_iso, horario, turma FROM aulas WHERE status = ? AND data_iso IS NOT NULL"
+        return [
+            (datetime.strptime(data, "%Y-%m-%d").date(), horario, turma)
+            for data, horario, turma in self.conexao.execute(sql, (status,))
+        ]
+
+
+def importar_json(data_path, caminho):
+    """
+    Acrescenta/atualiza no histórico as aulas de um arquivo no formato do aulas_coletadas.json.
+    A importação passa pelo histórico .jsonl para que o banco, ao ser reconstruído, não a perca.
+    """
+    with open(caminho, 'r', encoding='utf-8-sig') as f:
+        aulas = json.load(f)
+    gravador = GravadorAulas(data_path)
+    gravador.acrescentar(aulas)
+    gravador.concluir()
+    compactar(data_path)
+    return len(aulas)
+
+
+if __name__ == "__main__":
+    from navegador import argumento_cli
+
+    PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if getattr(sys, 'frozen', False):
+        PROJECT_ROOT = os.path.dirname(sys.executable)
+    DATA_PATH = os.path.join(PROJECT_ROOT, 'data')
+
+    arquivo_importar = argumento_cli('--importar')
+    if arquivo_importar:
+        print(f"[Banco] {importar_json(DATA_PATH, arquivo_importar)} aulas importadas de '{arquivo_importar}'.")
+
+    banco = BancoAulas.abrir(DATA_PATH)
+    try:
+        arquivo_exportar = argumento_cli('--exportar')
+        if arquivo_exportar:
+            print(f"[Banco] {banco.exportar_json(arquivo_exportar)} aulas exportadas para '{arquivo_exportar}'.")
+        print(f"[Banco] '{banco.caminho}' com {banco.total()} aulas.")
+    finally:
+        banco.fechar()
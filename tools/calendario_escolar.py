@@ -0,0 +1,79 @@
+"""
+Calendário letivo calculado uma única vez por execução, com arrays de dias úteis do NumPy.
+
+Os dias letivos (segunda a sexta, sem os feriados de `feriados.json`) entre o início e o fim
+do ano letivo de `calendario_letivo.json` ficam em um array `datetime64[D]`. A consulta
+"todos os slots do padrão semanal X no intervalo Y" vira um recorte do array por busca
+binária e uma máscara por dia da semana, em vez de percorrer o ano dia a dia para cada disciplina.
+"""
+from datetime import date, datetime, timedelta
+import numpy as np
+
+DIAS_SEMANA = ("segunda-feira", "terça-feira", "quarta-feira", "quinta-feira", "sexta-feira")
+_DIA_SEMANA_EPOCH = 3 # 01/01/1970 foi uma quinta-feira (segunda = 0)
+
+
+def _para_date(valor):
+    if isinstance(valor, date):
+        return valor
+    return datetime.strptime(valor, "%d/%m/%Y").date()
+
+
+class CalendarioEscolar:
+    """Dias letivos de um período, prontos para gerar os slots de cada padrão de horário semanal."""
+
+    def __init__(self, data_inicio, data_fim, feriados=()):
+        self.inicio = _para_date(data_inicio)
+        self.fim = _para_date(data_fim)
+        self.feriados = np.array(sorted({_para_date(f) for f in feriados}), dtype='datetime64[D]')
+        self.dias, self.dias_semana = self._dias_letivos(self.inicio, self.fim)
+
+    @classmethod
+    def de_dados(cls, calendario, feriados_data):
+        """Monta o calendário a partir do `calendario_letivo.json` e do `feriados.json` já carregados."""
+        feriados = [f['data'] for f in feriados_data.get('feriados', [])]
+        return cls(calendario['data_inicio'], calendario['data_fim'], feriados)
+
+    def _dias_letivos(self, inicio, fim):
+        todos = np.arange(np.datetime64(inicio, 'D'), np.datetime64(fim + timedelta(days=1), 'D'))
+        dias = todos[np.is_busday(todos, holidays=self.feriados)]
+        dias_semana = (dias.astype('int64') + _DIA_SEMANA_EPOCH) % 7
+        return dias, dias_semana
+
+    def _intervalo(self, inicio, fim):
+        """Dias letivos (e seus dias da semana) entre 'inicio' e 'fim', inclusive."""
+        inicio = self.inicio if inicio is None else _para_date(inicio)
+        fim = self.fim if fim is None else _para_date(fim)
+        if inicio < self.inicio or fim > self.fim:
+            # Fora do ano letivo pré-calculado (ex: restrição de planejamento mais larga): calcula à parte
+            return self._dias_letivos(inicio, fim)
+        a = np.searchsorted(self.dias, np.datetime64(inicio, 'D'), side='left')
+        b = np.searchsorted(self.dias, np.datetime64(fim, 'D'), side='right')
+        return self.dias[a:b], self.dias_semana[a:b]
+
+    def total_dias_letivos(self, inicio=None, fim=None):
+        return len(self._intervalo(inicio, fim)[0])
+
+    def slots(self, padrao, inicio=None, fim=None):
+        """
+        Todos os slots de um padrão semanal no intervalo, ordenados por data e horário.
+
+        'padrao' é uma sequência de (dia_semana_nome, horário), como os itens de
+        `horarios_semanais_oficial.json`. Dias fora de segunda a sexta são ignorados.
+        Retorna uma lista de (date, horário).
+        """
+        dias, dias_semana = self._intervalo(inicio, fim)
+        partes_datas, partes_horarios = [], []
+        for dia_semana_nome, horario in padrao:
+            if dia_semana_nome not in DIAS_SEMANA:
+                continue
+            selecionados = dias[dias_semana == DIAS_SEMANA.index(dia_semana_nome)]
+            partes_datas.append(selecionados)
+            partes_horarios.append(np.full(len(selecionados), horario, dtype=object))
+        if not partes_datas:
+            return []
+
+        datas = np.concatenate(partes_datas)
+        horarios = np.concatenate(partes_horarios)
+        ordem = np.lexsort((horarios.astype(str), datas))
+        return list(zip(datas[ordem].tolist(), horarios[ordem].tolist()))
@@ -0,0 +1,340 @@
+"""
+Backend de coleta pela rede: lê as respostas JSON da API do portal em vez da tabela do DOM.
+
+A tela "Registro de aulas" é uma SPA que busca as aulas por XHR. Com os logs de
+performance do Chrome habilitados, cada resposta JSON é identificada pelos eventos
+`Network.responseReceived`/`Network.loadingFinished` e o corpo é lido com
+`Network.getResponseBody`. A primeira requisição de listagem é então repetida dentro da
+página (mesma origem, cookies e cabeçalhos) com um tamanho de página grande, trazendo
+todas as aulas da disciplina de uma vez, sem clicar em "Próxima".
+
+Os registros são normalizados para o mesmo formato de `aulas_coletadas.json`. Se a
+resposta não for reconhecida, o chamador volta para a leitura da tabela (backend 'dom').
+"""
+import base64
+import json
+import re
+from datetime import datetime
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from navegador import argumento_cli
+
+BACKEND_DOM = 'dom'
+BACKEND_REDE = 'rede'
+BACKENDS_COLETA = (BACKEND_DOM, BACKEND_REDE)
+
+TAMANHO_PAGINA_REDE = 1000
+
+# Nomes de parâmetro de tamanho de página mais comuns em APIs REST (Spring, Laravel, etc.)
+PARAMETROS_TAMANHO = ('size', 'pageSize', 'page_size', 'per_page', 'perPage', 'limit', 'tamanho', 'itensPorPagina')
+
+# Chaves onde a lista de registros costuma vir em respostas paginadas, e onde vem o total
+CHAVES_TOTAL = ('totalElements', 'total', 'totalRegistros', 'totalItems', 'count')
+CHAVES_LISTA = ('content', 'data', 'items', 'itens', 'registros', 'results', 'resultado', 'aulas', 'rows')
+
+# Apelidos de campo da API -> chave do JSON de saída (comparados sem acento/caixa/separadores)
+APELIDOS_CAMPOS = {
+    'dataAula': ('dataaula', 'data', 'dataregistro', 'dataministrada'),
+    'horarioInicio': ('horarioinicial', 'horainicio', 'horarioinicio', 'inicio', 'horainicial'),
+    'horarioFim': ('horariofinal', 'horafim', 'horariofim', 'fim', 'horafinal', 'termino'),
+    'horario': ('horario', 'horarios'),
+    'turma': ('turma', 'nometurma', 'descricaoturma'),
+    'componenteCurricular': ('componentecurricular', 'componente', 'disciplina', 'nomedisciplina', 'nomecomponente'),
+    'data_cadastro': ('datacadastro', 'datacriacao', 'createdat', 'datahoracadastro', 'dtcadastro'),
+    'status': ('situacao', 'status', 'descricaosituacao'),
+}
+
+# Busca a URL com os cabeçalhos originais (exceto os que o navegador controla) e devolve o texto
+JS_REPETIR_REQUISICAO = """
+const [url, cabecalhos, concluir] = arguments;
+fetch(url, {credentials: 'include', headers: cabecalhos})
+    .then((r) => r.ok ? r.text().then((t) => concluir({status: r.status, corpo: t})) : concluir({status: r.status, corpo: null}))
+    .catch((e) => concluir({status: 0, corpo: null, erro: String(e)}));
+"""
+
+CABECALHOS_IGNORADOS = {'host', 'cookie', 'content-length', 'connection', 'accept-encoding', 'referer', 'origin', 'user-agent'}
+
+
+def resolver_backend(config, padrao=BACKEND_DOM):
+    """Escolhe o backend de coleta: linha de comando (--backend) > config.json (backend_coleta) > padrão."""
+    backend = str(argumento_cli('--backend') or (config or {}).get('backend_coleta') or padrao).strip().lower()
+    if backend not in BACKENDS_COLETA:
+        print(f"[Rede] AVISO: Backend de coleta '{backend}' desconhecido. Usando '{padrao}'.")
+        return padrao
+    return backend
+
+
+def _simplificar(nome):
+    """'Data de Cadastro' / 'data_cadastro' / 'dataCadastro' -> 'datacadastro'."""
+    return re.sub(r'[^a-z0-9]', '', str(nome).lower())
+
+
+def _valor_texto(valor):
+    """Reduz objetos aninhados (ex: {'id': 1, 'nome': 'X'}) ao texto exibido na tabela."""
+    if isinstance(valor, dict):
+        for chave in ('nome', 'descricao', 'name', 'label', 'valor'):
+            if valor.get(chave):
+                return str(valor[chave])
+        return ''
+    return '' if valor is None else str(valor).strip()
+
+
+def _formatar_data(texto, com_hora=False):
+    """Converte datas ISO (2025-03-10 / 2025-03-10T14:30:00) para o formato da tabela do portal."""
+    texto = (texto or '').strip()
+    if not re.match(r'^\d{4}-\d{2}-\d{2}', texto):
+        return texto
+    try:
+        data = datetime.fromisoformat(texto.replace('Z', '+00:00')[:19])
+    except ValueError:
+        return texto
+    return data.strftime('%d/%m/%Y %H:%M:%S' if com_hora else '%d/%m/%Y')
+
+
+def _formatar_hora(texto):
+    """'07:30:00' -> '07:30'."""
+    texto = _valor_texto(texto)
+    return texto[:5] if re.match(r'^\d{2}:\d{2}', texto) else texto
+
+
+def extrair_lista(payload):
+    """Encontra a lista de registros em uma resposta JSON (lista direta ou dentro de 'content', 'data', ...)."""
+    if isinstance(payload, list):
+        return payload if all(isinstance(item, dict) for item in payload) else None
+    if isinstance(payload, dict):
+        for chave in CHAVES_LISTA:
+            if chave in payload:
+                lista = extrair_lista(payload[chave])
+                if lista is not None:
+                    return lista
+    return None
+
+
+def normalizar_aula(registro):
+    """
+    Converte um registro da API no formato de `aulas_coletadas.json`.
+    Retorna None se o registro não tiver os campos mínimos (data e turma/componente).
+    """
+    campos = {}
+    simplificados = {_simplificar(chave): valor for chave, valor in registro.items()}
+    for destino, apelidos in APELIDOS_CAMPOS.items():
+        for apelido in apelidos:
+            if apelido in simplificados and simplificados[apelido] not in (None, ''):
+                campos[destino] = simplificados[apelido]
+                break
+
+    if 'dataAula' not in campos or not ('turma' in campos or 'componenteCurricular' in campos):
+        return None
+
+    if 'horario' in campos:
+        horario = _valor_texto(campos['horario'])
+    else:
+        inicio, fim = _formatar_hora(campos.get('horarioInicio')), _formatar_hora(campos.get('horarioFim'))
+        horario = f"{inicio} às {fim}" if inicio and fim else inicio
+
+    return {
+        'dataAula': _formatar_data(_valor_texto(campos['dataAula'])),
+        'horario': horario,
+        'turma': _valor_texto(campos.get('turma')),
+        'componenteCurricular': _valor_texto(campos.get('componenteCurricular')),
+        'data_cadastro': _formatar_data(_valor_texto(campos.get('data_cadastro')), com_hora=True),
+        'status': _valor_texto(campos.get('status')),
+    }
+
+
+def total_informado(payload):
+    """Total de registros declarado por uma resposta paginada (ou None se não houver)."""
+    if isinstance(payload, dict):
+        for chave in CHAVES_TOTAL:
+            if isinstance(payload.get(chave), int):
+                return payload[chave]
+        for chave in CHAVES_LISTA:
+            if isinstance(payload.get(chave), dict):
+                total = total_informado(payload[chave])
+                if total is not None:
+                    return total
+    return None
+
+
+def normalizar_aulas(payload):
+    """Normaliza uma resposta inteira. Retorna None se ela não parecer uma listagem de aulas."""
+    lista = extrair_lista(payload)
+    if lista is None:
+        return None
+    aulas = [normalizar_aula(registro) for registro in lista]
+    if lista and not any(aulas):
+        return None
+    return [aula for aula in aulas if aula]
+
+
+def tamanho_pedido(url):
+    """Tamanho de página pedido pela URL de listagem (ou None se ela não tiver parâmetro de tamanho)."""
+    for nome, valor in parse_qsl(urlsplit(url).query, keep_blank_values=True):
+        if nome in PARAMETROS_TAMANHO and valor.isdigit():
+            return int(valor)
+    return None
+
+
+def _comparavel(texto):
+    """'  Matemática   I ' -> 'matemática i', para comparar nomes de turma/disciplina."""
+    return ' '.join(str(texto or '').split()).lower()
+
+
+def aulas_de_outra_disciplina(aulas, turma=None, disciplina=None):
+    """
+    Aulas cuja turma ou componente (quando a API os informa) difere da disciplina aberta.
+    Uma resposta de outra tela ou disciplina não pode ser gravada como se fosse desta.
+    """
+    esperados = {'turma': _comparavel(turma), 'componenteCurricular': _comparavel(disciplina)}
+    return [
+        aula for aula in aulas
+        if any(esperado and aula.get(campo) and _comparavel(aula[campo]) != esperado for campo, esperado in esperados.items())
+    ]
+
+
+def url_com_pagina_grande(url, tamanho=TAMANHO_PAGINA_REDE):
+    """
+    Reescreve a URL de listagem pedindo 'tamanho' registros. A URL capturada é a da primeira
+    página (a tela acabou de abrir), então o número da página é mantido.
+    Retorna None se a URL não tiver parâmetro de tamanho conhecido.
+    """
+    partes = urlsplit(url)
+    parametros = parse_qsl(partes.query, keep_blank_values=True)
+    if not any(nome in PARAMETROS_TAMANHO for nome, _ in parametros):
+        return None
+
+    novos = []
+    for nome, valor in parametros:
+        if nome in PARAMETROS_TAMANHO:
+            valor = str(tamanho)
+        elif nome == 'offset':
+            valor = '0'
+        novos.append((nome, valor))
+    return urlunsplit(partes._replace(query=urlencode(novos)))
+
+
+class CapturaRede:
+    """Lê, pelos logs de performance do Chrome, as respostas JSON recebidas pela página."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.requisicoes = {} # requestId -> {'url', 'headers'}
+        self.respostas = {} # requestId -> {'url', 'concluida'}
+        self.verificadas = set() # respostas já lidas que não são listagens de aulas
+        self.disponivel = True
+
+    def iniciar(self):
+        """Habilita o domínio Network e descarta os eventos anteriores."""
+        try:
+            self.driver.execute_cdp_cmd('Network.enable', {})
+            self.descartar()
+        except Exception as e:
+            print(f"[Rede] AVISO: Captura de rede indisponível ({e}). Usando a tabela do DOM.")
+            self.disponivel = False
+        return self.disponivel
+
+    def descartar(self):
+        """Esquece tudo o que foi capturado até agora (chamar antes de abrir uma nova disciplina)."""
+        self._ler_eventos()
+        self.requisicoes.clear()
+        self.respostas.clear()
+        self.verificadas.clear()
+
+    def _ler_eventos(self):
+        """Consome os logs de performance e registra requisições e respostas JSON."""
+        try:
+            entradas = self.driver.get_log('performance')
+        except Exception:
+            self.disponivel = False
+            return
+
+        for entrada in entradas:
+            try:
+                mensagem = json.loads(entrada['message'])['message']
+            except (KeyError, TypeError, ValueError):
+                continue
+            metodo, params = mensagem.get('method'), mensagem.get('params', {})
+            if metodo == 'Network.requestWillBeSent':
+                requisicao = params.get('request', {})
+                self.requisicoes[params.get('requestId')] = {
+                    'url': requisicao.get('url'), 'headers': requisicao.get('headers', {})
+                }
+            elif metodo == 'Network.responseReceived':
+                resposta = params.get('response', {})
+                if 'json' in (resposta.get('mimeType') or '') and resposta.get('status') == 200:
+                    self.respostas[params.get('requestId')] = {
+                        'url': resposta.get('url'), 'concluida': False
+                    }
+            elif metodo == 'Network.loadingFinished' and params.get('requestId') in self.respostas:
+                self.respostas[params['requestId']]['concluida'] = True
+
+    def _corpo_json(self, id_requisicao):
+        """Lê e decodifica o corpo de uma resposta já concluída."""
+        try:
+            resultado = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': id_requisicao})
+        except Exception:
+            return None # O corpo pode já ter sido descartado pelo navegador
+        corpo = resultado.get('body', '')
+        if resultado.get('base64Encoded'):
+            corpo = base64.b64decode(corpo).decode('utf-8', errors='replace')
+        try:
+            return json.loads(corpo)
+        except ValueError:
+            return None
+
+    def listagem_aulas(self):
+        """
+        Procura, entre as respostas capturadas, a mais recente que seja uma listagem de aulas.
+        Retorna (url, cabecalhos, aulas, total) ou None. 'total' é o total declarado pela API
+        (None se ela não informar). Listas vazias são ignoradas, pois qualquer endpoint pode
+        devolvê-las; uma disciplina sem aulas é tratada pela leitura da tabela.
+        """
+        self._ler_eventos()
+        for id_requisicao, resposta in reversed(list(self.respostas.items())):
+            if not resposta['concluida'] or id_requisicao in self.verificadas:
+                continue
+            payload = self._corpo_json(id_requisicao)
+            aulas = normalizar_aulas(payload)
+            if aulas:
+                cabecalhos = self.requisicoes.get(id_requisicao, {}).get('headers', {})
+                return resposta['url'], cabecalhos, aulas, total_informado(payload)
+            self.verificadas.add(id_requisicao)
+        return None
+
+    def repetir_com_pagina_grande(self, url, cabecalhos, tamanho=TAMANHO_PAGINA_REDE):
+        """
+        Repete a requisição de listagem dentro da página pedindo 'tamanho' registros.
+        Retorna a lista normalizada, ou None se a URL não for paginável, a resposta não for reconhecida
+        ou não houver como saber se ela trouxe todas as aulas.
+        """
+        url_grande = url_com_pagina_grande(url, tamanho)
+        if not url_grande:
+            return None
+        cabecalhos = {k: v for k, v in (cabecalhos or {}).items() if k.lower() not in CABECALHOS_IGNORADOS}
+        try:
+            resultado = self.driver.execute_async_script(JS_REPETIR_REQUISICAO, url_grande, cabecalhos)
+        except Exception as e:
+            print(f"[Rede] AVISO: Falha ao repetir a requisição de listagem: {e}")
+            return None
+        if not resultado or not resultado.get('corpo'):
+            print(f"[Rede] AVISO: Requisição com página grande recusada (HTTP {resultado.get('status') if resultado else '?'}).")
+            return None
+        try:
+            payload = json.loads(resultado['corpo'])
+        except ValueError:
+            return None
+
+        aulas = normalizar_aulas(payload)
+        if aulas is None:
+            return None
+        total = total_informado(payload)
+        registros = len(extrair_lista(payload))
+        if total is not None and registros < total:
+            # O servidor limitou o tamanho da página: a resposta não traz todas as aulas
+            print(f"[Rede] AVISO: A API devolveu {len(aulas)} de {total} aulas com página grande.")
+            return None
+        if total is None and registros in (tamanho, tamanho_pedido(url)):
+            # Sem total, uma página cheia (no tamanho pedido ou no original, se o servidor ignorou
+            # o parâmetro ou impôs um teto) não diz se há mais aulas depois dela
+            print(f"[Rede] AVISO: A API devolveu {registros} aulas sem informar o total; a lista pode estar truncada.")
+            return None
+        return aulas
@@ -0,0 +1,74 @@
+"""
+Diário (journal) em JSON Lines para execuções longas que precisam sobreviver a falhas.
+
+Cada entrada é gravada em uma linha própria e sincronizada com o disco assim que é
+registrada. Se o processo morrer no meio de uma gravação, apenas a última linha fica
+incompleta e é ignorada na leitura; todas as anteriores continuam válidas.
+"""
+import json
+import os
+import threading
+
+
+class DiarioJsonl:
+    """Arquivo de entradas JSON, uma por linha, seguro para uso por várias threads."""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.trava = threading.Lock()
+
+    def registrar(self, entrada):
+        """Acrescenta uma entrada ao final do arquivo e força a gravação em disco."""
+        linha = json.dumps(entrada, ensure_ascii=False) + '\n'
+        with self.trava:
+            os.makedirs(os.path.dirname(self.caminho) or '.', exist_ok=True)
+            if self._termina_sem_quebra():
+                linha = '\n' + linha # Isola a linha incompleta deixada por uma falha anterior
+            with open(self.caminho, 'a', encoding='utf-8') as f:
+                f.write(linha)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _termina_sem_quebra(self):
+        if not os.path.exists(self.caminho) or os.path.getsize(self.caminho) == 0:
+            return False
+        with open(self.caminho, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b'\n'
+
+    def ler(self):
+        """Retorna as entradas válidas, na ordem em que foram registradas."""
+        if not os.path.exists(self.caminho):
+            return []
+        entradas = []
+        with self.trava, open(self.caminho, 'r', encoding='utf-8') as f:
+            for numero, linha in enumerate(f, start=1):
+                linha = linha.strip()
+                if not linha:
+                    continue
+                try:
+                    entradas.append(json.loads(linha))
+                except json.JSONDecodeError:
+                    print(f"[Diário] AVISO: Linha {numero} de '{os.path.basename(self.caminho)}' incompleta. Ignorada.")
+        return entradas
+
+    def reescrever(self, entradas):
+        """Substitui o conteúdo do diário pelas entradas informadas (arquivo temporário + renomeação)."""
+        with self.trava:
+            os.makedirs(os.path.dirname(self.caminho) or '.', exist_ok=True)
+            caminho_temp = self.caminho + '.tmp'
+            with open(caminho_temp, 'w', encoding='utf-8') as f:
+                for entrada in entradas:
+                    f.write(json.dumps(entrada, ensure_ascii=False) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(caminho_temp, self.caminho)
+
+    def existe(self):
+        return os.path.exists(self.caminho) and os.path.getsize(self.caminho) > 0
+
+    def apagar(self):
+        """Remove o diário (ao iniciar uma execução nova ou ao concluir com sucesso)."""
+        with self.trava:
+            if os.path.exists(self.caminho):
+                os.remove(self.caminho)
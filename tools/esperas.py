@@ -0,0 +1,142 @@
+"""
+Esperas adaptativas compartilhadas pelo Scraper e pelo Registrador.
+
+Em vez de pausas fixas (time.sleep), cada espera consulta uma condição concreta do DOM
+em intervalos curtos e termina assim que ela é satisfeita. O tempo real de cada condição
+é registrado por nome, para que o resumo ao final da execução mostre onde o tempo foi gasto.
+"""
+import time
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import (
+    TimeoutException, NoSuchElementException, StaleElementReferenceException, NoSuchFrameException
+)
+
+INTERVALO_PADRAO = 0.1 # segundos entre consultas ao DOM
+
+SELETOR_SPINNER = (By.CSS_SELECTOR, "svg.animate-spin")
+SELETOR_IFRAME_TURMAS = (By.CSS_SELECTOR, 'iframe[src*="listagem-turmas"]')
+XPATH_CARD_TURMA = "//div[div/h3 and .//p[normalize-space()='Registro de aulas']]"
+
+# Texto do corpo da tabela + número de linhas: muda quando a página da tabela é trocada
+JS_ASSINATURA_TABELA = """
+const corpo = document.querySelector('table tbody');
+if (!corpo) { return ''; }
+return corpo.rows.length + '|' + (corpo.innerText || corpo.textContent || '');
+"""
+
+
+class EsperaAdaptativa:
+    """Executa esperas por condições do DOM e mede quanto cada uma realmente levou."""
+
+    def __init__(self, driver, timeout=20, intervalo=INTERVALO_PADRAO):
+        self.driver = driver
+        self.timeout = timeout
+        self.intervalo = intervalo
+        self.medicoes = {} # nome da condição -> lista de durações (s)
+        self.esgotadas = {} # nome da condição -> quantidade de timeouts
+        self.rastreio = None # RastreioEtapas opcional: cada espera vira uma etapa 'espera:<nome>'
+
+    def _registrar(self, nome, duracao, esgotou):
+        self.medicoes.setdefault(nome, []).append(duracao)
+        if esgotou:
+            self.esgotadas[nome] = self.esgotadas.get(nome, 0) + 1
+        if self.rastreio:
+            self.rastreio.registrar(f"espera:{nome}", time.perf_counter() - duracao, duracao, ok=not esgotou)
+
+    def ate(self, condicao, nome, timeout=None, obrigatoria=True):
+        """
+        Espera 'condicao' (callable(driver) ou expected_condition) ficar verdadeira.
+        Se 'obrigatoria' for False, um timeout devolve None em vez de lançar TimeoutException.
+        """
+        inicio = time.perf_counter()
+        esgotou = False
+        try:
+            return WebDriverWait(
+                self.driver, timeout or self.timeout, poll_frequency=self.intervalo,
+                ignored_exceptions=(NoSuchElementException, StaleElementReferenceException)
+            ).until(condicao)
+        except TimeoutException:
+            esgotou = True
+            if obrigatoria:
+                raise
+            return None
+        finally:
+            self._registrar(nome, time.perf_counter() - inicio, esgotou)
+
+    # --- Condições recorrentes do portal ---
+
+    def spinner_sumir(self, timeout=None, obrigatoria=True):
+        """Espera o spinner de carregamento da tabela desaparecer."""
+        return self.ate(EC.invisibility_of_element_located(SELETOR_SPINNER), 'spinner_sumir', timeout, obrigatoria)
+
+    def clicavel(self, localizador, nome='elemento_clicavel', timeout=None):
+        """Espera um elemento ficar clicável e o retorna."""
+        return self.ate(EC.element_to_be_clickable(localizador), nome, timeout)
+
+    def dialogo_fechar(self, xpath_dialogo, timeout=None, obrigatoria=True):
+        """Espera um diálogo (role='dialog') sair da tela."""
+        return self.ate(EC.invisibility_of_element_located((By.XPATH, xpath_dialogo)), 'dialogo_fechar', timeout, obrigatoria)
+
+    def etapa_ativa(self, texto_etapa, timeout=None):
+        """Espera a etapa da barra de progresso do formulário ficar ativa."""
+        xpath = f"//nav[@aria-label='Progress']//div[@aria-current='step' and contains(., '{texto_etapa}')]"
+        return self.ate(EC.visibility_of_element_located((By.XPATH, xpath)), 'etapa_ativa', timeout)
+
+    def texto_mudar(self, localizador, texto_anterior, timeout=None, obrigatoria=True):
+        """Espera o texto de um elemento ficar diferente de 'texto_anterior'."""
+        def mudou(driver):
+            texto = driver.find_element(*localizador).text
+            return texto if texto and texto != texto_anterior else False
+        return self.ate(mudou, 'texto_mudar', timeout, obrigatoria)
+
+    def assinatura_tabela(self):
+        """Retorna uma 'impressão digital' do conteúdo atual da tabela."""
+        try:
+            return self.driver.execute_script(JS_ASSINATURA_TABELA)
+        except Exception:
+            return ''
+
+    def tabela_mudar(self, assinatura_anterior, timeout=None, obrigatoria=False):
+        """Espera o conteúdo da tabela (linhas) ficar diferente da assinatura anterior."""
+        def mudou(driver):
+            assinatura = driver.execute_script(JS_ASSINATURA_TABELA)
+            return assinatura != assinatura_anterior
+        return self.ate(mudou, 'tabela_mudar', timeout, obrigatoria)
+
+    def iframe_turmas_pronto(self, timeout=None):
+        """
+        Espera o iframe de listagem de turmas estar carregado com os cards e entra nele.
+        Refaz a troca de contexto a cada consulta, pois o iframe pode ser recriado durante a navegação.
+        """
+        def pronto(driver):
+            driver.switch_to.default_content()
+            iframes = driver.find_elements(*SELETOR_IFRAME_TURMAS)
+            if not iframes:
+                return False
+            try:
+                driver.switch_to.frame(iframes[0])
+            except NoSuchFrameException:
+                return False
+            return bool(driver.find_elements(By.XPATH, XPATH_CARD_TURMA))
+        return self.ate(pronto, 'iframe_turmas_pronto', timeout)
+
+    # --- Relatório ---
+
+    def incorporar(self, outra):
+        """Soma as medições de outra instância (ex: workers paralelos) a esta."""
+        for nome, duracoes in outra.medicoes.items():
+            self.medicoes.setdefault(nome, []).extend(duracoes)
+        for nome, quantidade in outra.esgotadas.items():
+            self.esgotadas[nome] = self.esgotadas.get(nome, 0) + quantidade
+
+    def imprimir_resumo(self, titulo="Esperas"):
+        """Mostra quantas vezes cada condição foi aguardada e quanto tempo levou."""
+        if not self.medicoes:
+            return
+        print(f"\n--- Resumo de {titulo} ---")
+        print(f"{'Condição':<24} | {'Qtd':>5} | {'Média (s)':>9} | {'Máx (s)':>8} | {'Total (s)':>9} | {'Timeouts':>8}")
+        for nome, duracoes in sorted(self.medicoes.items(), key=lambda item: -sum(item[1])):
+            print(f"{nome:<24} | {len(duracoes):>5} | {sum(duracoes) / len(duracoes):>9.2f} | "
+                  f"{max(duracoes):>8.2f} | {sum(duracoes):>9.2f} | {self.esgotadas.get(nome, 0):>8}")
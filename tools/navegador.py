@@ -0,0 +1,190 @@
+"""
+Configuração compartilhada do Chrome usado pelo Scraper e pelo Registrador.
+
+Perfis disponíveis:
+- 'completo': navegador visível, maximizado e com renderização completa (comportamento original).
+  Indicado quando o professor precisa acompanhar ou intervir manualmente.
+- 'rapido': headless, viewport fixo, carregamento 'eager' e bloqueio de imagens, fontes e
+  animações CSS via CDP. Indicado para execuções sem supervisão ou máquinas sem monitor.
+
+O perfil é escolhido por `--perfil <nome>` na linha de comando ou pela chave
+`"perfil_navegador"` do `config.json`. Sem nenhum dos dois, cada script usa o seu padrão.
+Da mesma forma, o endereço do portal pode ser trocado por `--url` ou `"url_portal"`
+(ex: para usar o portal simulado de `portal_simulado.py`).
+
+O caminho do chromedriver resolvido pelo webdriver_manager fica salvo em
+`data/chromedriver_cache.json` junto com a versão principal do Chrome. Enquanto o Chrome
+instalado continuar na mesma versão principal, o driver é reaproveitado sem acesso à rede.
+"""
+import json
+import os
+import sys
+import time
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+from webdriver_manager.core.os_manager import OperationSystemManager, ChromeType
+
+PERFIL_RAPIDO = 'rapido'
+PERFIL_COMPLETO = 'completo'
+PERFIS_NAVEGADOR = (PERFIL_RAPIDO, PERFIL_COMPLETO)
+
+URL_PORTAL = "https://portal.seduc.pi.gov.br/#!/turmas"
+
+ARQUIVO_CACHE_DRIVER = 'chromedriver_cache.json'
+
+# Tamanho fixo da janela no perfil rápido (o layout do portal quebra abaixo de ~1280px)
+VIEWPORT_RAPIDO = (1366, 900)
+
+# Recursos que não afetam o DOM usado pela automação e podem ser bloqueados com segurança
+URLS_BLOQUEADAS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico', '*.bmp',
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+    '*.mp4', '*.webm', '*.mp3',
+]
+
+# Desliga animações e transições CSS em todos os frames. Os diálogos do portal (Radix)
+# só são removidos do DOM após o fim da animação; sem ela, fecham imediatamente.
+JS_SEM_ANIMACOES = """
+(() => {
+    const css = '*, *::before, *::after { animation: none !important; transition: none !important; scroll-behavior: auto !important; }';
+    const aplicar = () => {
+        const estilo = document.createElement('style');
+        estilo.textContent = css;
+        (document.head || document.documentElement).appendChild(estilo);
+    };
+    if (document.documentElement) { aplicar(); } else { document.addEventListener('DOMContentLoaded', aplicar); }
+})();
+"""
+
+
+def argumento_cli(nome, padrao=None):
+    """Retorna o valor que segue 'nome' na linha de comando (ex: --workers 4) ou o padrão."""
+    if nome in sys.argv:
+        indice = sys.argv.index(nome)
+        if indice + 1 < len(sys.argv):
+            return sys.argv[indice + 1]
+    return padrao
+
+
+def resolver_perfil(config, padrao):
+    """Escolhe o perfil do navegador: linha de comando > config.json > padrão do script."""
+    perfil = argumento_cli('--perfil') or (config or {}).get('perfil_navegador') or padrao
+    perfil = str(perfil).strip().lower()
+    if perfil not in PERFIS_NAVEGADOR:
+        print(f"[Navegador] AVISO: Perfil '{perfil}' desconhecido. Usando '{padrao}'.")
+        return padrao
+    return perfil
+
+
+def resolver_url_portal(config):
+    """Endereço da listagem de turmas: linha de comando (--url) > config.json (url_portal) > portal oficial."""
+    return argumento_cli('--url') or (config or {}).get('url_portal') or URL_PORTAL
+
+
+def criar_opcoes_chrome(perfil, capturar_rede=False):
+    """Monta as ChromeOptions correspondentes ao perfil."""
+    options = webdriver.ChromeOptions()
+    if capturar_rede:
+        # Logs de performance: eventos de rede lidos pelo backend de coleta 'rede' (captura_rede.py)
+        options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    if perfil == PERFIL_RAPIDO:
+        options.add_argument("--headless=new")
+        options.add_argument(f"--window-size={VIEWPORT_RAPIDO[0]},{VIEWPORT_RAPIDO[1]}")
+        options.add_argument("--disable-extensions")
+        options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+        })
+        # 'eager' libera o driver.get() no DOMContentLoaded, sem esperar imagens e folhas de estilo
+        options.page_load_strategy = 'eager'
+    else:
+        options.add_argument("--start-maximized")
+    return options
+
+
+def aplicar_bloqueios_cdp(driver):
+    """Bloqueia imagens/fontes e desliga animações CSS via Chrome DevTools Protocol."""
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': URLS_BLOQUEADAS})
+        driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': JS_SEM_ANIMACOES})
+    except Exception as e:
+        # Sem CDP o perfil continua funcional, apenas sem o bloqueio de recursos
+        print(f"[Navegador] AVISO: Não foi possível aplicar os bloqueios via CDP: {e}")
+
+
+def versao_chrome_instalado():
+    """Versão do Chrome instalado, lida localmente (registro do Windows ou '--version'). None se não encontrada."""
+    try:
+        return OperationSystemManager().get_browser_version_from_os(ChromeType.GOOGLE)
+    except Exception:
+        return None
+
+
+def _pasta_dados_padrao():
+    raiz = os.path.dirname(sys.executable) if getattr(sys, 'frozen', False) else os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(raiz, 'data')
+
+
+def caminho_chromedriver(data_path=None):
+    """
+    Retorna o caminho do chromedriver, reaproveitando o cache em data/ quando possível.
+    O webdriver_manager só é consultado se não houver cache, se o executável sumiu ou se a
+    versão principal do Chrome mudou. Sem rede e sem cache, retorna None e o Selenium
+    Manager tenta localizar o driver por conta própria.
+    """
+    caminho_cache = os.path.join(data_path or _pasta_dados_padrao(), ARQUIVO_CACHE_DRIVER)
+    cache = {}
+    if os.path.exists(caminho_cache):
+        try:
+            with open(caminho_cache, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (json.JSONDecodeError, OSError):
+            cache = {}
+
+    versao_chrome = versao_chrome_instalado()
+    versao_principal = versao_chrome.split('.')[0] if versao_chrome else None
+    driver_em_cache = cache.get('caminho') if cache.get('caminho') and os.path.exists(cache['caminho']) else None
+
+    # Versão do Chrome desconhecida: o driver em cache é a melhor aposta
+    if driver_em_cache and (versao_principal is None or cache.get('versao_principal') == versao_principal):
+        return driver_em_cache
+
+    if driver_em_cache:
+        print(f"[Navegador] Chrome mudou da versão {cache.get('versao_principal')} para {versao_principal}. Atualizando o chromedriver...")
+    try:
+        caminho = ChromeDriverManager().install()
+    except Exception as e:
+        if driver_em_cache:
+            print(f"[Navegador] AVISO: Não foi possível atualizar o chromedriver ({e}). Usando o driver em cache.")
+            return driver_em_cache
+        print(f"[Navegador] AVISO: Não foi possível baixar o chromedriver ({e}). Tentando o Selenium Manager.")
+        return None
+
+    try:
+        os.makedirs(os.path.dirname(caminho_cache), exist_ok=True)
+        with open(caminho_cache, 'w', encoding='utf-8') as f:
+            json.dump({
+                'caminho': caminho,
+                'versao_principal': versao_principal,
+                'versao_chrome': versao_chrome,
+                'resolvido_em': time.strftime('%d/%m/%Y %H:%M:%S'),
+            }, f, ensure_ascii=False, indent=4)
+    except OSError as e:
+        print(f"[Navegador] AVISO: Não foi possível salvar o cache do chromedriver: {e}")
+    return caminho
+
+
+def iniciar_chrome(perfil, capturar_rede=False, data_path=None):
+    """
+    Inicia o Chrome com o perfil informado e retorna o WebDriver.
+    Com 'capturar_rede', os eventos de rede ficam disponíveis em driver.get_log('performance').
+    """
+    print(f"[Navegador] Perfil do navegador: '{perfil}'.")
+    options = criar_opcoes_chrome(perfil, capturar_rede)
+    caminho_driver = caminho_chromedriver(data_path)
+    service = Service(caminho_driver) if caminho_driver else Service()
+    driver = webdriver.Chrome(service=service, options=options)
+    if perfil == PERFIL_RAPIDO:
+        aplicar_bloqueios_cdp(driver)
+    return driver
@@ -2,6 +2,9 @@ import os
 import json
 import sys
 from scraper import Scraper
+from navegador import resolver_url_portal
+from aulas_jsonl import GravadorAulas, compactar
+from banco_aulas import BancoAulas, STATUS_PENDENTE
 from preparar_planos import carregar_dados as carregar_dados_preparador, planejar_e_preparar_aulas
 from datetime import datetime
 
@@ -28,11 +31,10 @@ def main():
     try:
         print("[Passo 1/3] Carregando configurações locais...")
         dados_locais_preparador = carregar_dados_preparador(DATA_PATH)
-        turmas_disciplinas, _, _, mapa_turmas, _, _ = dados_locais_preparador
+        turmas_disciplinas, _, _, mapa_turmas, _, config = dados_locais_preparador
         with open(os.path.join(DATA_PATH, 'credentials.json'), 'r') as f:
             creds = json.load(f)
-        with open(AULAS_COLETADAS_PATH, 'r', encoding='utf-8') as f:
-            aulas_coletadas_local = json.load(f)
+        banco = BancoAulas.abrir(DATA_PATH)
         print("  -> Configurações carregadas com sucesso.")
     except Exception as e:
         print(f"ERRO CRÍTICO ao carregar arquivos locais: {e}")
@@ -70,25 +72,21 @@ def main():
 
     # 2. Verificar aulas "Aguardando confirmação" e atualizar status online
     print("\n[Passo 2/3] Verificando status de aulas pendentes no portal...")
-    aulas_para_verificar = [
-        aula for aula in aulas_coletadas_local
-        if aula.get('componenteCurricular') == disciplina_selecionada and aula.get('status') == 'Aguardando confirmação'
-    ]
+    aulas_para_verificar = banco.aulas(componente=disciplina_selecionada, status=STATUS_PENDENTE)
 
     if not aulas_para_verificar:
         print(f"  -> Nenhuma aula 'Aguardando confirmação' encontrada para '{disciplina_selecionada}'. O planejamento usará os dados locais.")
-        aulas_atualizadas = aulas_coletadas_local
     else:
         print(f"  -> Encontradas {len(aulas_para_verificar)} aulas 'Aguardando confirmação' para '{disciplina_selecionada}'. Conectando ao portal para verificar...")
         
         aulas_online_disciplina = {} # Dicionário para acesso rápido: (turma, data, horario) -> status
         scraper_instance = Scraper(project_root=PROJECT_ROOT)
+        scraper_instance.config = config
         try:
             # --- NOVA LÓGICA DE LOGIN ÚNICO ---
             scraper_instance._initialize_driver()
-            target_url = "https://portal.seduc.pi.gov.br/#!/turmas"
-            scraper_instance._login(target_url, creds)
-            scraper_instance._select_profile_and_institution()
+            target_url = resolver_url_portal(config)
+            scraper_instance._entrar(target_url, creds)
             # ------------------------------------
 
             for nome_turma_completo in turmas_da_disciplina:
@@ -103,42 +101,46 @@ def main():
         except Exception as e:
             print(f"ERRO CRÍTICO durante a coleta de dados online: {e}")
             print("O planejamento será abortado.")
+            banco.fechar()
             return
         finally:
             if scraper_instance and scraper_instance.driver:
                 scraper_instance.driver.quit()
                 print(" -> Navegador do scraper fechado.")
 
-        # Atualiza a lista de aulas local com os status online
-        aulas_atualizadas = list(aulas_coletadas_local) # Cria uma cópia
-        atualizacoes = 0
-        for i, aula_local in enumerate(aulas_atualizadas):
-            if aula_local.get('componenteCurricular') == disciplina_selecionada and aula_local.get('status') == 'Aguardando confirmação':
-                chave_online = (aula_local['turma'], aula_local['dataAula'], aula_local['horario'])
-                status_online = aulas_online_disciplina.get(chave_online)
-                if status_online and status_online != aula_local['status']:
-                    print(f"    -> ATUALIZANDO: Aula de {aula_local['dataAula']} na turma {mapa_turmas.get(aula_local['turma'])} mudou para '{status_online}'")
-                    aulas_atualizadas[i]['status'] = status_online
-                    atualizacoes += 1
+        # Atualiza as aulas pendentes com os status online (apenas as da consulta, sem percorrer o histórico)
+        aulas_alteradas = []
+        for aula_local in aulas_para_verificar:
+            chave_online = (aula_local['turma'], aula_local['dataAula'], aula_local['horario'])
+            status_online = aulas_online_disciplina.get(chave_online)
+            if status_online and status_online != aula_local['status']:
+                print(f"    -> ATUALIZANDO: Aula de {aula_local['dataAula']} na turma {mapa_turmas.get(aula_local['turma'])} mudou para '{status_online}'")
+                aulas_alteradas.append(dict(aula_local, status=status_online))
         
-        if atualizacoes > 0:
-            print(f"  -> {atualizacoes} aulas foram atualizadas. Salvando em '{AULAS_COLETADAS_PATH}'...")
-            with open(AULAS_COLETADAS_PATH, 'w', encoding='utf-8') as f:
-                json.dump(aulas_atualizadas, f, indent=4, ensure_ascii=False)
+        if aulas_alteradas:
+            banco.upsert(aulas_alteradas)
+            print(f"  -> {len(aulas_alteradas)} aulas foram atualizadas. Salvando em '{AULAS_COLETADAS_PATH}'...")
+            # Apenas as aulas alteradas são acrescentadas ao histórico .jsonl (a última ocorrência prevalece)
+            gravador = GravadorAulas(DATA_PATH)
+            gravador.acrescentar(aulas_alteradas)
+            gravador.concluir()
+            compactar(DATA_PATH)
             print("  -> Arquivo 'aulas_coletadas.json' atualizado com sucesso.")
         else:
             print("  -> Nenhum status de aula pendente foi alterado no portal.")
 
     # 3. Chamar a lógica de planejamento com os dados atualizados
     try:
-        if aulas_atualizadas:
+        if banco.total():
             print("\n[Passo 3/3] Iniciando o planejamento com base nos dados atualizados...")
             # Passa os dados locais e os dados online recém-coletados/atualizados
-            planejar_e_preparar_aulas(dados_locais_preparador, aulas_atualizadas, AULAS_DIR) # <-- CORRIGIDO: Passa o caminho para a função
+            planejar_e_preparar_aulas(dados_locais_preparador, banco, AULAS_DIR) # <-- CORRIGIDO: Passa o caminho para a função
         else:
             print("\nAVISO: Nenhuma aula foi coletada do portal. O planejamento não pode continuar.")
     except Exception as e:
         print(f"\nERRO INESPERADO durante a fase de planejamento: {e}")
+    finally:
+        banco.fechar()
 
 if __name__ == '__main__':
 
@@ -0,0 +1,128 @@
+"""
+Modelo do arquivo de plano de aula (.txt) usado pelo Preparador, pelo Preenchedor e pelo Registrador.
+
+Formato:
+    # Data: 10/03/2025
+    # Aula: 05
+    # Horário: 07:00-07:50
+
+    [CONTEUDO]
+    ...
+    [ESTRATEGIA]
+    ...
+    [RECURSO_TITULO] / [RECURSO_LINK] / [RECURSO_COMENTARIO]
+    ...
+
+O arquivo é lido uma única vez para um `PlanoAula` (cabeçalho + blocos) e gravado de volta
+com `renderizar()`, sempre no mesmo formato. Assim os três scripts interpretam os planos da
+mesma maneira.
+"""
+import os
+import re
+
+BLOCOS = ('CONTEUDO', 'ESTRATEGIA', 'RECURSO_TITULO', 'RECURSO_LINK', 'RECURSO_COMENTARIO')
+BLOCOS_OBRIGATORIOS = ('CONTEUDO', 'ESTRATEGIA')
+MARCADOR_PENDENTE = 'Preencher'
+PADRAO_NOME_PLANO = re.compile(r'(.+)_(\d{8})_\d{4}\.txt$') # DISC_AAAAMMDD_HHMM.txt
+
+TEXTOS_ESQUELETO = {
+    'CONTEUDO': "Preencher o conteúdo abordado aqui.",
+    'ESTRATEGIA': "Preencher a estratégia metodológica aqui.",
+}
+
+
+def disciplina_do_nome(nome_arquivo):
+    """Código da disciplina a partir do nome do plano (ex: 'MAT_20250310_0700.txt' -> 'MAT'), ou None."""
+    match = PADRAO_NOME_PLANO.match(nome_arquivo)
+    return match.group(1) if match else None
+
+
+class PlanoAula:
+    """Cabeçalho (data, número da aula, horário) e blocos de texto de um plano de aula."""
+
+    def __init__(self, data=None, aula=None, horario=None, blocos=None, caminho=None):
+        self.data = data         # 'dd/mm/aaaa'
+        self.aula = aula         # int
+        self.horario = horario
+        self.blocos = {nome: '' for nome in BLOCOS}
+        self.blocos.update(blocos or {})
+        self.caminho = caminho
+
+    @classmethod
+    def esqueleto(cls, data, aula, horario, caminho=None):
+        """Plano recém-gerado, com os blocos obrigatórios marcados como 'Preencher'."""
+        return cls(data, aula, horario, dict(TEXTOS_ESQUELETO), caminho)
+
+    @classmethod
+    def de_texto(cls, texto, caminho=None):
+        """Interpreta o conteúdo de um plano em uma única passada pelas linhas."""
+        plano = cls(caminho=caminho)
+        bloco_atual = None
+        linhas_bloco = {}
+        for linha in texto.splitlines():
+            marcador = linha.strip()
+            if marcador.startswith('[') and marcador.endswith(']') and marcador[1:-1] in BLOCOS:
+                bloco_atual = marcador[1:-1]
+                linhas_bloco[bloco_atual] = []
+            elif bloco_atual:
+                linhas_bloco[bloco_atual].append(linha)
+            elif linha.startswith('# Data:'):
+                plano.data = linha.split(':', 1)[1].strip()
+            elif linha.startswith('# Horário:'):
+                plano.horario = linha.split(':', 1)[1].strip()
+            elif linha.startswith('# Aula:'):
+                try:
+                    plano.aula = int(linha.split(':', 1)[1].strip())
+                except ValueError:
+                    pass
+        for nome, linhas in linhas_bloco.items():
+            plano.blocos[nome] = '\n'.join(linhas).strip()
+        return plano
+
+    @classmethod
+    def ler(cls, caminho):
+        """Lê um plano do disco. Retorna None se o arquivo não existir."""
+        try:
+            with open(caminho, 'r', encoding='utf-8') as f:
+                return cls.de_texto(f.read(), caminho)
+        except FileNotFoundError:
+            return None
+
+    @property
+    def pendente(self):
+        """True enquanto algum bloco ainda tiver o marcador 'Preencher'."""
+        return any(MARCADOR_PENDENTE in valor for valor in self.blocos.values())
+
+    @property
+    def completo(self):
+        """Pronto para registro: tem data, horário e os blocos obrigatórios preenchidos."""
+        if not (self.data and self.horario):
+            return False
+        return all(self.blocos[nome] and MARCADOR_PENDENTE not in self.blocos[nome] for nome in BLOCOS_OBRIGATORIOS)
+
+    def como_dict(self):
+        """Dados no formato usado pelo Registrador ('data', 'horario', 'conteudo', 'recurso_link', ...)."""
+        dados = {'data': self.data, 'horario': self.horario}
+        dados.update({nome.lower(): valor for nome, valor in self.blocos.items()})
+        return dados
+
+    def renderizar(self):
+        partes = [
+            f"# Data: {self.data}\n",
+            f"# Aula: {self.aula:02d}\n" if isinstance(self.aula, int) else '',
+            f"# Horário: {self.horario}\n",
+        ]
+        for nome in BLOCOS:
+            partes.append(f"\n[{nome}]\n{self.blocos[nome]}\n")
+        return ''.join(partes)
+
+    def salvar(self, caminho=None):
+        """Grava o plano (arquivo temporário + renomeação). Retorna (mtime_ns, tamanho) do arquivo."""
+        caminho = caminho or self.caminho
+        caminho_temp = caminho + '.tmp'
+        with open(caminho_temp, 'w', encoding='utf-8') as f:
+            f.write(self.renderizar())
+        os.replace(caminho_temp, caminho)
+        self.caminho = caminho
+        info = os.stat(caminho)
+        return info.st_mtime_ns, info.st_size
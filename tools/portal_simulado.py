@@ -0,0 +1,540 @@
+"""
+Portal Seduc simulado para testes offline e medições de desempenho.
+
+Servidor HTTP local (http.server) que reproduz os contratos de DOM usados
+pelo Scraper, pelo Registrador e pelo planejador online:
+- formulário de login (`#username`, `#password`, `button[ng-click="logar(login)"]`);
+- lista de perfis (`a.collection-item[ng-click="selecionarPerfil(perfil)"]`) e o
+  `iframe#iframe-container` de escolha da instituição (botão "ABRIR");
+- iframe `listagem-turmas` com os cards de turma/disciplina e o resumo de aulas pendentes;
+- tabela de "Registro de aulas" paginada, com spinner (`svg.animate-spin`), combobox de
+  registros por página e botão "Próxima", alimentada por uma API JSON (`/api/aulas`);
+- formulário de 5 etapas (`nav[aria-label='Progress']`), calendário no estilo Radix e
+  os diálogos de confirmação ("Sim", recurso didático, "Atenção").
+
+Uso:
+    python tools/portal_simulado.py [--porta 8765] [--latencia-ms 300] [--linhas 120] [--dados data]
+
+Para apontar a automação para o simulador, use `--url http://127.0.0.1:8765/#!/turmas`
+ou a chave `"url_portal"` no `config.json`. Qualquer usuário/senha não vazios são aceitos.
+"""
+import json
+import os
+import random
+import secrets
+import threading
+import time
+from datetime import datetime, timedelta, date
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from http.cookies import SimpleCookie
+from urllib.parse import urlsplit, parse_qs
+from navegador import argumento_cli
+
+PORTA_PADRAO = 8765
+LATENCIA_PADRAO_MS = 300
+LINHAS_PADRAO = 120
+COOKIE_SESSAO = 'sessao_simulada'
+TAMANHO_MAXIMO_PAGINA = 1000
+
+HORARIOS = ["07:30 às 08:20", "08:20 às 09:10", "09:30 às 10:20", "10:20 às 11:10", "13:30 às 14:20", "14:20 às 15:10"]
+
+# Usadas quando não há data/turmas_com_disciplinas.json
+TURMAS_EXEMPLO = [
+    {"nomeTurma": "EMI-INT CT DES SIST-1ª SÉRIE -I-A", "disciplinas": [
+        {"codigoDisciplina": "LP", "nomeDisciplina": "LÓGICA DE PROGRAMAÇÃO"},
+        {"codigoDisciplina": "BD", "nomeDisciplina": "BANCO DE DADOS"},
+    ]},
+    {"nomeTurma": "ENS FUND II-9º ANO-I-B", "disciplinas": [
+        {"codigoDisciplina": "MAT", "nomeDisciplina": "MATEMÁTICA"},
+    ]},
+]
+
+
+class EstadoPortal:
+    """Turmas, aulas e sessões do portal simulado. Compartilhado entre as threads do servidor."""
+
+    def __init__(self, turmas, linhas, semente=42):
+        self.turmas = turmas
+        self.sessoes = set()
+        self.aulas = {} # (turma, disciplina) -> lista de aulas (mais recente primeiro)
+        self.trava = threading.Lock()
+        sorteio = random.Random(semente)
+        hoje = date.today()
+        for turma in turmas:
+            for disciplina in turma.get('disciplinas', []):
+                chave = (turma['nomeTurma'], disciplina['nomeDisciplina'])
+                self.aulas[chave] = [
+                    self._gerar_aula(chave, hoje - timedelta(days=2 * i + 1), sorteio, i) for i in range(linhas)
+                ]
+
+    @staticmethod
+    def _gerar_aula(chave, data_aula, sorteio, indice):
+        cadastro = datetime.combine(data_aula + timedelta(days=1), datetime.min.time()) + timedelta(hours=9, minutes=sorteio.randint(0, 480))
+        if indice < 3:
+            situacao = 'Aguardando confirmação'
+        elif sorteio.random() < 0.03:
+            situacao = 'Excluída'
+        else:
+            situacao = 'Aula confirmada'
+        inicio, fim = sorteio.choice(HORARIOS).split(' às ')
+        return {
+            'id': secrets.token_hex(6),
+            'dataAula': data_aula.isoformat(),
+            'horaInicio': f"{inicio}:00",
+            'horaFim': f"{fim}:00",
+            'turma': {'nome': chave[0]},
+            'componenteCurricular': {'nome': chave[1]},
+            'dataCadastro': cadastro.isoformat(timespec='seconds'),
+            'situacao': situacao,
+        }
+
+    def listar_aulas(self, turma, disciplina, pagina, tamanho):
+        with self.trava:
+            aulas = list(self.aulas.get((turma, disciplina), []))
+        inicio = pagina * tamanho
+        return {
+            'content': aulas[inicio:inicio + tamanho],
+            'totalElements': len(aulas),
+            'page': pagina,
+            'size': tamanho,
+        }
+
+    def cards(self):
+        with self.trava:
+            pendentes = sum(
+                1 for aulas in self.aulas.values() for aula in aulas if aula['situacao'] == 'Aguardando confirmação'
+            )
+        cards = [
+            {'turma': turma['nomeTurma'], 'disciplina': d['nomeDisciplina']}
+            for turma in self.turmas for d in turma.get('disciplinas', [])
+        ]
+        return {'cards': cards, 'pendentes': pendentes}
+
+    def registrar_aula(self, dados):
+        chave = (dados.get('turma'), dados.get('disciplina'))
+        inicio, _, fim = (dados.get('horario') or '').partition(' às ')
+        aula = {
+            'id': secrets.token_hex(6),
+            'dataAula': dados.get('data'),
+            'horaInicio': f"{inicio}:00",
+            'horaFim': f"{fim}:00",
+            'turma': {'nome': chave[0]},
+            'componenteCurricular': {'nome': chave[1]},
+            'dataCadastro': datetime.now().isoformat(timespec='seconds'),
+            'situacao': 'Aguardando confirmação',
+            'conteudo': dados.get('conteudo'),
+            'estrategia': dados.get('estrategia'),
+            'recursos': dados.get('recursos', []),
+        }
+        with self.trava:
+            if chave not in self.aulas:
+                return None
+            self.aulas[chave].insert(0, aula)
+        return aula
+
+
+PAGINA_PRINCIPAL = """<!doctype html>
+<html lang="pt-BR"><head><meta charset="utf-8"><title>Portal Seduc (simulado)</title>
+<style>body{font-family:sans-serif;margin:0} iframe{width:100%;height:95vh;border:0} .collection-item{display:block;padding:12px}</style>
+</head><body><div id="app"></div>
+<script>
+const app = document.getElementById('app');
+const tela = (html) => { app.innerHTML = html; };
+
+function telaLogin(erro) {
+    tela(`<form onsubmit="return false" style="padding:24px">
+        <h1>Portal Seduc</h1>
+        ${erro ? '<p role="alert">' + erro + '</p>' : ''}
+        <input id="username" placeholder="Usuário"><br>
+        <input id="password" type="password" placeholder="Senha"><br>
+        <button ng-click="logar(login)" onclick="logar()">Entrar</button>
+    </form>`);
+}
+
+async function logar() {
+    const corpo = {username: document.getElementById('username').value, password: document.getElementById('password').value};
+    const r = await fetch('/api/login', {method: 'POST', headers: {'Content-Type': 'application/json'}, body: JSON.stringify(corpo)});
+    if (r.ok) { telaPerfil(); } else { telaLogin('Usuário ou senha inválidos.'); }
+}
+
+function telaPerfil() {
+    tela(`<div class="collection" style="padding:24px"><h2>Escolha o perfil</h2>
+        <a class="collection-item" href="javascript:void(0)" ng-click="selecionarPerfil(perfil)" onclick="selecionarPerfil()">Professor(a)</a>
+    </div>`);
+}
+
+function selecionarPerfil() {
+    sessionStorage.setItem('perfil', 'professor');
+    tela('<iframe id="iframe-container" src="/instituicao"></iframe>');
+}
+
+window.abrirInstituicao = function () {
+    localStorage.setItem('instituicao', 'escola-simulada');
+    telaTurmas();
+};
+
+function telaTurmas() {
+    tela('<iframe id="iframe-container" src="/listagem-turmas"></iframe>');
+}
+
+(async function iniciar() {
+    const r = await fetch('/api/sessao');
+    if (!r.ok) { return telaLogin(); }
+    if (sessionStorage.getItem('perfil') && localStorage.getItem('instituicao')) { return telaTurmas(); }
+    telaPerfil();
+})();
+</script></body></html>
+"""
+
+PAGINA_INSTITUICAO = """<!doctype html>
+<html lang="pt-BR"><head><meta charset="utf-8"></head><body style="font-family:sans-serif;padding:24px">
+<h2>Escolha a instituição</h2>
+<div><p>ESCOLA ESTADUAL SIMULADA</p><button onclick="parent.abrirInstituicao()">ABRIR</button></div>
+</body></html>
+"""
+
+PAGINA_TURMAS = """<!doctype html>
+<html lang="pt-BR"><head><meta charset="utf-8">
+<style>
+body{font-family:sans-serif;padding:16px} .card{border:1px solid #ccc;margin:8px;padding:8px;display:inline-block;width:300px}
+table{border-collapse:collapse} td,th{border:1px solid #ddd;padding:4px} [role=dialog]{position:fixed;top:10%;left:20%;background:#fff;border:1px solid #333;padding:16px;z-index:50}
+nav div{display:inline-block;padding:4px 8px} nav div[aria-current=step]{font-weight:bold;border-bottom:2px solid green}
+</style></head><body><div id="app"></div>
+<script>
+const CABECALHOS = ['Data da Aula', 'Horário (inicial ~ final)', 'Turma', 'Componente', 'Data de Cadastro da Aula', 'Situação', 'Ações'];
+const HORARIOS = __HORARIOS__;
+const MESES = ['janeiro', 'fevereiro', 'março', 'abril', 'maio', 'junho', 'julho', 'agosto', 'setembro', 'outubro', 'novembro', 'dezembro'];
+const ETAPAS = ['1 - Conteúdo', '2 - Plano de aula', '3 - Frequência', '4 - Recursos didáticos', '5 - Atividade'];
+const SPINNER = '<svg class="animate-spin" width="24" height="24" viewBox="0 0 24 24"><circle cx="12" cy="12" r="10" stroke="gray" fill="none"/></svg>';
+const app = document.getElementById('app');
+const esc = (t) => String(t == null ? '' : t).replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/"/g, '&quot;');
+const dois = (n) => String(n).padStart(2, '0');
+const dataBr = (iso) => { const [a, m, d] = iso.slice(0, 10).split('-'); return `${d}/${m}/${a}` + (iso.length > 10 ? ' ' + iso.slice(11, 19) : ''); };
+
+let disciplina = null; // {turma, disciplina, pagina, tamanho, total}
+let formulario = null; // estado do formulário de nova aula
+
+// --- Roteamento: '#/' (cards) e '#/aulas/<turma>/<disciplina>' ---
+function rotear() {
+    const partes = location.hash.replace(/^#\\/?/, '').split('/').map(decodeURIComponent);
+    if (partes[0] === 'aulas' && partes.length === 3) { abrirDisciplina(partes[1], partes[2]); } else { telaCards(); }
+}
+window.addEventListener('hashchange', rotear);
+
+async function telaCards() {
+    disciplina = null;
+    app.innerHTML = SPINNER;
+    const r = await fetch('/api/turmas');
+    const dados = await r.json();
+    app.innerHTML = `
+        <div class="resumo"><div>Aulas aguardando confirmação</div><div class="text-2xl font-bold">${dados.pendentes}</div></div>
+        ${dados.cards.map((c) => `
+            <div class="card">
+                <div><h3>${esc(c.turma)}</h3></div>
+                <div><p>${esc(c.disciplina)}</p></div>
+                <div><p data-turma="${esc(c.turma)}" data-disciplina="${esc(c.disciplina)}" onclick="abrirCard(this)" style="cursor:pointer;color:green">Registro de aulas</p></div>
+            </div>`).join('')}`;
+}
+
+function abrirCard(link) {
+    location.hash = '#/aulas/' + encodeURIComponent(link.dataset.turma) + '/' + encodeURIComponent(link.dataset.disciplina);
+}
+
+// --- Tabela de registro de aulas ---
+function abrirDisciplina(turma, nome) {
+    disciplina = {turma: turma, disciplina: nome, pagina: 0, tamanho: 10, total: 0};
+    app.innerHTML = `
+        <div><button title="Voltar" onclick="history.back()">&larr;</button> <b>Registro de aulas</b> - ${esc(turma)} / ${esc(nome)}</div>
+        <div id="carregando" class="flex justify-center items-center mt-[50vh]">${SPINNER}</div>
+        <button onclick="novaAula()">Adicionar aula</button>
+        <div id="area-tabela"><table><thead><tr>${CABECALHOS.map((h) => `<th>${h}</th>`).join('')}</tr></thead><tbody></tbody></table></div>
+        <div id="paginacao">
+            <button role="combobox" onclick="abrirTamanhos()">10 Registros</button><div id="tamanhos"></div>
+            <span id="info-pagina"></span>
+            <button onclick="mudarPagina(1)">Próxima</button>
+        </div>`;
+    carregarPagina();
+}
+
+async function carregarPagina() {
+    const area = document.getElementById('area-tabela');
+    area.insertAdjacentHTML('afterbegin', SPINNER);
+    const p = new URLSearchParams({turma: disciplina.turma, disciplina: disciplina.disciplina, page: disciplina.pagina, size: disciplina.tamanho});
+    const r = await fetch('/api/aulas?' + p.toString());
+    const dados = await r.json();
+    if (!disciplina) { return; }
+    disciplina.total = dados.totalElements;
+    const corpo = dados.content.length ? dados.content.map((a) => `<tr>
+            <td>${dataBr(a.dataAula)}</td><td>${a.horaInicio.slice(0, 5)} às ${a.horaFim.slice(0, 5)}</td>
+            <td>${esc(a.turma.nome)}</td><td>${esc(a.componenteCurricular.nome)}</td>
+            <td>${dataBr(a.dataCadastro)}</td><td>${esc(a.situacao)}</td><td><button>Ver</button></td></tr>`).join('')
+        : `<tr><td colspan="${CABECALHOS.length}">Nenhum registro encontrado</td></tr>`;
+    document.querySelector('#area-tabela tbody').innerHTML = corpo;
+    document.querySelectorAll('#area-tabela svg.animate-spin, #carregando').forEach((e) => e.remove());
+    const ultima = (disciplina.pagina + 1) * disciplina.tamanho >= disciplina.total;
+    const proxima = Array.from(document.querySelectorAll('#paginacao button')).find((b) => b.textContent === 'Próxima');
+    proxima.disabled = ultima;
+    document.getElementById('info-pagina').textContent = `Página ${disciplina.pagina + 1} de ${Math.max(1, Math.ceil(disciplina.total / disciplina.tamanho))}`;
+}
+
+function abrirTamanhos() {
+    document.getElementById('tamanhos').innerHTML = `<div class="z-50">${[10, 25, 50].map((n) => `<button onclick="mudarTamanho(${n})">${n}</button>`).join('')}</div>`;
+}
+
+function mudarTamanho(n) {
+    document.getElementById('tamanhos').innerHTML = '';
+    document.querySelector('#paginacao button[role=combobox]').textContent = `${n} Registros`;
+    disciplina.tamanho = n;
+    disciplina.pagina = 0;
+    carregarPagina();
+}
+
+function mudarPagina(delta) {
+    disciplina.pagina += delta;
+    carregarPagina();
+}
+
+// --- Formulário de nova aula (sem entrada no histórico, como no portal) ---
+function novaAula() {
+    formulario = {etapa: 0, data: null, mes: new Date(), recursos: []};
+    formulario.mes.setDate(1);
+    desenharEtapa();
+}
+
+function desenharEtapa() {
+    const nav = `<nav aria-label="Progress">${ETAPAS.map((e, i) => `<div${i === formulario.etapa ? ' aria-current="step"' : ''}>${e}</div>`).join('')}</nav>`;
+    let conteudo = '';
+    if (formulario.etapa === 0) {
+        conteudo = `
+            <div><label>Data da aula</label>
+                <button type="button" aria-haspopup="dialog" onclick="abrirCalendario()"><span>Escolha uma data</span> <span id="data-escolhida">${formulario.data ? dataBr(formulario.data) : ''}</span></button></div>
+            <div><label>Horário</label><select id="horario"><option value="">Selecione</option>${HORARIOS.map((h) => `<option>${h}</option>`).join('')}</select></div>
+            <div><label>Conteúdo abordado</label><textarea id="conteudo"></textarea></div>
+            <div><label>Estratégia metodológica</label><textarea id="estrategia"></textarea></div>
+            <p id="erro-etapa" role="alert"></p>
+            <button onclick="confirmarEtapa1()">Salvar e Avançar</button>`;
+    } else if (formulario.etapa === 1 || formulario.etapa === 2) {
+        conteudo = `<p>${ETAPAS[formulario.etapa]} (sem campos obrigatórios)</p><button onclick="avancar()">Salvar e Avançar</button>`;
+    } else if (formulario.etapa === 3) {
+        conteudo = `
+            <button onclick="abrirRecurso()">Adicionar novo recurso didático</button>
+            <table><thead><tr><th>Nome</th><th>Tipo</th><th>URL</th></tr></thead><tbody>
+            ${formulario.recursos.map((r) => `<tr><td>${esc(r.nome)}</td><td>${esc(r.tipo)}</td><td>${esc(r.url)}</td></tr>`).join('')}</tbody></table>
+            <button onclick="avancar()">Salvar e Avançar</button>`;
+    } else {
+        conteudo = `<p>Atividades (opcional)</p><button onclick="finalizar()">Salvar e Finalizar</button>`;
+    }
+    app.innerHTML = nav + `<div id="etapa">${conteudo}</div><div id="dialogos"></div>`;
+}
+
+function dialogo(html) { document.getElementById('dialogos').innerHTML = html; }
+function fecharDialogo() { document.getElementById('dialogos').innerHTML = ''; }
+
+function abrirCalendario() {
+    const m = formulario.mes;
+    const dias = new Date(m.getFullYear(), m.getMonth() + 1, 0).getDate();
+    let botoes = '';
+    for (let d = 1; d <= dias; d++) { botoes += `<button name="day" onclick="escolherDia(${d})">${d}</button>`; }
+    dialogo(`<div role="dialog" id="radix-:r${Date.now() % 1000}:">
+        <button name="previous-month" onclick="mudarMes(-1)">&lt;</button>
+        <div class="text-sm font-medium">${MESES[m.getMonth()]} ${m.getFullYear()}</div>
+        <button name="next-month" onclick="mudarMes(1)">&gt;</button>
+        <div>${botoes}</div></div>`);
+}
+
+function mudarMes(delta) {
+    formulario.mes = new Date(formulario.mes.getFullYear(), formulario.mes.getMonth() + delta, 1);
+    abrirCalendario();
+}
+
+function escolherDia(d) {
+    formulario.data = `${formulario.mes.getFullYear()}-${dois(formulario.mes.getMonth() + 1)}-${dois(d)}`;
+    document.getElementById('data-escolhida').textContent = dataBr(formulario.data);
+    fecharDialogo();
+}
+
+function confirmarEtapa1() {
+    dialogo(`<div role="dialog"><h2>Confirmação</h2><p>Deseja salvar a aula?</p><button onclick="salvarEtapa1()">Sim</button><button onclick="fecharDialogo()">Não</button></div>`);
+}
+
+async function salvarEtapa1() {
+    fecharDialogo();
+    formulario.horario = document.getElementById('horario').value;
+    formulario.conteudo = document.getElementById('conteudo').value;
+    formulario.estrategia = document.getElementById('estrategia').value;
+    const faltando = [!formulario.data && 'data', !formulario.horario && 'horário', !formulario.conteudo && 'conteúdo'].filter(Boolean);
+    if (faltando.length) { document.getElementById('erro-etapa').textContent = 'Preencha: ' + faltando.join(', '); return; }
+    avancar();
+}
+
+function avancar() { formulario.etapa += 1; desenharEtapa(); }
+
+function abrirRecurso() {
+    dialogo(`<div role="dialog"><h2>Adicionar/Editar recurso didático</h2>
+        <div><label>Tipo</label><button role="combobox" onclick="abrirTipos()">Selecione o tipo</button>
+            <div id="tipos"></div></div>
+        <div><label>Nome do recurso</label><div><input id="recurso-nome"></div></div>
+        <div><label>URL do recurso</label><div><input id="recurso-url"></div></div>
+        <div><label>Comentário</label><textarea id="recurso-comentario"></textarea></div>
+        <button onclick="fecharDialogo()">Cancelar</button>
+        <button class="bg-[#007521] text-white" onclick="salvarRecurso()">Salvar</button></div>`);
+}
+
+function abrirTipos() {
+    document.getElementById('tipos').innerHTML = `<div role="listbox">${['Link', 'Arquivo PDF', 'Vídeo'].map((t) =>
+        `<div role="option" onclick="escolherTipo('${t}')">${t}</div>`).join('')}</div>`;
+}
+
+function escolherTipo(t) {
+    formulario.tipoRecurso = t;
+    document.querySelector('#dialogos button[role=combobox]').textContent = t;
+    document.getElementById('tipos').innerHTML = '';
+}
+
+function salvarRecurso() {
+    formulario.recursos.push({
+        tipo: formulario.tipoRecurso || '', nome: document.getElementById('recurso-nome').value,
+        url: document.getElementById('recurso-url').value, comentario: document.getElementById('recurso-comentario').value,
+    });
+    desenharEtapa();
+}
+
+async function finalizar() {
+    const corpo = {
+        turma: disciplina.turma, disciplina: disciplina.disciplina, data: formulario.data, horario: formulario.horario,
+        conteudo: formulario.conteudo, estrategia: formulario.estrategia, recursos: formulario.recursos,
+    };
+    const r = await fetch('/api/aulas', {method: 'POST', headers: {'Content-Type': 'application/json'}, body: JSON.stringify(corpo)});
+    const mensagem = r.ok ? 'Aula registrada com sucesso.' : 'Não foi possível registrar a aula.';
+    dialogo(`<div role="dialog"><h2>Atenção</h2><p>${mensagem}</p><button onclick="fecharAtencao()">Fechar</button></div>`);
+}
+
+function fecharAtencao() {
+    formulario = null;
+    abrirDisciplina(disciplina.turma, disciplina.disciplina);
+}
+
+rotear();
+</script></body></html>
+"""
+
+
+class ManipuladorPortal(BaseHTTPRequestHandler):
+    """Atende as páginas e a API do portal simulado."""
+
+    estado = None
+    latencia = LATENCIA_PADRAO_MS / 1000
+
+    def log_message(self, formato, *args):
+        pass # O servidor é usado em medições; o log por requisição só atrapalharia a saída
+
+    def _responder(self, status, corpo, tipo='application/json; charset=utf-8', cabecalhos=None):
+        dados = corpo.encode('utf-8') if isinstance(corpo, str) else corpo
+        self.send_response(status)
+        self.send_header('Content-Type', tipo)
+        self.send_header('Content-Length', str(len(dados)))
+        self.send_header('Cache-Control', 'no-store')
+        for nome, valor in (cabecalhos or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def _json(self, status, dados, cabecalhos=None):
+        self._responder(status, json.dumps(dados, ensure_ascii=False), cabecalhos=cabecalhos)
+
+    def _autenticado(self):
+        cookie = SimpleCookie(self.headers.get('Cookie', ''))
+        return COOKIE_SESSAO in cookie and cookie[COOKIE_SESSAO].value in self.estado.sessoes
+
+    def _ler_corpo(self):
+        tamanho = int(self.headers.get('Content-Length') or 0)
+        try:
+            return json.loads(self.rfile.read(tamanho) or b'{}')
+        except ValueError:
+            return {}
+
+    def do_GET(self):
+        partes = urlsplit(self.path)
+        if partes.path == '/':
+            return self._responder(200, PAGINA_PRINCIPAL, 'text/html; charset=utf-8')
+        if partes.path == '/instituicao':
+            return self._responder(200, PAGINA_INSTITUICAO, 'text/html; charset=utf-8')
+        if partes.path == '/listagem-turmas':
+            pagina = PAGINA_TURMAS.replace('__HORARIOS__', json.dumps(HORARIOS, ensure_ascii=False))
+            return self._responder(200, pagina, 'text/html; charset=utf-8')
+        if not partes.path.startswith('/api/'):
+            return self._json(404, {'erro': 'não encontrado'})
+
+        time.sleep(self.latencia)
+        if not self._autenticado():
+            return self._json(401, {'erro': 'sessão inválida'})
+        if partes.path == '/api/sessao':
+            return self._json(200, {'ok': True})
+        if partes.path == '/api/turmas':
+            return self._json(200, self.estado.cards())
+        if partes.path == '/api/aulas':
+            parametros = {k: v[0] for k, v in parse_qs(partes.query).items()}
+            try:
+                pagina = max(0, int(parametros.get('page', 0)))
+                tamanho = min(TAMANHO_MAXIMO_PAGINA, max(1, int(parametros.get('size', 10))))
+            except ValueError:
+                return self._json(400, {'erro': 'paginação inválida'})
+            return self._json(200, self.estado.listar_aulas(parametros.get('turma'), parametros.get('disciplina'), pagina, tamanho))
+        return self._json(404, {'erro': 'não encontrado'})
+
+    def do_POST(self):
+        caminho = urlsplit(self.path).path
+        time.sleep(self.latencia)
+        dados = self._ler_corpo()
+        if caminho == '/api/login':
+            if not dados.get('username') or not dados.get('password'):
+                return self._json(401, {'erro': 'credenciais inválidas'})
+            token = secrets.token_hex(16)
+            self.estado.sessoes.add(token)
+            return self._json(200, {'ok': True}, {'Set-Cookie': f'{COOKIE_SESSAO}={token}; Path=/; HttpOnly'})
+        if not self._autenticado():
+            return self._json(401, {'erro': 'sessão inválida'})
+        if caminho == '/api/aulas':
+            aula = self.estado.registrar_aula(dados)
+            return self._json(201, aula) if aula else self._json(404, {'erro': 'turma/disciplina desconhecida'})
+        return self._json(404, {'erro': 'não encontrado'})
+
+
+def carregar_turmas(data_path):
+    """Usa as turmas reais do professor (turmas_com_disciplinas.json) ou as turmas de exemplo."""
+    caminho = os.path.join(data_path, 'turmas_com_disciplinas.json') if data_path else None
+    if caminho and os.path.exists(caminho):
+        with open(caminho, 'r', encoding='utf-8-sig') as f:
+            return json.load(f)
+    return TURMAS_EXEMPLO
+
+
+def iniciar_servidor(porta=PORTA_PADRAO, latencia_ms=LATENCIA_PADRAO_MS, linhas=LINHAS_PADRAO, data_path=None):
+    """
+    Cria o servidor do portal simulado (ainda não iniciado; chame serve_forever()).
+    Útil para iniciar o simulador em uma thread dentro de scripts de medição.
+    """
+    estado = EstadoPortal(carregar_turmas(data_path), linhas)
+    manipulador = type('ManipuladorConfigurado', (ManipuladorPortal,), {
+        'estado': estado, 'latencia': max(0, latencia_ms) / 1000,
+    })
+    return ThreadingHTTPServer(('127.0.0.1', porta), manipulador)
+
+
+if __name__ == '__main__':
+    PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    porta = int(argumento_cli('--porta', PORTA_PADRAO))
+    latencia_ms = int(argumento_cli('--latencia-ms', LATENCIA_PADRAO_MS))
+    linhas = int(argumento_cli('--linhas', LINHAS_PADRAO))
+    data_path = argumento_cli('--dados', os.path.join(PROJECT_ROOT, 'data'))
+
+    servidor = iniciar_servidor(porta, latencia_ms, linhas, data_path)
+    print(f"[Portal Simulado] Servindo em http://127.0.0.1:{porta}/#!/turmas")
+    print(f"[Portal Simulado] Latência da API: {latencia_ms} ms | Aulas por disciplina: {linhas}")
+    print("[Portal Simulado] Pressione Ctrl+C para encerrar.")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[Portal Simulado] Encerrado.")
+    finally:
+        servidor.server_close()
@@ -2,12 +2,14 @@ import os
 import re
 import json
 import ast # Usar ast.literal_eval em vez de eval para segurança
+from collections import OrderedDict
+from plano_aula import PlanoAula, disciplina_do_nome
 
 def find_plan_files(aulas_dir):
     """
     Escaneia o diretório 'aulas', encontra arquivos .txt pendentes (com 'Preencher')
-    e os agrupa por (turma, disciplina).
-    Retorna um dicionário: {(turma, disciplina): [lista_de_arquivos]}
+    e os agrupa por (turma, disciplina). Cada arquivo é lido uma única vez.
+    Retorna um dicionário: {(turma, disciplina): [lista de PlanoAula]}
     """
     grouped_files = {}
     total_txt_files = 0
@@ -26,28 +28,22 @@ def find_plan_files(aulas_dir):
             total_txt_files += 1
 
             file_path = os.path.join(turma_path, filename)
-            # CORREÇÃO: Atualiza a regex para corresponder ao novo formato de nome de arquivo
-            # que inclui o horário (ex: DISC_AAAAMMDD_HHMM.txt).
-            match = re.match(r'(.+)_(\d{8})_\d{4}\.txt$', filename)
-            if not match:
+            # Nome no formato DISC_AAAAMMDD_HHMM.txt
+            disciplina_curto = disciplina_do_nome(filename)
+            if not disciplina_curto:
                 continue
-            
-            disciplina_curto = match.group(1)
             chave_grupo = (turma_folder, disciplina_curto)
 
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                if 'Preencher' in content:
-                    if chave_grupo not in grouped_files:
-                        grouped_files[chave_grupo] = []
-                    grouped_files[chave_grupo].append(file_path)
+            plano = PlanoAula.ler(file_path)
+            if plano and plano.pendente:
+                grouped_files.setdefault(chave_grupo, []).append(plano)
     
     print(f"INFO: Encontrados {total_txt_files} arquivos .txt no total. Destes, os seguintes grupos contêm arquivos pendentes:")
     return grouped_files
 
 def display_menu_and_get_choice(grouped_files):
     """
-    Exibe um menu com as disciplinas pendentes e retorna a lista de arquivos a serem processados.
+    Exibe um menu com as disciplinas pendentes e retorna a lista de planos a serem processados.
     """
     if not grouped_files:
         return []
@@ -66,7 +62,7 @@ def display_menu_and_get_choice(grouped_files):
             choice = int(input("\nEscolha uma opção para preencher: "))
             if 0 <= choice <= len(options) + 1:
                 if choice == 0: return []
-                if choice == len(options) + 1: return [file for files in grouped_files.values() for file in files]
+                if choice == len(options) + 1: return [plano for planos in grouped_files.values() for plano in planos]
                 selected_key = options[choice - 1]
                 return grouped_files[selected_key]
             else:
@@ -74,6 +70,75 @@ def display_menu_and_get_choice(grouped_files):
         except ValueError:
             print("Entrada inválida. Por favor, digite um número.")
 
+ARQUIVO_INDICE_MD = 'indice_md.json'
+VERSAO_INDICE_MD = 1
+PADRAO_MD_AULA = re.compile(r'^aula_(\d+).*\.md$')
+ARQUIVO_CACHE_MD = 'cache_md.json'
+LIMITE_CACHE_MD = 5000 # Materiais mantidos no cache; os usados há mais tempo são descartados primeiro
+
+def construir_indice_md(inputs_dir):
+    """
+    Percorre 'aulas/inputs' uma única vez e mapeia (turma, disciplina, número da aula) para o
+    caminho do .md (relativo a 'inputs'). A turma e a disciplina são as duas primeiras pastas
+    do caminho; o .md pode estar em qualquer subpasta da disciplina.
+    Também retorna a data de modificação de cada pasta, usada para invalidar o cache.
+    """
+    indice = {}
+    pastas = {}
+    for root, dirs, files in os.walk(inputs_dir):
+        dirs.sort() # Ordem estável: o primeiro .md encontrado para cada aula é sempre o mesmo
+        relativo = os.path.relpath(root, inputs_dir)
+        pastas[relativo] = os.stat(root).st_mtime_ns
+        partes = [] if relativo == os.curdir else relativo.split(os.sep)
+        if len(partes) < 2:
+            continue
+        for file in sorted(files):
+            match = PADRAO_MD_AULA.match(file)
+            if match:
+                chave = (partes[0], partes[1], int(match.group(1)))
+                indice.setdefault(chave, os.path.join(relativo, file))
+    return indice, pastas
+
+def _indice_md_valido(inputs_dir, pastas):
+    # Criar, apagar ou renomear um arquivo ou subpasta altera a data de modificação da pasta que o contém
+    try:
+        return all(os.stat(os.path.join(inputs_dir, pasta)).st_mtime_ns == mtime for pasta, mtime in pastas.items())
+    except OSError:
+        return False
+
+def carregar_indice_md(inputs_dir, data_path):
+    """
+    Retorna o índice de MDs de `construir_indice_md`, reaproveitando o cache em
+    `data/indice_md.json` enquanto nenhuma pasta de 'inputs' tiver sido modificada.
+    """
+    caminho_cache = os.path.join(data_path, ARQUIVO_INDICE_MD)
+    if not os.path.exists(inputs_dir):
+        return {}
+    try:
+        with open(caminho_cache, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        if cache.get('versao') == VERSAO_INDICE_MD and _indice_md_valido(inputs_dir, cache['pastas']):
+            # Converte a chave string para tupla de forma segura usando ast.literal_eval
+            return {ast.literal_eval(k): v for k, v in cache['arquivos'].items()}
+    except (OSError, ValueError, SyntaxError, KeyError):
+        pass
+
+    indice, pastas = construir_indice_md(inputs_dir)
+    print(f"INFO: Índice de materiais (.md) reconstruído: {len(indice)} aula(s) encontradas em '{inputs_dir}'.")
+    try:
+        os.makedirs(data_path, exist_ok=True)
+        caminho_temp = caminho_cache + '.tmp'
+        with open(caminho_temp, 'w', encoding='utf-8') as f:
+            json.dump({
+                'versao': VERSAO_INDICE_MD,
+                'pastas': pastas,
+                'arquivos': {str(k): v for k, v in indice.items()}
+            }, f, ensure_ascii=False, indent=2)
+        os.replace(caminho_temp, caminho_cache)
+    except OSError as e:
+        print(f"AVISO: Não foi possível salvar o índice de materiais: {e}")
+    return indice
+
 def parse_md_content(md_path):
     """
     Extrai o título (primeira linha H1) e os objetivos de um arquivo Markdown.
@@ -112,6 +177,66 @@ def parse_md_content(md_path):
         print(f"  -> ERRO ao ler o arquivo MD '{os.path.basename(md_path)}': {e}")
         return None, None
 
+class CacheMd:
+    """
+    Cache persistente (`data/cache_md.json`) do título e dos objetivos extraídos de cada .md.
+
+    Cada entrada é identificada pelo caminho do arquivo e só vale enquanto a data de
+    modificação e o tamanho forem os mesmos; assim apenas os materiais alterados são lidos
+    de novo. Acima de LIMITE_CACHE_MD entradas, as usadas há mais tempo são descartadas (LRU).
+    """
+    def __init__(self, data_path, limite=LIMITE_CACHE_MD):
+        self.caminho = os.path.join(data_path, ARQUIVO_CACHE_MD)
+        self.limite = limite
+        self.entradas = OrderedDict()
+        self.alterado = False
+        self.acertos = 0
+        self.leituras = 0
+        try:
+            with open(self.caminho, 'r', encoding='utf-8') as f:
+                self.entradas = OrderedDict(json.load(f))
+        except (OSError, ValueError):
+            pass
+
+    def ler(self, md_path):
+        """Mesmo retorno de `parse_md_content`, lendo o arquivo apenas se ele mudou."""
+        chave = os.path.normcase(os.path.abspath(md_path))
+        try:
+            info = os.stat(md_path)
+        except OSError:
+            return parse_md_content(md_path)
+
+        entrada = self.entradas.get(chave)
+        if entrada and entrada['mtime_ns'] == info.st_mtime_ns and entrada['tamanho'] == info.st_size:
+            self.acertos += 1
+            if next(reversed(self.entradas)) != chave:
+                self.entradas.move_to_end(chave)
+                self.alterado = True
+            return entrada['titulo'], entrada['objetivos']
+
+        self.leituras += 1
+        title, objectives = parse_md_content(md_path)
+        if title is not None:
+            self.entradas[chave] = {'mtime_ns': info.st_mtime_ns, 'tamanho': info.st_size, 'titulo': title, 'objetivos': objectives}
+            self.entradas.move_to_end(chave)
+            while len(self.entradas) > self.limite:
+                self.entradas.popitem(last=False)
+            self.alterado = True
+        return title, objectives
+
+    def salvar(self):
+        if not self.alterado:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.caminho), exist_ok=True)
+            caminho_temp = self.caminho + '.tmp'
+            with open(caminho_temp, 'w', encoding='utf-8') as f:
+                json.dump(list(self.entradas.items()), f, ensure_ascii=False)
+            os.replace(caminho_temp, self.caminho)
+            self.alterado = False
+        except OSError as e:
+            print(f"AVISO: Não foi possível salvar o cache de materiais: {e}")
+
 def carregar_links_recursos(data_path):
     """
     Carrega um arquivo JSON centralizado que mapeia (turma, disciplina, aula) para um link.
@@ -132,11 +257,12 @@ def carregar_links_recursos(data_path):
                 print(f"AVISO: Chave JSON inválida ignorada: {k}")
     return links_recursos
 
-def update_plan_file(txt_path, title, objectives, link):
+def update_plan_file(plano, title, objectives, link):
     """
-    Atualiza o arquivo .txt com o título, objetivos e link extraídos,
-    respeitando o limite de caracteres para o comentário.
+    Atualiza o plano (PlanoAula já lido) com o título, objetivos e link extraídos,
+    respeitando o limite de caracteres para o comentário, e grava o arquivo em uma única escrita.
     """
+    txt_path = plano.caminho
     try:
         # Mapeamento de conteúdos e estratégias para aulas especiais
         conteudos_especiais = {
@@ -147,9 +273,6 @@ def update_plan_file(txt_path, title, objectives, link):
             "atividades praticas": ("Desenvolvimento de Atividades Práticas", "Execução de atividades práticas em laboratório para consolidar o conhecimento.")
         }
 
-        with open(txt_path, 'r', encoding='utf-8') as f:
-            original_content = f.read()
-
         conteudo_final = title
         estrategia_final = "Aula expositiva com uso de projetor e internet"
         recurso_titulo_final = title
@@ -174,15 +297,14 @@ def update_plan_file(txt_path, title, objectives, link):
             if len(recurso_comentario_final) > char_limit:
                 recurso_comentario_final = recurso_comentario_final[:char_limit - 3] + "..."
 
-        # Substitui os blocos no arquivo com os conteúdos finais
-        new_content = re.sub(r'(\[CONTEUDO\]\n)[\s\S]*?(\n\n\[ESTRATEGIA\])', f'\\1{conteudo_final}\\2', original_content)
-        new_content = re.sub(r'(\[ESTRATEGIA\]\n)[\s\S]*?(\n\n\[RECURSO_TITULO\])', f'\\1{estrategia_final}\\2', new_content)
-        new_content = re.sub(r'(\[RECURSO_TITULO\]\n)[\s\S]*?(\n\n\[RECURSO_LINK\])', f'\\1{recurso_titulo_final}\\2', new_content)
-        new_content = re.sub(r'(\[RECURSO_LINK\]\n)[\s\S]*?(\n\n\[RECURSO_COMENTARIO\])', f'\\1{recurso_link_final}\\2', new_content)
-        new_content = re.sub(r'(\[RECURSO_COMENTARIO\]\n)[\s\S]*', f'\\1{recurso_comentario_final}', new_content)
-
-        with open(txt_path, 'w', encoding='utf-8') as f:
-            f.write(new_content)
+        plano.blocos.update({
+            'CONTEUDO': conteudo_final,
+            'ESTRATEGIA': estrategia_final,
+            'RECURSO_TITULO': recurso_titulo_final,
+            'RECURSO_LINK': recurso_link_final,
+            'RECURSO_COMENTARIO': recurso_comentario_final,
+        })
+        plano.salvar()
         print(f"  -> SUCESSO: Arquivo '{os.path.basename(txt_path)}' preenchido.")
 
     except Exception as e:
@@ -199,31 +321,25 @@ if __name__ == "__main__":
     grouped_plan_files = find_plan_files(AULAS_DIR)
     plan_files_to_fill = display_menu_and_get_choice(grouped_plan_files)
     links_recursos_globais = carregar_links_recursos(DATA_DIR)
+    indice_md = carregar_indice_md(INPUTS_DIR, DATA_DIR) if plan_files_to_fill else {}
+    cache_md = CacheMd(DATA_DIR)
 
     if not plan_files_to_fill:
         print("\nNenhum plano de aula selecionado ou pendente. Encerrando.")
     else:
         print(f"\nIniciando preenchimento para {len(plan_files_to_fill)} arquivo(s) selecionado(s)...\n")
 
-    plan_files_to_fill.sort() # Garante uma ordem consistente de processamento
+    plan_files_to_fill.sort(key=lambda plano: plano.caminho) # Garante uma ordem consistente de processamento
 
-    for txt_path in plan_files_to_fill:
-        path_parts = txt_path.split(os.sep)
+    for plano in plan_files_to_fill:
+        path_parts = plano.caminho.split(os.sep)
         turma_folder = path_parts[-2]
         txt_filename = path_parts[-1]
 
-        # CORREÇÃO: Usa a regex correta que considera o horário no nome do arquivo.
-        # Isso extrai 'PROGRAMACAO_JOGOS_II' de 'PROGRAMACAO_JOGOS_II_20251114_1340.txt'.
-        match = re.match(r'(.+)_(\d{8})_\d{4}\.txt$', txt_filename)
-        disciplina_curto = match.group(1) if match else None
+        # Extrai 'PROGRAMACAO_JOGOS_II' de 'PROGRAMACAO_JOGOS_II_20251114_1340.txt'.
+        disciplina_curto = disciplina_do_nome(txt_filename)
+        aula_num = plano.aula # Número da aula já lido do cabeçalho do plano
 
-        aula_num = None
-        with open(txt_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                if line.startswith('# Aula:'):
-                    aula_num = int(line.split(':')[1].strip())
-                    break
-        
         if not disciplina_curto:
             print(f"  -> AVISO: Não foi possível extrair o nome da disciplina do arquivo '{txt_filename}'. Pulando.")
             continue
@@ -247,16 +363,9 @@ if __name__ == "__main__":
 
         md_input_folder = os.path.join(INPUTS_DIR, source_turma_folder, source_disciplina_curto)
         md_filename_prefix = f"aula_{aula_num:02d}" # Ex: "aula_01"
-        md_path = None
-        
-        if os.path.exists(md_input_folder):
-            # Procura o arquivo .md da aula recursivamente
-            for root, _, files in os.walk(md_input_folder):
-                if md_path: break
-                for file in files:
-                    if file.startswith(md_filename_prefix) and file.endswith('.md'):
-                        md_path = os.path.join(root, file)
-                        break
+        # Busca o arquivo .md da aula no índice (montado com uma única varredura de 'inputs')
+        md_relativo = indice_md.get((source_turma_folder, source_disciplina_curto, aula_num))
+        md_path = os.path.join(INPUTS_DIR, md_relativo) if md_relativo else None
 
         # Lógica unificada para buscar o link do recurso
         chave_link = (turma_folder.replace('_', 'º '), disciplina_curto, aula_num)
@@ -269,12 +378,15 @@ if __name__ == "__main__":
             title = disciplina_curto.replace('_', ' ').title()
             objectives = ""
         else:
-            title, objectives = parse_md_content(md_path)
+            title, objectives = cache_md.ler(md_path)
 
         if not title:
             print(f"  -> AVISO: Não foi possível extrair título do MD '{os.path.basename(md_path)}' nem usar um padrão. Pulando.")
             continue
         
-        update_plan_file(txt_path, title, objectives, recurso_link)
+        update_plan_file(plano, title, objectives, recurso_link)
 
+    cache_md.salvar()
+    if cache_md.acertos or cache_md.leituras:
+        print(f"\nINFO: Materiais .md: {cache_md.acertos} reaproveitado(s) do cache, {cache_md.leituras} lido(s) do disco.")
     print("\nPreenchimento finalizado.")
\ No newline at end of file
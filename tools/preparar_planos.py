@@ -1,9 +1,24 @@
+import hashlib
 import json
 import os
 import re
 from dateutil.relativedelta import relativedelta
 import sys
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from banco_aulas import BancoAulas, assinatura_historico
+from calendario_escolar import CalendarioEscolar
+from plano_aula import PlanoAula
+from solver_planejamento import resolver_alocacao
+
+ARQUIVO_INDICE_SLOTS = 'indice_slots.json'
+VERSAO_INDICE_SLOTS = 1
+PASTAS_IGNORADAS = ['inputs', 'logs', 'backups']
+ARQUIVO_MANIFESTO = 'manifesto_preenchimento.json'
+LIMITE_ESCRITA_PARALELA = 200 # A partir de quantos arquivos a geração usa o pool de threads
+MAX_THREADS_ESCRITA = 8
+MODO_GULOSO = 'guloso'
+MODO_SOLVER = 'solver'
 
 def normalizar_horario(horario_str):
     """Normaliza a string de horário para um formato consistente 'HH:MM-HH:MM'."""
@@ -39,152 +54,249 @@ def carregar_dados(data_path):
         print(f"ERRO ao carregar arquivos de configuração: {e}")
         exit(1)
 
+def _slots_do_historico(data_path, mapa_turmas):
+    """Slots das aulas confirmadas do histórico (consulta indexada no banco de aulas)."""
+    slots = []
+    banco = BancoAulas.abrir(data_path)
+    try:
+        for data_obj, horario, nome_turma_completo in banco.slots():
+            # Adiciona a turma à chave para evitar conflitos entre turmas
+            nome_turma_curto = mapa_turmas.get(nome_turma_completo)
+            if nome_turma_curto:
+                slots.append((data_obj.isoformat(), normalizar_horario(horario), nome_turma_curto))
+    finally:
+        banco.fechar()
+    return slots
+
+def _slot_do_plano(file_path, turma_folder):
+    """Lê o cabeçalho de um plano .txt e retorna o slot (data ISO, horário, turma) ou None."""
+    plano = PlanoAula.ler(file_path)
+    if not (plano and plano.data and plano.horario):
+        return None
+    try:
+        data_obj = datetime.strptime(plano.data, "%d/%m/%Y").date()
+    except ValueError:
+        return None
+    nome_turma_curto = turma_folder.replace('_', 'º ')
+    return (data_obj.isoformat(), normalizar_horario(plano.horario), nome_turma_curto)
+
+def _carregar_indice_slots(caminho):
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            indice = json.load(f)
+        if indice.get('versao') == VERSAO_INDICE_SLOTS:
+            return indice
+    except (OSError, ValueError):
+        pass
+    return {'versao': VERSAO_INDICE_SLOTS, 'historico': {'assinatura': None, 'slots': []}, 'planos': {}}
+
+def _salvar_indice_slots(caminho, indice):
+    caminho_temp = caminho + '.tmp'
+    with open(caminho_temp, 'w', encoding='utf-8') as f:
+        json.dump(indice, f, ensure_ascii=False)
+    os.replace(caminho_temp, caminho)
+
 def get_slots_ocupados(data_path, mapa_turmas):
-    """Lê todas as fontes e retorna um conjunto de slots ocupados."""
-    slots_ocupados = set()
-    
-    # Fonte 1: JSON de aulas coletadas
-    json_path = os.path.join(data_path, 'aulas_coletadas.json')
-    if os.path.exists(json_path):
+    """
+    Lê todas as fontes e retorna um conjunto de slots ocupados.
+
+    O resultado fica salvo em `data/indice_slots.json` e é atualizado de forma incremental:
+    o histórico só é consultado de novo quando ele (ou o mapa de turmas) muda, e um plano
+    .txt só é relido quando sua data de modificação ou tamanho mudam.
+    """
+    caminho_indice = os.path.join(data_path, ARQUIVO_INDICE_SLOTS)
+    indice = _carregar_indice_slots(caminho_indice)
+    alterado = False
+
+    # Fonte 1: aulas confirmadas do histórico de aulas coletadas
+    mapa_hash = hashlib.sha1(json.dumps(mapa_turmas, sort_keys=True).encode('utf-8')).hexdigest()
+    assinatura = f"{assinatura_historico(data_path)}#{mapa_hash}"
+    if indice['historico']['assinatura'] != assinatura:
         try:
-            with open(json_path, 'r', encoding='utf-8-sig') as f:
-                aulas_coletadas = json.load(f)
-            for aula in aulas_coletadas:
-                if aula.get('status') == 'Aula confirmada':
-                    data_obj = datetime.strptime(aula['dataAula'], "%d/%m/%Y").date()
-                    horario_normalizado = normalizar_horario(aula['horario'])
-                    # Adiciona a turma à chave para evitar conflitos entre turmas
-                    nome_turma_completo = aula.get('turma')
-                    nome_turma_curto = mapa_turmas.get(nome_turma_completo)
-                    if nome_turma_curto:
-                        slots_ocupados.add((data_obj, horario_normalizado, nome_turma_curto))
+            indice['historico'] = {'assinatura': assinatura, 'slots': _slots_do_historico(data_path, mapa_turmas)}
+            alterado = True
         except Exception as e:
-            print(f"AVISO: Não foi possível processar o arquivo JSON '{json_path}': {e}")
+            print(f"AVISO: Não foi possível processar o histórico de aulas coletadas: {e}")
 
     # Fonte 2: Arquivos .txt de planos de aula já gerados na pasta 'aulas'
+    planos_anteriores = indice['planos']
+    planos = {}
     aulas_path = os.path.join(os.path.dirname(data_path), 'aulas')
     if os.path.exists(aulas_path):
         for turma_folder in os.listdir(aulas_path):
             turma_path = os.path.join(aulas_path, turma_folder)
-            if not os.path.isdir(turma_path) or turma_folder in ['inputs', 'logs', 'backups']:
+            if not os.path.isdir(turma_path) or turma_folder in PASTAS_IGNORADAS:
                 continue
             
             for filename in os.listdir(turma_path):
-                if filename.endswith('.txt'):
-                    file_path = os.path.join(turma_path, filename)
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            content = f.read()
-                        
-                        data_match = re.search(r'# Data: (\d{2}/\d{2}/\d{4})', content)
-                        horario_match = re.search(r'# Horário: (.+)', content)
-                        
-                        if data_match and horario_match:
-                            data_obj = datetime.strptime(data_match.group(1), "%d/%m/%Y").date()
-                            horario_normalizado = normalizar_horario(horario_match.group(1))
-                            nome_turma_curto = turma_folder.replace('_', 'º ')
-                            slots_ocupados.add((data_obj, horario_normalizado, nome_turma_curto))
-                            
-                    except Exception as e:
-                        print(f"AVISO: Não foi possível processar o arquivo de plano '{filename}': {e}")
+                if not filename.endswith('.txt'):
+                    continue
+                file_path = os.path.join(turma_path, filename)
+                chave = f"{turma_folder}/{filename}"
+                try:
+                    info = os.stat(file_path)
+                    anterior = planos_anteriores.get(chave)
+                    if anterior and anterior['mtime_ns'] == info.st_mtime_ns and anterior['tamanho'] == info.st_size:
+                        planos[chave] = anterior
+                        continue
+                    planos[chave] = {'mtime_ns': info.st_mtime_ns, 'tamanho': info.st_size,
+                                     'slot': _slot_do_plano(file_path, turma_folder)}
+                    alterado = True
+                except Exception as e:
+                    print(f"AVISO: Não foi possível processar o arquivo de plano '{filename}': {e}")
+    if planos.keys() != planos_anteriores.keys():
+        alterado = True # Planos apagados desde a última execução
+    indice['planos'] = planos
+
+    if alterado:
+        try:
+            _salvar_indice_slots(caminho_indice, indice)
+        except OSError as e:
+            print(f"AVISO: Não foi possível salvar o índice de slots: {e}")
 
+    slots_ocupados = set()
+    slots_salvos = list(indice['historico']['slots']) + [plano['slot'] for plano in planos.values() if plano['slot']]
+    for data_iso, horario_normalizado, nome_turma_curto in slots_salvos:
+        slots_ocupados.add((date.fromisoformat(data_iso), horario_normalizado, nome_turma_curto))
     return slots_ocupados
 
-def get_datas_disciplina(aulas_coletadas, nome_turma_completo, nome_disciplina_completo):
+def get_datas_disciplina(banco, nome_turma_completo, nome_disciplina_completo):
     """Encontra a primeira e a última data de aula para uma disciplina específica."""
-    datas_aulas = []
-    for aula in aulas_coletadas:
-        if aula.get('turma') == nome_turma_completo and aula.get('componenteCurricular') == nome_disciplina_completo:
-            try:
-                # Considera apenas aulas com status que conta como hora/aula
-                if aula.get('status') in ['Aula confirmada', 'Aguardando confirmação']:
-                    datas_aulas.append(datetime.strptime(aula['dataAula'], "%d/%m/%Y").date())
-            except (ValueError, TypeError):
-                continue
-    if not datas_aulas:
-        return None, None
-    
-    return min(datas_aulas), max(datas_aulas)
+    # Considera apenas aulas com status que conta como hora/aula
+    return banco.datas_disciplina(nome_turma_completo, nome_disciplina_completo)
+
+def caminho_relativo_plano(aula):
+    """Caminho do plano .txt da aula, relativo à raiz do projeto (ex: 'aulas/1_A/MAT_20250310_0700.txt')."""
+    nome_pasta_turma = aula['nome_curto_turma'].replace('º', '_').replace(' ', '')
+    # CORREÇÃO: Adiciona o horário ao nome do arquivo para garantir unicidade
+    # quando há múltiplas aulas da mesma disciplina no mesmo dia.
+    horario_para_nome_arquivo = aula['horario'].split('-')[0].replace(':', '') # Pega 'HHMM' do início do horário
+    nome_arquivo = f"{aula['nome_curto_disciplina']}_{aula['data'].replace('-', '')}_{horario_para_nome_arquivo}.txt"
+    return os.path.join('aulas', nome_pasta_turma, nome_arquivo)
+
+def atribuir_caminhos(aulas_a_preparar):
+    """Calcula uma única vez o 'caminho_arquivo' de cada aula, usado na geração, no manifesto e na limpeza."""
+    for aula in aulas_a_preparar:
+        aula['caminho_arquivo'] = caminho_relativo_plano(aula)
+    return aulas_a_preparar
+
+def conteudo_esqueleto(aula):
+    data_obj = datetime.strptime(aula['data'], "%Y-%m-%d")
+    return PlanoAula.esqueleto(data_obj.strftime('%d/%m/%Y'), aula['numero_aula'], aula['horario']).renderizar()
+
+def escrever_atomico(caminho, conteudo):
+    """Grava em um arquivo temporário e o renomeia: o plano nunca fica pela metade no disco."""
+    caminho_temp = caminho + '.tmp'
+    with open(caminho_temp, 'w', encoding='utf-8') as f:
+        f.write(conteudo)
+    os.replace(caminho_temp, caminho)
+    info = os.stat(caminho)
+    return info.st_mtime_ns, info.st_size
 
 def gerar_arquivos_esqueleto(project_root, aulas_a_preparar):
+    """
+    Gera os arquivos .txt das aulas e retorna {caminho relativo: (mtime_ns, tamanho)} dos arquivos criados.
+    Lotes grandes são gravados por um pool de threads.
+    """
     if not aulas_a_preparar:
         print("\nNenhum arquivo de plano de aula a ser gerado.")
-        return
+        return {}
     print("\nGerando arquivos de plano de aula...")
-    arquivos_gerados_nesta_execucao = set()
 
+    # Só escreve no arquivo e exibe "Criado" se for a primeira vez para este arquivo.
+    # Para as demais aulas do mesmo dia, apenas informa que foi agrupado.
+    arquivos = {}
     for aula in aulas_a_preparar:
-        nome_pasta_turma = aula['nome_curto_turma'].replace('º', '_').replace(' ', '')
-        data_obj = datetime.strptime(aula['data'], "%Y-%m-%d")
-        # CORREÇÃO: Adiciona o horário ao nome do arquivo para garantir unicidade
-        # quando há múltiplas aulas da mesma disciplina no mesmo dia.
-        horario_para_nome_arquivo = aula['horario'].split('-')[0].replace(':', '') # Pega 'HHMM' do início do horário
-        nome_arquivo = f"{aula['nome_curto_disciplina']}_{data_obj.strftime('%Y%m%d')}_{horario_para_nome_arquivo}.txt"
-        caminho_pasta = os.path.join(project_root, 'aulas', nome_pasta_turma)
-        os.makedirs(caminho_pasta, exist_ok=True)
-        caminho_arquivo = os.path.join(caminho_pasta, nome_arquivo)
-        caminho_relativo = os.path.join('aulas', nome_pasta_turma, nome_arquivo)
-
-        conteudo_esqueleto = (
-            f"# Data: {data_obj.strftime('%d/%m/%Y')}\n"
-            f"# Aula: {aula['numero_aula']:02d}\n"
-            f"# Horário: {aula['horario']}\n\n"
-            "[CONTEUDO]\nPreencher o conteúdo abordado aqui.\n\n"
-            "[ESTRATEGIA]\nPreencher a estratégia metodológica aqui.\n\n"
-            "[RECURSO_TITULO]\n\n\n"
-            "[RECURSO_LINK]\n\n\n"
-            "[RECURSO_COMENTARIO]\n\n"
-        )
-        
-        # Só escreve no arquivo e exibe "Criado" se for a primeira vez para este arquivo.
-        # Para as demais aulas do mesmo dia, apenas informa que foi agrupado.
-        if caminho_arquivo not in arquivos_gerados_nesta_execucao:
-            with open(caminho_arquivo, 'w', encoding='utf-8') as f:
-                f.write(conteudo_esqueleto)
-            print(f"  -> Criado: {caminho_relativo}")
-            arquivos_gerados_nesta_execucao.add(caminho_arquivo)
+        caminho_relativo = aula.get('caminho_arquivo') or caminho_relativo_plano(aula)
+        if caminho_relativo not in arquivos:
+            arquivos[caminho_relativo] = conteudo_esqueleto(aula)
         else:
-            print(f"  -> Agrupado: Aula {aula['numero_aula']} no arquivo {os.path.basename(caminho_arquivo)}")
+            print(f"  -> Agrupado: Aula {aula['numero_aula']} no arquivo {os.path.basename(caminho_relativo)}")
 
-def salvar_manifesto_preenchimento(data_path, aulas_a_preparar):
-    """Salva um manifesto JSON com os detalhes das aulas a serem preenchidas."""
-    manifesto_path = os.path.join(data_path, 'manifesto_preenchimento.json')
+    for pasta in {os.path.dirname(caminho) for caminho in arquivos}:
+        os.makedirs(os.path.join(project_root, pasta), exist_ok=True)
+
+    def gravar(item):
+        caminho_relativo, conteudo = item
+        return caminho_relativo, escrever_atomico(os.path.join(project_root, caminho_relativo), conteudo)
+
+    if len(arquivos) >= LIMITE_ESCRITA_PARALELA:
+        with ThreadPoolExecutor(max_workers=MAX_THREADS_ESCRITA) as executor:
+            resultados = list(executor.map(gravar, arquivos.items()))
+    else:
+        resultados = [gravar(item) for item in arquivos.items()]
+
+    for caminho_relativo, _ in resultados:
+        print(f"  -> Criado: {caminho_relativo}")
+    return dict(resultados)
+
+def salvar_manifesto_preenchimento(data_path, aulas_a_preparar, arquivos_gerados=None):
+    """
+    Salva um manifesto JSON com os detalhes das aulas a serem preenchidas.
+    Cada entrada guarda também a data de modificação e o tamanho do esqueleto gerado, usados
+    por `limpar_planos_antigos` para reconhecer um plano ainda intocado sem abrir o arquivo.
+    """
+    manifesto_path = os.path.join(data_path, ARQUIVO_MANIFESTO)
+    arquivos_gerados = arquivos_gerados or {}
     manifesto_data = []
     for aula in aulas_a_preparar:
-        nome_pasta_turma = aula['nome_curto_turma'].replace('º', '_').replace(' ', '')
-        data_obj = datetime.strptime(aula['data'], "%Y-%m-%d")
-        horario_para_nome_arquivo = aula['horario'].split('-')[0].replace(':', '')
-        nome_arquivo = f"{aula['nome_curto_disciplina']}_{data_obj.strftime('%Y%m%d')}_{horario_para_nome_arquivo}.txt"
-        caminho_arquivo_relativo = os.path.join('aulas', nome_pasta_turma, nome_arquivo)
-        
         aula_info = aula.copy()
-        aula_info['caminho_arquivo'] = caminho_arquivo_relativo
+        aula_info['caminho_arquivo'] = aula.get('caminho_arquivo') or caminho_relativo_plano(aula)
+        if aula_info['caminho_arquivo'] in arquivos_gerados:
+            aula_info['mtime_ns'], aula_info['tamanho'] = arquivos_gerados[aula_info['caminho_arquivo']]
         manifesto_data.append(aula_info)
 
-    with open(manifesto_path, 'w', encoding='utf-8') as f:
+    os.makedirs(data_path, exist_ok=True)
+    caminho_temp = manifesto_path + '.tmp'
+    with open(caminho_temp, 'w', encoding='utf-8') as f:
         json.dump(manifesto_data, f, indent=4)
+    os.replace(caminho_temp, manifesto_path)
     print(f"\nINFO: Manifesto de preenchimento salvo em '{manifesto_path}'.")
 
+def _esqueletos_intocados(aulas_dir):
+    """Caminhos absolutos dos planos do último manifesto que continuam exatamente como foram gerados."""
+    raiz = os.path.dirname(aulas_dir)
+    manifesto_path = os.path.join(raiz, 'data', ARQUIVO_MANIFESTO)
+    try:
+        with open(manifesto_path, 'r', encoding='utf-8') as f:
+            entradas = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {
+        os.path.normcase(os.path.abspath(os.path.join(raiz, entrada['caminho_arquivo']))): (entrada['mtime_ns'], entrada['tamanho'])
+        for entrada in entradas
+        if entrada.get('caminho_arquivo') and 'mtime_ns' in entrada
+    }
+
 def limpar_planos_antigos(aulas_dir):
     """
-    Apaga todos os arquivos .txt de planos de aula existentes no diretório 'aulas'.
+    Apaga todos os arquivos .txt de planos de aula pendentes (ainda com 'Preencher') do diretório 'aulas'.
     Ignora subdiretórios como 'inputs' e arquivos de log.
+    Os esqueletos listados no manifesto e não modificados desde a geração são apagados sem
+    serem abertos; apenas os demais arquivos têm o conteúdo verificado.
     """
     print("\nLimpando arquivos de plano de aula (.txt) pendentes...")
+    intocados = _esqueletos_intocados(aulas_dir)
     arquivos_deletados = 0
     for root, dirs, files in os.walk(aulas_dir):
         # Ignora os diretórios especiais para não apagar arquivos neles
-        dirs[:] = [d for d in dirs if d not in ['inputs', 'logs', 'backups']]
+        dirs[:] = [d for d in dirs if d not in PASTAS_IGNORADAS]
         
         files_to_delete = []
         for file in files:
             if file.endswith('.txt') and 'backups' not in root:
                 file_path = os.path.join(root, file)
                 try:
-                    # Primeiro, verifica se o arquivo deve ser deletado
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    if 'Preencher' in content:
+                    # Esqueleto do manifesto que ninguém editou: pendente, sem precisar ler o conteúdo
+                    registro = intocados.get(os.path.normcase(os.path.abspath(file_path)))
+                    if registro:
+                        info = os.stat(file_path)
+                        if (info.st_mtime_ns, info.st_size) == tuple(registro):
+                            files_to_delete.append(file_path)
+                            continue
+                    # Demais arquivos: verifica o conteúdo
+                    plano = PlanoAula.ler(file_path)
+                    if plano and plano.pendente:
                         files_to_delete.append(file_path)
                 except Exception as e:
                     print(f"  -> ERRO ao ler o arquivo '{file_path}' para verificação: {e}")
@@ -198,6 +310,44 @@ def limpar_planos_antigos(aulas_dir):
 
     print(f"  -> {arquivos_deletados} arquivo(s) de plano pendente(s) foram removidos.")
 
+def resolver_modo_planejamento(config):
+    """Modo de alocação: '--solver' na linha de comando > "modo_planejamento" do config.json > guloso."""
+    if '--solver' in sys.argv:
+        return MODO_SOLVER
+    modo = str((config or {}).get('modo_planejamento') or MODO_GULOSO).strip().lower()
+    return MODO_SOLVER if modo == MODO_SOLVER else MODO_GULOSO
+
+def alocar_com_solver(demandas):
+    """Resolve todas as demandas de uma vez e retorna as aulas a preparar, relatando se for inviável."""
+    print(f"\n[Solver] Alocando {sum(d['necessarias'] for d in demandas)} aulas de {len(demandas)} disciplinas simultaneamente...")
+    alocacao, gargalo = resolver_alocacao(demandas)
+
+    if gargalo:
+        print("\n[Solver] PLANEJAMENTO INVIÁVEL: não há slots livres suficientes para cumprir a carga horária.")
+        print(f"  -> As disciplinas abaixo precisam de {gargalo['necessarias']} aulas, mas disputam apenas "
+              f"{gargalo['disponiveis']} slots livres (faltam {gargalo['necessarias'] - gargalo['disponiveis']}):")
+        for i in gargalo['demandas']:
+            demanda = demandas[i]
+            print(f"     - {demanda['nome_curto_turma']} / {demanda['nome_curto_disciplina']}: "
+                  f"precisa de {demanda['necessarias']}, alocadas {len(alocacao[i])}, "
+                  f"{len(demanda['candidatos'])} slots candidatos.")
+        print("  -> Revise as janelas de 'restricoes_planejamento', os horários semanais ou a carga horária. "
+              "As aulas possíveis foram alocadas mesmo assim.")
+    else:
+        print("[Solver] Todas as disciplinas cabem nos slots livres.")
+
+    aulas_a_preparar = []
+    for demanda, slots in zip(demandas, alocacao):
+        for numero, (data_aula, horario_aula, _) in enumerate(slots, start=demanda['horas_registradas'] + 1):
+            aulas_a_preparar.append({
+                "data": data_aula.strftime("%Y-%m-%d"),
+                "horario": horario_aula,
+                "nome_curto_turma": demanda['nome_curto_turma'],
+                "nome_curto_disciplina": demanda['nome_curto_disciplina'],
+                "numero_aula": numero
+            })
+    return aulas_a_preparar
+
 class Logger:
     """Redireciona a saída do console (stdout) para um arquivo de log e para o terminal."""
     def __init__(self, filepath):
@@ -215,179 +365,347 @@ class Logger:
     def close(self):
         self.log.close()
 
-def planejar_e_preparar_aulas(dados_carregados, aulas_coletadas, aulas_dir):
+# Mapeamento para forçar disciplinas anuais a usarem um horário genérico.
+# Isso evita que caiam na lógica de 'DISC_MENSAL' ou fiquem sem horário.
+MAPA_DISCIPLINAS_PARA_ANUAL = {
+    "COMPUT": "DISC_ANUAL",
+    "PENSAMENTO_COMPUTACIONAL_DES_SIST": "DISC_ANUAL",
+    "MENTORIAS_TEC_DES_SIST": "DISC_ANUAL",
+    "PENSAMENTO_COMPUTACIONAL_JOGOS": "DISC_ANUAL",
+    "MENTORIAS_TEC_JOGOS": "DISC_ANUAL"
+    # Adicione outros códigos de disciplina anuais aqui se necessário
+}
+CODIGOS_GENERICOS = ('DISC_ANUAL', 'DISC_MENSAL')
+PASTA_PROFESSORES = 'professores' # Raiz das pastas dos demais professores no modo --todos-professores
+
+def resolver_professor(horarios, nome_configurado):
     """
-    Função principal que executa a lógica de planejamento e preparação dos arquivos.
-    Agora pode ser chamada por outros scripts.
+    Encontra o professor de `horarios_semanais_oficial.json` que corresponde ao "professor" do
+    config.json. As regras são tentadas em ordem, sempre por palavras inteiras: nome exato,
+    primeiro nome igual à chave e chave como início do nome (ex: 'Hélio Lima' -> 'Hélio',
+    mas 'Mariana Souza' não corresponde a 'Maria').
+    Se o arquivo tiver um único professor, ele é usado. Retorna None se não houver correspondência
+    ou se mais de um professor corresponder à mesma regra.
     """
-    turmas_disciplinas, calendario, horarios, mapa_turmas, feriados_data, config = dados_carregados
-    PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    professores = horarios.get('professores', {})
+    if nome_configurado in professores:
+        return nome_configurado
+    nome = ' '.join((nome_configurado or '').split()).lower()
+    if nome:
+        chaves = {chave: ' '.join(chave.split()).lower() for chave in professores}
+        regras = (
+            ('nome exato', lambda chave: chave == nome),
+            ('primeiro nome', lambda chave: chave == nome.split()[0]),
+            ('início do nome', lambda chave: chave and nome.startswith(chave + ' ')),
+        )
+        for descricao, corresponde in regras:
+            encontrados = [chave for chave, normalizada in chaves.items() if corresponde(normalizada)]
+            if len(encontrados) == 1:
+                return encontrados[0]
+            if encontrados:
+                print(f"AVISO: '{nome_configurado}' corresponde a mais de um professor ({descricao}): "
+                      f"{', '.join(encontrados)}. Use o nome exato no config.json.")
+                return None
+    if len(professores) == 1:
+        return next(iter(professores))
+    return None
+
+def nome_pasta_professor(nome_professor):
+    return re.sub(r'[^\w-]+', '_', nome_professor).strip('_') or 'professor'
+
+def turmas_do_horario(horarios_turmas, mapa_turmas):
+    """
+    Monta uma lista no formato de `turmas_com_disciplinas.json` a partir do horário semanal,
+    para professores que ainda não têm a lista coletada do portal. O código da disciplina
+    é usado também como nome.
+    """
+    mapa_turmas_reverso = {curto: completo for completo, curto in mapa_turmas.items()}
+    turmas = []
+    for nome_turma_curto, disciplinas in horarios_turmas.items():
+        nome_turma_completo = mapa_turmas_reverso.get(nome_turma_curto)
+        if not nome_turma_completo:
+            print(f"    -> AVISO: Turma '{nome_turma_curto}' não está no mapa_turmas.json. Pulando.")
+            continue
+        turmas.append({
+            'nomeTurma': nome_turma_completo,
+            'disciplinas': [
+                {'codigoDisciplina': codigo, 'nomeDisciplina': codigo}
+                for codigo in disciplinas if codigo not in CODIGOS_GENERICOS
+            ]
+        })
+    return turmas
+
+class ContextoPlanejamento:
+    """Dados compartilhados por todos os professores de uma execução, calculados uma única vez."""
+    def __init__(self, dados_carregados):
+        _, calendario, horarios, mapa_turmas, feriados_data, config = dados_carregados
+        self.horarios = horarios
+        self.mapa_turmas = mapa_turmas
+        self.config = config
+        self.modo = resolver_modo_planejamento(config)
+        self.carga_horaria_padrao = calendario.get('carga_horaria_padrao_disciplina', 40)
+        # Carrega a lista de disciplinas mensais para a lógica de seleção de horário
+        self.disciplinas_mensais = set(d.upper() for d in calendario.get('disciplinas_config', {}).get('mensais', []))
+        # Dias letivos do ano (sem fins de semana e feriados)
+        self.calendario_escolar = CalendarioEscolar.de_dados(calendario, feriados_data)
+        self.restricoes = {
+            codigo: (datetime.strptime(r['data_inicio'], "%d/%m/%Y").date(), datetime.strptime(r['data_fim'], "%d/%m/%Y").date())
+            for codigo, r in calendario.get('restricoes_planejamento', {}).items()
+        }
 
-    LOGS_DIR = os.path.join(aulas_dir, 'logs') # Diretório específico para logs
-    os.makedirs(LOGS_DIR, exist_ok=True)
+    def horarios_professor(self, nome_professor):
+        return self.horarios.get('professores', {}).get(nome_professor, {}).get('turmas', {})
 
-    log_filename = f"log_preparacao_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
-    log_filepath = os.path.join(LOGS_DIR, log_filename)
-    sys.stdout = Logger(log_filepath)
-    print(f"--- Log de preparação de planos iniciado. Salvo em: {log_filepath} ---")
+def planejar_professor(contexto, horarios_turmas, turmas_disciplinas, banco, slots_ocupados):
+    """
+    Planeja as aulas que faltam para as disciplinas de um professor e retorna a lista de aulas a preparar.
+    Os slots usados são acrescentados a 'slots_ocupados', que pode ser compartilhado entre professores.
+    """
+    # 1. Contagem de horas para saber o progresso de cada disciplina
+    # CORREÇÃO: Contar aulas confirmadas e pendentes para a carga horária.
+    contagem_horas = banco.contagem_por_disciplina()
+    carga_horaria_padrao = contexto.carga_horaria_padrao
 
-    try:
-        # 1. Contagem de horas para saber o progresso de cada disciplina
-        # Mapeamento para forçar disciplinas anuais a usarem um horário genérico.
-        # Isso evita que caiam na lógica de 'DISC_MENSAL' ou fiquem sem horário.
-        mapa_disciplinas_para_anual = {
-            "COMPUT": "DISC_ANUAL",
-            "PENSAMENTO_COMPUTACIONAL_DES_SIST": "DISC_ANUAL",
-            "MENTORIAS_TEC_DES_SIST": "DISC_ANUAL",
-            "PENSAMENTO_COMPUTACIONAL_JOGOS": "DISC_ANUAL",
-            "MENTORIAS_TEC_JOGOS": "DISC_ANUAL"
-            # Adicione outros códigos de disciplina anuais aqui se necessário
-        }
+    aulas_a_preparar = []
+    demandas_solver = [] # No modo solver, as disciplinas são alocadas juntas depois do laço
 
-        contagem_horas = {}
-        for aula in aulas_coletadas:
-            # CORREÇÃO: Contar aulas confirmadas e pendentes para a carga horária.
-            if aula.get('status') in ['Aula confirmada', 'Aguardando confirmação']:
-                chave_contagem = (aula['turma'], aula['componenteCurricular'])
-                contagem_horas[chave_contagem] = contagem_horas.get(chave_contagem, 0) + 1
+    for turma_info in turmas_disciplinas:
+        nome_turma_completo = turma_info['nomeTurma']
+        nome_turma_curto = contexto.mapa_turmas.get(nome_turma_completo)
+        if not nome_turma_curto: continue
 
-        # 2. Obter todos os slots já ocupados para evitar conflitos
-        DATA_PATH = os.path.join(PROJECT_ROOT, 'data')
-        slots_ocupados = get_slots_ocupados(DATA_PATH, mapa_turmas)
-        print(f"\nEncontrados {len(slots_ocupados)} slots de horário já ocupados (de JSON e planos .txt).")
+        print(f"\n--- Verificando Turma: {nome_turma_curto} ({nome_turma_completo}) ---")
 
-        # 3. Lógica de planejamento
-        aulas_a_preparar = []
-        carga_horaria_padrao = calendario.get('carga_horaria_padrao_disciplina', 40)
-        disciplinas_anuais_config = set(d.upper() for d in calendario.get('disciplinas_config', {}).get('anuais', []))
+        for disciplina_info in turma_info['disciplinas']:
+            nome_disciplina_completo = disciplina_info['nomeDisciplina']
+            horas_registradas = contagem_horas.get((nome_turma_completo, nome_disciplina_completo), 0)
 
-        for turma_info in turmas_disciplinas:
-            nome_turma_completo = turma_info['nomeTurma']
-            nome_turma_curto = mapa_turmas.get(nome_turma_completo)
-            if not nome_turma_curto: continue
+            if horas_registradas >= carga_horaria_padrao:
+                print(f"  - '{nome_disciplina_completo}': Completa ({horas_registradas}/{carga_horaria_padrao}h).")
+                continue
 
-            print(f"\n--- Verificando Turma: {nome_turma_curto} ({nome_turma_completo}) ---")
+            print(f"  - '{nome_disciplina_completo}': Incompleta ({horas_registradas}/{carga_horaria_padrao}h). Planejando aulas...")
 
-            for disciplina_info in turma_info['disciplinas']:
-                nome_disciplina_completo = disciplina_info['nomeDisciplina']
-                horas_registradas = contagem_horas.get((nome_turma_completo, nome_disciplina_completo), 0)
+            horarios_turma = horarios_turmas.get(nome_turma_curto, {})
+            codigo_disciplina_completo = disciplina_info['codigoDisciplina']
+            
+            # Lógica de busca de horário com fallback
+            # 1. Tenta encontrar pelo código específico da disciplina (ex: 'COMPUT')
+            horarios_disciplina = horarios_turma.get(codigo_disciplina_completo)
 
-                if horas_registradas >= carga_horaria_padrao:
-                    print(f"  - '{nome_disciplina_completo}': Completa ({horas_registradas}/{carga_horaria_padrao}h).")
-                    continue
+            # 2. Se não encontrou, e a disciplina está no mapa de anuais, tenta pelo genérico 'DISC_ANUAL'
+            if not horarios_disciplina and codigo_disciplina_completo in MAPA_DISCIPLINAS_PARA_ANUAL:
+                horarios_disciplina = horarios_turma.get(MAPA_DISCIPLINAS_PARA_ANUAL[codigo_disciplina_completo])
+            
+            # 3. Se ainda não encontrou e é uma disciplina mensal, tenta pelo genérico 'DISC_MENSAL'
+            if not horarios_disciplina and nome_disciplina_completo.upper() in contexto.disciplinas_mensais:
+                print(f"    -> Disciplina '{nome_disciplina_completo}' é mensal. Usando horários de 'DISC_MENSAL'.") # Sem 'and not horarios_disciplina'
+                horarios_disciplina = horarios_turma.get('DISC_MENSAL')
+            if not horarios_disciplina:
+                print(f"    -> AVISO: Nenhum horário encontrado para esta disciplina. Pulando.")
+                continue
 
-                print(f"  - '{nome_disciplina_completo}': Incompleta ({horas_registradas}/{carga_horaria_padrao}h). Planejando aulas...")
+            # --- LÓGICA DE RESTRIÇÃO DE DATAS ---
+            # Verifica se há uma restrição de planejamento para a disciplina
+            data_inicio_planejamento = contexto.calendario_escolar.inicio
+            data_fim_planejamento = contexto.calendario_escolar.fim
 
-                # Carrega a lista de disciplinas mensais para a lógica de seleção de horário
-                disciplinas_mensais_config = set(d.upper() for d in calendario.get('disciplinas_config', {}).get('mensais', []))
+            if codigo_disciplina_completo in contexto.restricoes:
+                data_inicio_planejamento, data_fim_planejamento = contexto.restricoes[codigo_disciplina_completo]
+                print(f"    -> APLICANDO RESTRIÇÃO DE PLANEJAMENTO: De {data_inicio_planejamento.strftime('%d/%m/%Y')} a {data_fim_planejamento.strftime('%d/%m/%Y')}.")
 
-                horarios_turma = horarios.get('professores', {}).get('Hélio', {}).get('turmas', {}).get(nome_turma_curto, {})
-                codigo_disciplina_completo = disciplina_info['codigoDisciplina']
+            aulas_a_planejar_contador = horas_registradas
+            
+            # --- NOVA LÓGICA UNIFICADA ---
+            # 1. Gerar todos os slots possíveis para a disciplina no ano letivo.
+            print(f"    -> Mapeando todos os horários possíveis de {data_inicio_planejamento.strftime('%d/%m/%Y')} a {data_fim_planejamento.strftime('%d/%m/%Y')}.")
+            padrao_semanal = [(h['dia_semana_nome'], normalizar_horario(h['label_horario'])) for h in horarios_disciplina]
+            slots_potenciais = [
+                (data_slot, horario_slot, nome_turma_curto)
+                for data_slot, horario_slot in contexto.calendario_escolar.slots(padrao_semanal, data_inicio_planejamento, data_fim_planejamento)
+            ]
+
+            # 2. Filtrar os slots que já estão ocupados.
+            slots_livres = [slot for slot in slots_potenciais if slot not in slots_ocupados]
+            
+            # Os slots já vêm ordenados por data e depois por horário do calendário.
+            # Isso garante que o planejamento preencha todos os horários de um dia antes de passar para o próximo.
+            print(f"    -> Encontrados {len(slots_potenciais)} slots potenciais. Destes, {len(slots_livres)} estão livres.")
+
+            # 3. Preencher as aulas necessárias usando os slots livres.
+            aulas_necessarias = carga_horaria_padrao - horas_registradas
+            if contexto.modo == MODO_SOLVER:
+                demandas_solver.append({
+                    "nome_curto_turma": nome_turma_curto,
+                    "nome_curto_disciplina": disciplina_info['codigoDisciplina'],
+                    "horas_registradas": horas_registradas,
+                    "necessarias": aulas_necessarias,
+                    "candidatos": slots_livres
+                })
+                continue
+            for i in range(min(aulas_necessarias, len(slots_livres))):
+                slot_livre = slots_livres[i]
+                data_aula, horario_aula, _ = slot_livre
+                aulas_a_planejar_contador += 1
                 
-                # Lógica de busca de horário com fallback
-                # 1. Tenta encontrar pelo código específico da disciplina (ex: 'COMPUT')
-                horarios_disciplina = horarios_turma.get(codigo_disciplina_completo)
+                aulas_a_preparar.append({
+                    "data": data_aula.strftime("%Y-%m-%d"),
+                    "horario": horario_aula, # Mantém o formato normalizado HH:MM-HH:MM
+                    "nome_curto_turma": nome_turma_curto,
+                    "nome_curto_disciplina": disciplina_info['codigoDisciplina'],
+                    "numero_aula": aulas_a_planejar_contador
+                })
+                slots_ocupados.add(slot_livre) # Adiciona ao conjunto de ocupados para não ser usado por outra disciplina no mesmo run
+
+    if demandas_solver:
+        aulas_a_preparar = alocar_com_solver(demandas_solver)
+        for aula in aulas_a_preparar:
+            slots_ocupados.add((datetime.strptime(aula['data'], "%Y-%m-%d").date(), aula['horario'], aula['nome_curto_turma']))
+
+    return aulas_a_preparar
+
+def confirmar_e_gerar(planejamentos):
+    """
+    Pede uma única confirmação e gera os arquivos .txt e o manifesto de cada professor.
+    'planejamentos' é uma lista de dicts com 'professor', 'raiz' (pasta com 'data/' e 'aulas/'),
+    'aulas_dir' e 'aulas' (aulas a preparar).
+    """
+    total = sum(len(p['aulas']) for p in planejamentos)
+    if not total:
+        print("\nNenhuma aula nova a ser planejada. A grade parece estar em dia.")
+        return
 
-                # 2. Se não encontrou, e a disciplina está no mapa de anuais, tenta pelo genérico 'DISC_ANUAL'
-                if not horarios_disciplina and codigo_disciplina_completo in mapa_disciplinas_para_anual:
-                    horarios_disciplina = horarios_turma.get(mapa_disciplinas_para_anual[codigo_disciplina_completo])
-                
-                # 3. Se ainda não encontrou e é uma disciplina mensal, tenta pelo genérico 'DISC_MENSAL'
-                if not horarios_disciplina and nome_disciplina_completo.upper() in disciplinas_mensais_config:
-                    print(f"    -> Disciplina '{nome_disciplina_completo}' é mensal. Usando horários de 'DISC_MENSAL'.") # Sem 'and not horarios_disciplina'
-                    horarios_disciplina = horarios_turma.get('DISC_MENSAL')
-                if not horarios_disciplina:
-                    print(f"    -> AVISO: Nenhum horário encontrado para esta disciplina. Pulando.")
-                    continue
+    if len(planejamentos) > 1:
+        print("\nResumo por professor:")
+        for planejamento in planejamentos:
+            print(f"  - {planejamento['professor']}: {len(planejamento['aulas'])} aula(s) em '{planejamento['raiz']}'")
+    print(f"\nResumo: {total} arquivos de plano de aula prontos para serem gerados.")
+    # A entrada do usuário virá do terminal real, não do log
+    confirmacao = input("Deseja criar estes arquivos .txt? (s/n): ").lower()
+    if confirmacao != 's':
+        print("\nOperação cancelada pelo usuário. Nenhum arquivo foi gerado.")
+        return
 
-                data_inicio_ano = datetime.strptime(calendario['data_inicio'], "%d/%m/%Y").date()
-                data_fim_ano = datetime.strptime(calendario['data_fim'], "%d/%m/%Y").date()
-                feriados_set = {datetime.strptime(f['data'], "%d/%m/%Y").date() for f in feriados_data.get('feriados', [])}
-                dias_semana_map = {"segunda-feira": 0, "terça-feira": 1, "quarta-feira": 2, "quinta-feira": 3, "sexta-feira": 4}
-                
-                primeira_data_registrada, ultima_data_registrada = get_datas_disciplina(aulas_coletadas, nome_turma_completo, nome_disciplina_completo)
+    for planejamento in planejamentos:
+        if not planejamento['aulas']:
+            continue
+        if len(planejamentos) > 1:
+            print(f"\n=== Professor: {planejamento['professor']} ===")
+        atribuir_caminhos(planejamento['aulas'])
+        # Limpa os arquivos pendentes ANTES de gerar os novos, usando o caminho recebido
+        limpar_planos_antigos(planejamento['aulas_dir'])
+        arquivos_gerados = gerar_arquivos_esqueleto(planejamento['raiz'], planejamento['aulas'])
+        salvar_manifesto_preenchimento(os.path.join(planejamento['raiz'], 'data'), planejamento['aulas'], arquivos_gerados)
+    print("\nPreparação concluída. Preencha os arquivos gerados na pasta 'aulas' antes de executar o 'registrar_aulas.py'.")
+
+def _iniciar_log(aulas_dir):
+    LOGS_DIR = os.path.join(aulas_dir, 'logs') # Diretório específico para logs
+    os.makedirs(LOGS_DIR, exist_ok=True)
 
-                # --- LÓGICA DE RESTRIÇÃO DE DATAS ---
-                # Verifica se há uma restrição de planejamento para a disciplina
-                restricoes = calendario.get('restricoes_planejamento', {}).get(disciplina_info['codigoDisciplina'])
-                
-                data_inicio_planejamento = data_inicio_ano
-                data_fim_planejamento = data_fim_ano
+    log_filename = f"log_preparacao_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+    log_filepath = os.path.join(LOGS_DIR, log_filename)
+    sys.stdout = Logger(log_filepath)
+    print(f"--- Log de preparação de planos iniciado. Salvo em: {log_filepath} ---")
 
-                if restricoes:
-                    data_inicio_planejamento = datetime.strptime(restricoes['data_inicio'], "%d/%m/%Y").date()
-                    data_fim_planejamento = datetime.strptime(restricoes['data_fim'], "%d/%m/%Y").date()
-                    print(f"    -> APLICANDO RESTRIÇÃO DE PLANEJAMENTO: De {data_inicio_planejamento.strftime('%d/%m/%Y')} a {data_fim_planejamento.strftime('%d/%m/%Y')}.")
+def _encerrar_log():
+    # Garante que o log seja fechado e o stdout restaurado, mesmo se ocorrer um erro
+    if isinstance(sys.stdout, Logger):
+        # Adiciona uma linha final ao log antes de fechar
+        print("\n--- Fim do log de preparação ---")
+        sys.stdout.close()
+        sys.stdout = sys.stdout.terminal
 
-                aulas_a_planejar_contador = horas_registradas
-                
-                # --- NOVA LÓGICA UNIFICADA ---
-                # 1. Gerar todos os slots possíveis para a disciplina no ano letivo.
-                slots_potenciais = []
-                data_atual = data_inicio_planejamento
-                print(f"    -> Mapeando todos os horários possíveis de {data_inicio_planejamento.strftime('%d/%m/%Y')} a {data_fim_planejamento.strftime('%d/%m/%Y')}.")
-                
-                while data_atual <= data_fim_planejamento:
-                    if data_atual.weekday() >= 5 or data_atual in feriados_set:
-                        data_atual += timedelta(days=1)
-                        continue
-                    
-                    dia_semana_nome = list(dias_semana_map.keys())[data_atual.weekday()]
-                    for horario_info in horarios_disciplina:
-                        if horario_info['dia_semana_nome'] == dia_semana_nome:
-                            horario_normalizado = normalizar_horario(horario_info['label_horario'])
-                            chave_slot = (data_atual, horario_normalizado, nome_turma_curto)
-                            slots_potenciais.append(chave_slot)
-                    data_atual += timedelta(days=1)
-
-                # 2. Filtrar os slots que já estão ocupados.
-                slots_livres = [slot for slot in slots_potenciais if slot not in slots_ocupados]
-                
-                # CORREÇÃO: Ordenar os slots livres por data e depois por horário.
-                # Isso garante que o planejamento preencha todos os horários de um dia antes de passar para o próximo.
-                slots_livres.sort(key=lambda x: (x[0], x[1]))
-                print(f"    -> Encontrados {len(slots_potenciais)} slots potenciais. Destes, {len(slots_livres)} estão livres.")
-
-                # 3. Preencher as aulas necessárias usando os slots livres.
-                aulas_necessarias = carga_horaria_padrao - horas_registradas
-                for i in range(min(aulas_necessarias, len(slots_livres))):
-                    slot_livre = slots_livres[i]
-                    data_aula, horario_aula, _ = slot_livre
-                    aulas_a_planejar_contador += 1
-                    
-                    aulas_a_preparar.append({
-                        "data": data_aula.strftime("%Y-%m-%d"),
-                        "horario": horario_aula, # Mantém o formato normalizado HH:MM-HH:MM
-                        "nome_curto_turma": nome_turma_curto,
-                        "nome_curto_disciplina": disciplina_info['codigoDisciplina'],
-                        "numero_aula": aulas_a_planejar_contador
-                    })
-                    slots_ocupados.add(slot_livre) # Adiciona ao conjunto de ocupados para não ser usado por outra disciplina no mesmo run
+def planejar_e_preparar_aulas(dados_carregados, aulas_coletadas, aulas_dir):
+    """
+    Função principal que executa a lógica de planejamento e preparação dos arquivos.
+    Agora pode ser chamada por outros scripts.
+    'aulas_coletadas' pode ser um BancoAulas ou uma lista de aulas (carregada num banco em memória).
+    O professor é o do "professor" do config.json (ver `resolver_professor`).
+    """
+    turmas_disciplinas, _, horarios, mapa_turmas, _, config = dados_carregados
+    banco = aulas_coletadas if isinstance(aulas_coletadas, BancoAulas) else BancoAulas.de_lista(aulas_coletadas)
+    PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    DATA_PATH = os.path.join(PROJECT_ROOT, 'data')
+
+    _iniciar_log(aulas_dir)
+    try:
+        contexto = ContextoPlanejamento(dados_carregados)
+        professor = resolver_professor(horarios, config.get('professor'))
+        if not professor:
+            print(f"\nERRO: Professor '{config.get('professor')}' do config.json não encontrado em 'horarios_semanais_oficial.json'.")
+            print(f"  -> Professores disponíveis: {', '.join(horarios.get('professores', {})) or 'nenhum'}")
+            return
+        if contexto.modo == MODO_SOLVER:
+            print("\nModo de planejamento: solver (todas as disciplinas alocadas de uma vez).")
+
+        # 2. Obter todos os slots já ocupados para evitar conflitos
+        slots_ocupados = get_slots_ocupados(DATA_PATH, mapa_turmas)
+        print(f"\nEncontrados {len(slots_ocupados)} slots de horário já ocupados (de JSON e planos .txt).")
+
+        # 3. Lógica de planejamento
+        aulas_a_preparar = planejar_professor(contexto, contexto.horarios_professor(professor), turmas_disciplinas, banco, slots_ocupados)
 
         # 4. Confirmar e gerar os arquivos .txt
-        if not aulas_a_preparar:
-            print("\nNenhuma aula nova a ser planejada. A grade parece estar em dia.")
-        else:
-            print(f"\nResumo: {len(aulas_a_preparar)} arquivos de plano de aula prontos para serem gerados.")
-            # A entrada do usuário virá do terminal real, não do log
-            confirmacao = input("Deseja criar estes arquivos .txt? (s/n): ").lower()
-            if confirmacao == 's':
-                # Limpa os arquivos pendentes ANTES de gerar os novos, usando o caminho recebido
-                limpar_planos_antigos(aulas_dir)
-                salvar_manifesto_preenchimento(DATA_PATH, aulas_a_preparar)
-                gerar_arquivos_esqueleto(PROJECT_ROOT, aulas_a_preparar)
-                print("\nPreparação concluída. Preencha os arquivos gerados na pasta 'aulas' antes de executar o 'registrar_aulas.py'.")
+        confirmar_e_gerar([{'professor': professor, 'raiz': PROJECT_ROOT, 'aulas_dir': aulas_dir, 'aulas': aulas_a_preparar}])
+    finally:
+        _encerrar_log()
+
+def planejar_todos_professores(dados_carregados, project_root):
+    """
+    Planeja todos os professores de `horarios_semanais_oficial.json` em uma única execução.
+
+    O professor do config.json usa as pastas 'data/' e 'aulas/' do projeto, como no modo normal.
+    Os demais usam 'professores/<nome>/data' e 'professores/<nome>/aulas', cada um com seu
+    manifesto. Se a pasta de um professor não tiver `turmas_com_disciplinas.json`, as turmas e
+    disciplinas saem do próprio horário semanal (sem histórico, a carga é contada do zero).
+    Calendário, feriados e configurações são carregados uma vez, e os slots ocupados são
+    compartilhados para que dois professores não usem o mesmo horário de uma turma.
+    """
+    turmas_disciplinas, _, horarios, mapa_turmas, _, config = dados_carregados
+    _iniciar_log(os.path.join(project_root, 'aulas'))
+    bancos = []
+    try:
+        contexto = ContextoPlanejamento(dados_carregados)
+        professor_principal = resolver_professor(horarios, config.get('professor'))
+        professores = list(horarios.get('professores', {}))
+        print(f"\nPlanejando {len(professores)} professor(es) em uma única execução.")
+        if contexto.modo == MODO_SOLVER:
+            print("Modo de planejamento: solver (todas as disciplinas alocadas de uma vez).")
+
+        destinos = []
+        for professor in professores:
+            if professor == professor_principal:
+                raiz = project_root
+                turmas_professor = turmas_disciplinas
             else:
-                print("\nOperação cancelada pelo usuário. Nenhum arquivo foi gerado.")
+                raiz = os.path.join(project_root, PASTA_PROFESSORES, nome_pasta_professor(professor))
+                caminho_turmas = os.path.join(raiz, 'data', 'turmas_com_disciplinas.json')
+                if os.path.exists(caminho_turmas):
+                    with open(caminho_turmas, 'r', encoding='utf-8-sig') as f:
+                        turmas_professor = json.load(f)
+                else:
+                    turmas_professor = turmas_do_horario(contexto.horarios_professor(professor), mapa_turmas)
+            banco = BancoAulas.abrir(os.path.join(raiz, 'data'))
+            bancos.append(banco)
+            destinos.append((professor, raiz, turmas_professor, banco))
+
+        # Slots ocupados de todos os professores, para não haver duas aulas no mesmo horário de uma turma
+        slots_ocupados = set()
+        for _, raiz, _, _ in destinos:
+            slots_ocupados |= get_slots_ocupados(os.path.join(raiz, 'data'), mapa_turmas)
+        print(f"\nEncontrados {len(slots_ocupados)} slots de horário já ocupados (de JSON e planos .txt).")
 
+        planejamentos = []
+        for professor, raiz, turmas_professor, banco in destinos:
+            print(f"\n=== Professor: {professor} ({raiz}) ===")
+            aulas = planejar_professor(contexto, contexto.horarios_professor(professor), turmas_professor, banco, slots_ocupados)
+            planejamentos.append({'professor': professor, 'raiz': raiz, 'aulas_dir': os.path.join(raiz, 'aulas'), 'aulas': aulas})
 
+        confirmar_e_gerar(planejamentos)
     finally:
-        # Garante que o log seja fechado e o stdout restaurado, mesmo se ocorrer um erro
-        if isinstance(sys.stdout, Logger):
-            # Adiciona uma linha final ao log antes de fechar
-            print("\n--- Fim do log de preparação ---")
-            sys.stdout.close()
-            sys.stdout = sys.stdout.terminal
+        for banco in bancos:
+            banco.fechar()
+        _encerrar_log()
 
 if __name__ == "__main__":
     PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -396,8 +714,11 @@ if __name__ == "__main__":
 
     # Carrega os dados da forma tradicional
     dados_carregados = carregar_dados(DATA_PATH)
-    with open(os.path.join(DATA_PATH, 'aulas_coletadas.json'), 'r', encoding='utf-8-sig') as f:
-        aulas_coletadas_offline = json.load(f)
-    
-    # Executa a lógica de planejamento
-    planejar_e_preparar_aulas(dados_carregados, aulas_coletadas_offline, AULAS_DIR)
+
+    if '--todos-professores' in sys.argv:
+        planejar_todos_professores(dados_carregados, PROJECT_ROOT)
+    else:
+        banco_aulas = BancoAulas.abrir(DATA_PATH)
+        # Executa a lógica de planejamento
+        planejar_e_preparar_aulas(dados_carregados, banco_aulas, AULAS_DIR)
+        banco_aulas.fechar()
@@ -0,0 +1,135 @@
+"""
+Rastreio de latência por etapa, em JSON Lines, para automações longas (ex: o Registrador).
+
+Cada etapa medida vira uma linha no arquivo de rastreio da execução:
+    {"tipo": "etapa", "aula": "...", "nome": "aba2", "pai": "aula", "inicio": 12.3456, "duracao": 1.2345, "ok": true}
+'inicio' é contado em segundos desde o começo da execução e 'pai' é a etapa que a contém,
+o que permite remontar a linha do tempo de cada aula. Ao final, uma linha {"tipo": "resumo"}
+traz quantidade, p50, p95 e total por nome de etapa, o mesmo resumo impresso no console.
+
+Há dois jeitos de medir:
+- `passo(nome)`: etapas sequenciais de um fluxo; cada chamada encerra o passo anterior;
+- `medir(nome)`: bloco `with` para trechos aninhados (esperas, cliques, diálogos).
+"""
+import json
+import os
+import time
+from contextlib import contextmanager
+
+ETAPA_AULA = 'aula'
+
+
+def percentil(valores, p):
+    """Percentil 'p' (0-100) com interpolação linear entre os valores ordenados."""
+    ordenados = sorted(valores)
+    if not ordenados:
+        return 0.0
+    posicao = (len(ordenados) - 1) * p / 100
+    abaixo = int(posicao)
+    acima = min(abaixo + 1, len(ordenados) - 1)
+    return ordenados[abaixo] + (ordenados[acima] - ordenados[abaixo]) * (posicao - abaixo)
+
+
+class RastreioEtapas:
+    """Mede etapas e grava o rastreio em 'caminho' (sem caminho, só acumula para o resumo)."""
+
+    def __init__(self, caminho=None):
+        self.caminho = caminho
+        self.arquivo = None
+        if caminho:
+            os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+            self.arquivo = open(caminho, 'a', encoding='utf-8', buffering=1) # Uma linha por etapa, sem esperar o fim
+        self.origem = time.perf_counter()
+        self.contexto = None # Identificação da aula (ou item) em andamento
+        self.pilha = []      # Etapas abertas: [nome, início]
+        self.duracoes = {}   # nome -> lista de durações (s)
+        self.falhas = {}     # nome -> quantidade de etapas que terminaram em erro
+
+    # --- Medição ---
+
+    def _abrir(self, nome):
+        self.pilha.append([nome, time.perf_counter()])
+
+    def _fechar(self, ok):
+        nome, inicio = self.pilha.pop()
+        self.registrar(nome, inicio, time.perf_counter() - inicio, ok)
+
+    def registrar(self, nome, inicio, duracao, ok=True):
+        """Registra uma etapa já medida ('inicio' em perf_counter). Usado também pelas esperas adaptativas."""
+        self.duracoes.setdefault(nome, []).append(duracao)
+        if not ok:
+            self.falhas[nome] = self.falhas.get(nome, 0) + 1
+        if self.arquivo:
+            self.arquivo.write(json.dumps({
+                'tipo': 'etapa',
+                'aula': self.contexto,
+                'nome': nome,
+                'pai': self.pilha[-1][0] if self.pilha else None,
+                'inicio': round(inicio - self.origem, 4),
+                'duracao': round(duracao, 4),
+                'ok': ok,
+            }, ensure_ascii=False) + '\n')
+
+    def iniciar(self, contexto):
+        """Começa a medição de uma aula: as etapas seguintes ficam dentro da etapa 'aula'."""
+        self.encerrar(ok=False) # Aula anterior que não foi encerrada
+        self.contexto = contexto
+        self._abrir(ETAPA_AULA)
+
+    def passo(self, nome):
+        """Encerra o passo sequencial em andamento (se houver) e inicia 'nome'."""
+        if len(self.pilha) > 1:
+            self._fechar(ok=True)
+        self._abrir(nome)
+
+    def encerrar(self, ok=True):
+        """Encerra o passo em andamento e a aula. 'ok' indica se a aula terminou sem erro."""
+        while self.pilha:
+            self._fechar(ok)
+        self.contexto = None
+
+    @contextmanager
+    def medir(self, nome):
+        """Mede o bloco como uma etapa aninhada na etapa em andamento."""
+        self._abrir(nome)
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self._fechar(ok)
+
+    # --- Resumo ---
+
+    def resumo(self):
+        """{nome: {'qtd', 'p50', 'p95', 'total', 'falhas'}} com as durações em segundos."""
+        return {
+            nome: {
+                'qtd': len(duracoes),
+                'p50': round(percentil(duracoes, 50), 4),
+                'p95': round(percentil(duracoes, 95), 4),
+                'total': round(sum(duracoes), 4),
+                'falhas': self.falhas.get(nome, 0),
+            }
+            for nome, duracoes in self.duracoes.items()
+        }
+
+    def imprimir_resumo(self, titulo="etapas"):
+        resumo = self.resumo()
+        if not resumo:
+            return
+        print(f"\n--- Latência por {titulo} ---")
+        print(f"{'Etapa':<28} | {'Qtd':>5} | {'p50 (s)':>8} | {'p95 (s)':>8} | {'Total (s)':>9} | {'Falhas':>6}")
+        for nome, dados in sorted(resumo.items(), key=lambda item: -item[1]['total']):
+            print(f"{nome:<28} | {dados['qtd']:>5} | {dados['p50']:>8.2f} | {dados['p95']:>8.2f} | "
+                  f"{dados['total']:>9.2f} | {dados['falhas']:>6}")
+        if self.caminho:
+            print(f"Rastreio completo em: {self.caminho}")
+
+    def fechar(self):
+        """Encerra etapas abertas e grava o resumo como última linha do rastreio."""
+        self.encerrar(ok=False)
+        if self.arquivo:
+            self.arquivo.write(json.dumps({'tipo': 'resumo', 'etapas': self.resumo()}, ensure_ascii=False) + '\n')
+            self.arquivo.close()
+            self.arquivo = None
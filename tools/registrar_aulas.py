@@ -16,11 +16,22 @@ Funcionalidades:
   - Conteúdo e estratégia.
   - Vínculo de recursos didáticos (links).
 - Automatiza a seleção da data no componente de calendário da interface.
-- Pausa para intervenção manual na seleção do horário, que é dinâmico.
+- Seleciona o horário comparando o texto das opções com o `# Horário` do plano;
+  se não encontrar, pausa para intervenção manual.
+- Modo em lote (`--lote` ou `"registro_em_lote": true` no config.json): registra
+  a fila inteira sem perguntas. Aulas que falharem vão para uma lista de revisão
+  (`aulas/logs/revisao_registro_*.json`) em vez de pedir intervenção.
 - Após o registro bem-sucedido, o arquivo `.txt` correspondente é excluído
   para evitar duplicidade.
 - Em caso de falha, um screenshot é salvo na pasta `screenshots/` e o arquivo
   `.txt` é mantido para uma nova tentativa.
+- Cada etapa do formulário é gravada no diário `data/registro_em_andamento.jsonl`.
+  Se a execução for interrompida depois que o portal já salvou a aula, a próxima
+  execução não a registra de novo: confere o histórico coletado pelo scraper e, se a
+  aula não estiver lá, a manda para a lista de revisão (`--refazer-interrompidas`
+  registra essas aulas do zero).
+- O tempo de cada etapa do formulário (e de cada espera) é gravado em
+  `aulas/logs/trace_registro_*.jsonl`, com um resumo de p50/p95 por etapa ao final.
 - Toda a execução é registrada em um arquivo de log na pasta `aulas/`.
 
 Dependências e Pré-requisitos:
@@ -39,22 +50,80 @@ Dependências e Pré-requisitos:
 import json
 import os
 import re
-import time
 from datetime import datetime
 import sys
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait, Select
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, NoSuchWindowException
-from webdriver_manager.chrome import ChromeDriverManager
+from navegador import resolver_perfil, resolver_url_portal, iniciar_chrome, PERFIL_COMPLETO, PERFIL_RAPIDO, URL_PORTAL
+from sessao_portal import restaurar_sessao, salvar_sessao, VALIDADE_PADRAO_MINUTOS
+from esperas import EsperaAdaptativa, INTERVALO_PADRAO
+from plano_aula import PlanoAula, disciplina_do_nome
+from diario import DiarioJsonl
+from banco_aulas import BancoAulas
+from rastreio_etapas import RastreioEtapas
+
+# Clica N vezes no botão de mês anterior/seguinte do calendário, deixando o React renderizar
+# entre um clique e outro, e devolve o texto do cabeçalho (ex: "setembro 2025") ao final
+JS_NAVEGAR_MESES = """
+const [xpathBotao, xpathCabecalho, passos, concluir] = arguments;
+const achar = (xpath) => document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+let feitos = 0;
+const passo = () => {
+    const botao = achar(xpathBotao);
+    if (feitos >= passos || !botao) {
+        const cabecalho = achar(xpathCabecalho);
+        concluir(cabecalho ? cabecalho.textContent.trim() : null);
+        return;
+    }
+    botao.click();
+    feitos++;
+    setTimeout(passo, 0);
+};
+passo();
+"""
+ARQUIVO_DIARIO_REGISTRO = 'registro_em_andamento.jsonl'
+# Etapas gravadas no diário: inicio, aula_criada, aba2, aba3, aba4, finalizada, confirmada, arquivo_removido.
+# 'aula_criada' é gravada imediatamente antes do "Sim" da Aba 1:
+# a partir dela o portal pode ter a aula, e registrá-la de novo criaria uma duplicata.
+ETAPA_INICIO = 'inicio'
+ETAPA_AULA_CRIADA = 'aula_criada'
+ETAPA_CONFIRMADA = 'confirmada'
+ETAPA_ARQUIVO_REMOVIDO = 'arquivo_removido'
+SITUACAO_REGISTRAR = 'registrar'       # Nada foi salvo no portal
+SITUACAO_CONCLUIDA = 'concluida'       # Aula já registrada; falta apenas apagar o arquivo
+SITUACAO_INTERROMPIDA = 'interrompida' # O portal pode ter a aula incompleta
+
+MAX_AJUSTES_CALENDARIO = 3 # Rajadas de cliques até o cabeçalho confirmar o mês (normalmente 1)
+
+def _horas_do_texto(texto):
+    """Horários 'HH:MM' presentes no texto: '07:00 ~ 07:50' e '7:00-7:50' -> ('07:00', '07:50')."""
+    return tuple(f"{int(hora):02d}:{minuto}" for hora, minuto in re.findall(r'(\d{1,2})[:h](\d{2})', texto or ''))
+
+class FalhaModoLote(Exception):
+    """Etapa que pediria intervenção manual, mas o registro está em modo lote."""
 
 class Registrador:
     def __init__(self, project_root):
         self.project_root = project_root
         self.driver = None
         self.wait = None
+        self.espera = None
+        self.config = {}
+        self.url_portal = URL_PORTAL
+        self.modo_lote = False # Sem perguntas: o que exigiria ação manual vira falha para revisão
+        self.pagina_atual = None # (turma, disciplina) da página 'Registro de aulas' aberta no momento
+
+        # Diário de registro: última etapa concluída de cada aula (turma, disciplina, data, horário)
+        self.diario = None
+        self.etapas_diario = {}
+        self.entradas_diario = {} # Última entrada de cada aula, usada para compactar o diário ao final
+        self.banco = None # Histórico coletado pelo scraper, aberto só se houver aula interrompida
+
+        # Latência por etapa; sem arquivo, só acumula para o resumo (o __main__ define o arquivo da execução)
+        self.rastreio = RastreioEtapas()
+        self.ultimo_erro = None
 
     # Mapeamento reverso para meses (para navegação no calendário)
     MESES_MAP_REVERSE = {
@@ -63,15 +132,107 @@ class Registrador:
         "setembro": 9, "outubro": 10, "novembro": 11, "dezembro": 12 # Corrigido o mapeamento de novembro
     }
 
-    def _initialize_driver(self):
+    @staticmethod
+    def _chave_aula(aula_info):
+        return (aula_info['turma'], aula_info['disciplina'], aula_info['data'], aula_info['horario'])
+
+    def _preparar_diario(self):
+        """Abre o diário de registro e recupera a última etapa de cada aula de execuções anteriores."""
+        self.diario = DiarioJsonl(os.path.join(self.project_root, 'data', ARQUIVO_DIARIO_REGISTRO))
+        for entrada in self.diario.ler():
+            chave = tuple(entrada['aula'])
+            if entrada['etapa'] == ETAPA_ARQUIVO_REMOVIDO:
+                # Ciclo encerrado: um plano com a mesma chave, a partir daqui, é um plano novo
+                self.etapas_diario.pop(chave, None)
+                self.entradas_diario.pop(chave, None)
+                continue
+            self.etapas_diario[chave] = entrada['etapa']
+            self.entradas_diario[chave] = entrada
+        pendentes = [etapa for etapa in self.etapas_diario.values() if etapa != ETAPA_INICIO]
+        if pendentes:
+            print(f"[Diário] {len(pendentes)} aula(s) de uma execução anterior sem conclusão registrada.")
+
+    def _marcar_etapa(self, aula_info, etapa):
+        """Grava no diário (com fsync) que a aula chegou à etapa informada."""
+        chave = self._chave_aula(aula_info)
+        entrada = {
+            'aula': list(chave),
+            'arquivo': os.path.relpath(aula_info['caminho_arquivo'], self.project_root),
+            'etapa': etapa,
+            'em': datetime.now().strftime('%d/%m/%Y %H:%M:%S'),
+        }
+        self.etapas_diario[chave] = etapa
+        self.entradas_diario[chave] = entrada
+        if self.diario:
+            self.diario.registrar(entrada)
+
+    def _aula_no_historico(self, aula_info):
+        """Confere no histórico coletado pelo scraper (banco de aulas) se a aula já existe no portal."""
+        if self.banco is None:
+            self.banco = BancoAulas.abrir(os.path.join(self.project_root, 'data'))
+        data_br = datetime.strptime(aula_info['data'], "%Y-%m-%d").strftime("%d/%m/%Y")
+        horas = _horas_do_texto(aula_info['horario'])
+        disciplina = aula_info['disciplina'].strip().lower()
+        for aula in self.banco.aulas(turma=aula_info['turma']):
+            if (aula.get('dataAula') == data_br and (aula.get('componenteCurricular') or '').strip().lower() == disciplina
+                    and _horas_do_texto(aula.get('horario'))[:len(horas)] == horas and aula.get('status') != 'Excluída'):
+                return True
+        return False
+
+    def situacao_no_diario(self, aula_info):
+        """
+        O que fazer com a aula conforme a última etapa gravada no diário:
+        SITUACAO_REGISTRAR, SITUACAO_CONCLUIDA ou SITUACAO_INTERROMPIDA.
+        Só 'confirmada' significa "registrada, falta apagar o arquivo". Depois de 'arquivo_removido',
+        um plano com a mesma chave é um plano novo (ex: aula excluída no portal e gerada de novo).
+        Uma aula interrompida que já aparece no histórico do scraper é considerada concluída.
+        """
+        etapa = self.etapas_diario.get(self._chave_aula(aula_info))
+        if etapa in (None, ETAPA_INICIO, ETAPA_ARQUIVO_REMOVIDO):
+            return SITUACAO_REGISTRAR
+        if etapa == ETAPA_CONFIRMADA:
+            return SITUACAO_CONCLUIDA
+        if self._aula_no_historico(aula_info):
+            print("  -> A aula interrompida consta no histórico coletado do portal.")
+            return SITUACAO_CONCLUIDA
+        return SITUACAO_INTERROMPIDA
+
+    def concluir_aula(self, aula_info):
+        """Remove o arquivo do plano de uma aula registrada e grava a conclusão no diário."""
+        if os.path.exists(aula_info['caminho_arquivo']):
+            os.remove(aula_info['caminho_arquivo'])
+        self._marcar_etapa(aula_info, ETAPA_ARQUIVO_REMOVIDO)
+
+    def encerrar_diario(self):
+        """
+        Compacta o diário ao final da execução: mantém apenas a última entrada das aulas que ainda
+        dependem dele (confirmadas sem o arquivo removido ou interrompidas depois de salvas no portal).
+        Aulas concluídas ou que falharam antes de salvar qualquer coisa ('inicio') saem do diário.
+        """
+        if self.banco:
+            self.banco.fechar()
+        if not self.diario:
+            return
+        restantes = [
+            entrada for chave, entrada in self.entradas_diario.items()
+            if self.etapas_diario.get(chave) not in (ETAPA_INICIO, ETAPA_ARQUIVO_REMOVIDO)
+        ]
+        if restantes:
+            self.diario.reescrever(restantes)
+        else:
+            self.diario.apagar()
+
+    def _initialize_driver(self, perfil=None):
         print("[Registrador] Inicializando o WebDriver...")
-        options = webdriver.ChromeOptions()
-        options.add_argument("--start-maximized") # Iniciar maximizado
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=options)
-        self.wait = WebDriverWait(self.driver, 30)
-        # REMOVIDO: set_window_size, pois --start-maximized já cuida disso
-        print("  -> Navegador iniciado maximizado.")
+        # No modo lote nada é perguntado ao usuário, então o padrão é o perfil rápido (headless);
+        # fora dele, o registro pode pedir intervenção manual e o padrão é o navegador visível.
+        perfil = perfil or resolver_perfil(self.config, padrao=PERFIL_RAPIDO if self.modo_lote else PERFIL_COMPLETO)
+        self.driver = iniciar_chrome(perfil, data_path=os.path.join(self.project_root, 'data'))
+        self.wait = WebDriverWait(self.driver, 30, poll_frequency=INTERVALO_PADRAO)
+        self.espera = EsperaAdaptativa(self.driver, timeout=30)
+        self.espera.rastreio = self.rastreio
+        # REMOVIDO: set_window_size, pois --start-maximized (ou o viewport fixo do perfil rápido) já cuida disso
+        print(f"  -> Navegador iniciado (perfil '{perfil}').")
         self.driver.execute_script("document.body.style.zoom = '80%'") # Mantendo o zoom
         print("  -> Zoom da página definido para 80%.")
 
@@ -87,6 +248,12 @@ class Registrador:
             print("  -> ERRO: Não foi possível tirar screenshot porque a janela do navegador já foi fechada.")
 
     def _login_and_navigate_to_turmas(self, url, credenciais):
+        self.url_portal = url
+        data_path = os.path.join(self.project_root, 'data')
+        validade = int(self.config.get('sessao_validade_minutos', VALIDADE_PADRAO_MINUTOS))
+        if restaurar_sessao(self.driver, url, data_path, validade, espera=self.espera):
+            return
+
         self.driver.get(url)
         self.wait.until(EC.presence_of_element_located((By.ID, 'username'))).send_keys(credenciais['username'])
         self.driver.find_element(By.ID, 'password').send_keys(credenciais['password'])
@@ -95,6 +262,11 @@ class Registrador:
         self.wait.until(EC.frame_to_be_available_and_switch_to_it((By.ID, 'iframe-container')))
         self.wait.until(EC.element_to_be_clickable((By.XPATH, "//button[contains(., 'ABRIR')]"))).click()
         self.driver.switch_to.default_content()
+        try:
+            self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, 'iframe[src*="listagem-turmas"]')))
+            salvar_sessao(self.driver, data_path)
+        except TimeoutException:
+            print("[Sessão] AVISO: Listagem de turmas não apareceu. A sessão não foi salva.")
 
     def _navigate_to_disciplina(self, turma, disciplina):
         print(f"\n--- Navegando para: {turma} / {disciplina} ---")
@@ -112,7 +284,8 @@ class Registrador:
             self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", card)
             registro_aulas_link = card.find_element(By.XPATH, ".//p[normalize-space()='Registro de aulas']")
             self.driver.execute_script("arguments[0].click();", registro_aulas_link)
-            time.sleep(1)
+            # A página da disciplina substitui a lista de cards; o card antigo fica obsoleto
+            self.espera.ate(EC.staleness_of(card), 'pagina_disciplina', timeout=10, obrigatoria=False)
             print("[Navegação] Acessou a página de 'Registro de aulas'.")
             return True
         except TimeoutException:
@@ -120,6 +293,37 @@ class Registrador:
             self._take_screenshot(f"card_nao_encontrado_{turma}_{disciplina}")
             return False
 
+    def _pagina_disciplina_pronta(self):
+        """True se a página 'Registro de aulas' aberta está pronta para uma nova aula ('Adicionar aula' clicável)."""
+        try:
+            self.driver.switch_to.default_content()
+            self.wait.until(EC.frame_to_be_available_and_switch_to_it((By.CSS_SELECTOR, 'iframe[src*="listagem-turmas"]')))
+        except TimeoutException:
+            return False
+        botao = self.espera.ate(
+            EC.element_to_be_clickable((By.XPATH, "//button[contains(., 'Adicionar aula')]")),
+            'pagina_disciplina', timeout=10, obrigatoria=False
+        )
+        return botao is not None
+
+    def _abrir_disciplina(self, turma, disciplina):
+        """
+        Garante que a página 'Registro de aulas' da disciplina está aberta.
+        Aulas seguidas da mesma disciplina reaproveitam a página; só a troca de disciplina passa pela lista de turmas.
+        """
+        if self.pagina_atual == (turma, disciplina):
+            if self._pagina_disciplina_pronta():
+                print(f"\n--- Continuando em: {turma} / {disciplina} ---")
+                return True
+            print("[Navegação] A página da disciplina não está pronta. Navegando novamente...")
+        if self.pagina_atual is not None:
+            self.pagina_atual = None
+            self._navigate_back_to_turmas()
+        if not self._navigate_to_disciplina(turma, disciplina):
+            return False
+        self.pagina_atual = (turma, disciplina)
+        return True
+
     def _navigate_back_to_turmas(self):
         try:
             print("[Recuperação] Tentando voltar para a lista de turmas para continuar...")
@@ -129,12 +333,9 @@ class Registrador:
 
             print("  -> Usando o comando 'voltar' do navegador...")
             self.driver.back()
-            time.sleep(2)
 
             print("  -> Verificando se o iframe da lista de turmas recarregou...")
-            self.driver.switch_to.default_content()
-            turmas_iframe_selector = (By.CSS_SELECTOR, 'iframe[src*="listagem-turmas"]')
-            self.wait.until(EC.frame_to_be_available_and_switch_to_it(turmas_iframe_selector))
+            self.espera.iframe_turmas_pronto()
             
             print("[Recuperação] Retorno à lista de turmas bem-sucedido.")
 
@@ -142,7 +343,7 @@ class Registrador:
             print(f"ERRO CRÍTICO: O comando 'voltar' falhou. Tentando URL direta como fallback. Erro: {e}")
             self._take_screenshot("erro_fatal_navegar_voltar")
             try:
-                self.driver.get("https://portal.seduc.pi.gov.br/#!/turmas")
+                self.driver.get(self.url_portal)
                 # Após um hard reload, precisamos passar pela dança inicial do iframe novamente
                 self.wait.until(EC.frame_to_be_available_and_switch_to_it((By.ID, 'iframe-container')))
                 self.wait.until(EC.element_to_be_clickable((By.XPATH, "//button[contains(., 'ABRIR')]"))).click()
@@ -155,11 +356,11 @@ class Registrador:
     def _click_save_and_next(self):
         """Encontra o botão 'Salvar e Avançar' visível, rola até ele e clica."""
         try:
-            save_button_xpath = "//button[contains(normalize-space(), 'Salvar e Avançar')]"
-            save_button = self.wait.until(EC.element_to_be_clickable((By.XPATH, save_button_xpath)))
-            self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", save_button)
-            time.sleep(0.5)
-            self.driver.execute_script("arguments[0].click();", save_button)
+            with self.rastreio.medir('salvar_e_avancar'):
+                save_button_xpath = "//button[contains(normalize-space(), 'Salvar e Avançar')]"
+                save_button = self.wait.until(EC.element_to_be_clickable((By.XPATH, save_button_xpath)))
+                self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", save_button)
+                self.driver.execute_script("arguments[0].click();", save_button)
             return True
         except (TimeoutException, NoSuchElementException):
             print("ERRO: Botão 'Salvar e Avançar' não foi encontrado ou não é clicável.")
@@ -168,9 +369,9 @@ class Registrador:
     def _wait_for_active_step(self, step_text):
         """Espera a etapa na barra de progresso se tornar ativa."""
         print(f"[Formulário] Esperando pela Aba '{step_text}' se tornar ativa na barra de progresso...")
-        step_xpath = f"//nav[@aria-label='Progress']//div[@aria-current='step' and contains(., '{step_text}')]"
         try:
-            self.wait.until(EC.visibility_of_element_located((By.XPATH, step_xpath)))
+            with self.rastreio.medir(f"esperar_aba:{step_text}"):
+                self.espera.etapa_ativa(step_text)
             print(f"  -> Aba '{step_text}' está ativa.")
             return True
         except TimeoutException:
@@ -196,59 +397,110 @@ class Registrador:
         self.driver.execute_script("arguments[0].click();", date_input_button) # Clicar via JS
         print("    -> Calendário aberto.")
 
-        # 2. Navegar para o mês/ano correto
+        # 2. Navegar para o mês/ano correto: calcula a diferença de meses uma vez e clica em rajada
         calendar_dialog_xpath = "//div[@role='dialog' and contains(@id, 'radix-')]"
         self.wait.until(EC.visibility_of_element_located((By.XPATH, calendar_dialog_xpath)))
 
-        while True:
-            current_month_year_element = self.wait.until(EC.visibility_of_element_located((By.XPATH, f"{calendar_dialog_xpath}//div[@class='text-sm font-medium']")))
-            current_month_year_text = current_month_year_element.text
-            
+        month_header_xpath = f"{calendar_dialog_xpath}//div[@class='text-sm font-medium']"
+        current_month_year_text = self.wait.until(EC.visibility_of_element_located((By.XPATH, month_header_xpath))).text
+        mes_correto = False
+        for _ in range(MAX_AJUSTES_CALENDARIO):
             # Parse current month and year from text like "setembro 2025"
-            parts = current_month_year_text.split()
-            current_month_name = parts[0].lower()
-            current_year = int(parts[1])
-            current_month = self.MESES_MAP_REVERSE[current_month_name]
-
-            print(f"    -> Calendário atual: {current_month_year_text}. Alvo: {target_date.strftime('%B %Y')}")
+            try:
+                parts = current_month_year_text.split()
+                current_month = self.MESES_MAP_REVERSE[parts[0].lower()]
+                current_year = int(parts[1])
+            except (AttributeError, IndexError, KeyError, ValueError):
+                print(f"    -> Cabeçalho do calendário não reconhecido: '{current_month_year_text}'.")
+                break
 
-            if current_year == target_year and current_month == target_month:
+            delta = (target_year - current_year) * 12 + (target_month - current_month)
+            print(f"    -> Calendário atual: {current_month_year_text}. Alvo: {target_date.strftime('%m/%Y')}")
+            if delta == 0:
                 print("    -> Mês e ano corretos encontrados.")
+                mes_correto = True
                 break
-            elif target_date < datetime(current_year, current_month, 1):
-                # Target date is in the past relative to current calendar view
-                prev_month_button = self.wait.until(EC.element_to_be_clickable((By.XPATH, f"{calendar_dialog_xpath}//button[@name='previous-month']")))
-                self.driver.execute_script("arguments[0].click();", prev_month_button) # Clicar via JS
-                print("    -> Clicando no mês anterior.")
-            else:
-                # Target date is in the future relative to current calendar view
-                next_month_button = self.wait.until(EC.element_to_be_clickable((By.XPATH, f"{calendar_dialog_xpath}//button[@name='next-month']")))
-                self.driver.execute_script("arguments[0].click();", next_month_button) # Clicar via JS
-                print("    -> Clicando no próximo mês.")
-            time.sleep(0.5) # Pequena pausa entre cliques de mês
+
+            botao = 'next-month' if delta > 0 else 'previous-month'
+            print(f"    -> {'Avançando' if delta > 0 else 'Voltando'} {abs(delta)} mês(es) de uma vez.")
+            # O texto devolvido pelo script é a leitura de verificação para a próxima volta
+            current_month_year_text = self.driver.execute_async_script(
+                JS_NAVEGAR_MESES, f"{calendar_dialog_xpath}//button[@name='{botao}']", month_header_xpath, abs(delta)
+            )
 
         # 3. Selecionar o dia
         day_button_xpath = f"{calendar_dialog_xpath}//button[@name='day' and normalize-space()='{target_day}']"
-        time.sleep(0.5) # Pausa adicional para a interface estabilizar antes de clicar no dia
         try:
+            if not mes_correto:
+                raise NoSuchElementException(f"Calendário não chegou a {target_date.strftime('%m/%Y')}.")
             day_button = self.wait.until(EC.element_to_be_clickable((By.XPATH, day_button_xpath)))
             self.driver.execute_script("arguments[0].click();", day_button) # Clicar via JS
             print(f"    -> Dia {target_day} selecionado automaticamente.")
-            time.sleep(1) # Pausa após selecionar o dia
+            self.espera.dialogo_fechar(calendar_dialog_xpath, timeout=5, obrigatoria=False)
         except (TimeoutException, NoSuchElementException):
+            if self.modo_lote:
+                raise FalhaModoLote(f"Dia {target_day} não encontrado no calendário.")
             print("\n" + "!"*15 + " AÇÃO MANUAL NECESSÁRIA " + "!"*15)
             print(f"    -> Não foi possível selecionar o dia {target_day} automaticamente.")
             print(f"    -> Por favor, selecione o dia {target_day} no calendário do navegador.")
             input("    -> Após selecionar, pressione ENTER para continuar...")
             print("!"*55)
-            time.sleep(1) # Pausa após a ação manual
+            self.espera.dialogo_fechar(calendar_dialog_xpath, timeout=5, obrigatoria=False)
 
 
+    def _selecionar_horario(self, horario):
+        """
+        Seleciona a opção de horário cujo texto tem os mesmos horários (HH:MM) do '# Horário' do plano.
+        Aceita um <select> nativo ou uma lista de opções clicáveis (combobox, checkbox, rádio).
+        Retorna True se alguma opção foi selecionada.
+        """
+        alvo = _horas_do_texto(horario)
+        if not alvo:
+            print(f"    -> Horário '{horario}' do plano não tem o formato HH:MM.")
+            return False
+
+        def corresponde(texto):
+            return _horas_do_texto(texto)[:len(alvo)] == alvo
+
+        for select_element in self.driver.find_elements(By.XPATH, "//label[contains(., 'Horário')]/following::select[1]"):
+            select = Select(select_element)
+            for option in select.options:
+                if corresponde(option.text):
+                    select.select_by_visible_text(option.text)
+                    print(f"    -> Horário '{option.text.strip()}' selecionado automaticamente.")
+                    return True
+
+        # Combobox fechado: abre a lista antes de procurar as opções
+        for combobox in self.driver.find_elements(By.XPATH, "//label[contains(., 'Horário')]/following::button[@role='combobox'][1]"):
+            self.driver.execute_script("arguments[0].click();", combobox)
+
+        opcoes_xpath = (
+            "//*[(@role='option' or @role='checkbox' or @role='radio' or self::label) "
+            f"and contains(normalize-space(), '{alvo[0]}')]"
+        )
+        try:
+            opcoes = WebDriverWait(self.driver, 5, poll_frequency=INTERVALO_PADRAO).until(
+                lambda driver: [el for el in driver.find_elements(By.XPATH, opcoes_xpath) if el.is_displayed() and corresponde(el.text)]
+            )
+        except TimeoutException:
+            print(f"    -> Nenhuma opção de horário corresponde a '{horario}'.")
+            return False
+        self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", opcoes[0])
+        self.driver.execute_script("arguments[0].click();", opcoes[0])
+        print(f"    -> Horário '{opcoes[0].text.strip()}' selecionado automaticamente.")
+        return True
+
     def registrar_aula(self, aula_info, plano_de_aula):
-        if not self._navigate_to_disciplina(aula_info['turma'], aula_info['disciplina']):
+        self.ultimo_erro = None
+        self.rastreio.iniciar(f"{aula_info['turma']} | {aula_info['disciplina']} | {aula_info['data']} {aula_info['horario']}")
+        self.rastreio.passo('navegacao')
+        if not self._abrir_disciplina(aula_info['turma'], aula_info['disciplina']):
+            self.ultimo_erro = "Card da turma/disciplina não encontrado."
+            self.rastreio.encerrar(ok=False)
             return False # Retorna False para que o loop principal possa tentar a recuperação
 
         try:
+            self.rastreio.passo('adicionar_aula')
             print("[Formulário] Procurando e clicando em 'Adicionar aula'...")
             # Espera o overlay de carregamento desaparecer antes de clicar em 'Adicionar aula'
             loading_overlay_xpath = "//div[contains(@class, 'flex justify-center items-center mt-[50vh]')]"
@@ -265,35 +517,51 @@ class Registrador:
             
             if not self._wait_for_active_step("1 - Conteúdo"): raise Exception("Aba 1 não carregou.")
 
+            self._marcar_etapa(aula_info, ETAPA_INICIO)
+
             # --- AUTOMAÇÃO DA SELEÇÃO DE DATA ---
+            self.rastreio.passo('data')
             self._select_date_from_picker(aula_info['data'])
             # --- FIM DA AUTOMAÇÃO DA SELEÇÃO DE DATA ---
 
-            print("\n" + "!"*15 + " AÇÃO MANUAL NECESSÁRIA " + "!"*15)
-            print(f"Por favor, selecione o HORÁRIO ({aula_info['horario']}) da aula.")
-            input("Após selecionar, pressione ENTER para continuar...")
-            print("!"*55 + "\n  -> Retomando automação...")
+            self.rastreio.passo('horario')
+            if not self._selecionar_horario(aula_info['horario']):
+                if self.modo_lote:
+                    raise FalhaModoLote(f"Horário '{aula_info['horario']}' não encontrado entre as opções do portal.")
+                print("\n" + "!"*15 + " AÇÃO MANUAL NECESSÁRIA " + "!"*15)
+                print(f"Por favor, selecione o HORÁRIO ({aula_info['horario']}) da aula.")
+                input("Após selecionar, pressione ENTER para continuar...")
+                print("!"*55 + "\n  -> Retomando automação...")
 
+            self.rastreio.passo('aba1')
             print("[Formulário] Preenchendo campos da Aba 1...")
             self.driver.find_element(By.XPATH, "//label[contains(., 'Conteúdo abordado')]/following-sibling::textarea").send_keys(plano_de_aula.get('conteudo', ''))
             self.driver.find_element(By.XPATH, "//label[contains(., 'Estratégia metodológica')]/following-sibling::textarea").send_keys(plano_de_aula.get('estrategia', ''))
             print("  -> Campos preenchidos.")
 
             if not self._click_save_and_next(): raise Exception("Falha ao salvar Aba 1.")
-            self.wait.until(EC.element_to_be_clickable((By.XPATH, "//button[text()='Sim']"))).click()
+            sim_button = self.wait.until(EC.element_to_be_clickable((By.XPATH, "//button[text()='Sim']")))
+            self._marcar_etapa(aula_info, ETAPA_AULA_CRIADA)
+            sim_button.click()
             print("[Formulário] Aba 1 (Criação da Aula) salva com sucesso.")
 
+            self.rastreio.passo('aba2')
             if not self._wait_for_active_step("2 - Plano de aula"): raise Exception("Aba 2 não ativou.")
             if not self._click_save_and_next(): raise Exception("Falha ao salvar Aba 2.")
+            self._marcar_etapa(aula_info, 'aba2')
             print("[Formulário] Aba 2 salva.")
 
+            self.rastreio.passo('aba3')
             if not self._wait_for_active_step("3 - Frequência"): raise Exception("Aba 3 não ativou.")
             if not self._click_save_and_next(): raise Exception("Falha ao salvar Aba 3.")
+            self._marcar_etapa(aula_info, 'aba3')
             print("[Formulário] Aba 3 salva.")
 
+            self.rastreio.passo('aba4')
             if not self._wait_for_active_step("4 - Recursos didáticos"): raise Exception("Aba 4 não ativou.")
             link_recurso = plano_de_aula.get('recurso_link')
             if link_recurso:
+                self.rastreio.passo('dialogo_recurso')
                 print("  -> Clicando em 'Adicionar novo recurso didático'...")
                 add_recurso_button = self.wait.until(EC.element_to_be_clickable((By.XPATH, "//button[contains(., 'Adicionar novo recurso didático')]")))
                 self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", add_recurso_button)
@@ -301,8 +569,7 @@ class Registrador:
                 
                 dialog_xpath = "//div[@role='dialog' and .//h2[normalize-space()='Adicionar/Editar recurso didático']]"
                 self.wait.until(EC.visibility_of_element_located((By.XPATH, dialog_xpath)))
-                print("  -> Formulário de recurso aberto. Aguardando estabilização...")
-                time.sleep(1)
+                print("  -> Formulário de recurso aberto.")
                 print("  -> Preenchendo campos...")
                 
                 resource_type = "Arquivo PDF"
@@ -328,27 +595,32 @@ class Registrador:
                 self.driver.execute_script("arguments[0].click();", save_button_dialog)
                 
                 print("  -> Aguardando o formulário de recurso fechar...")
-                self.wait.until(EC.invisibility_of_element_located((By.XPATH, dialog_xpath)))
+                self.espera.dialogo_fechar(dialog_xpath)
                 
                 print(f"  -> Verificando se o recurso '{recurso_titulo}' apareceu na lista...")
                 recurso_adicionado_xpath = f"//td[normalize-space()='{recurso_titulo}']"
                 self.wait.until(EC.visibility_of_element_located((By.XPATH, recurso_adicionado_xpath)))
-                print("  -> Recurso confirmado na lista. Aguardando 2 segundos...")
-                time.sleep(2)
+                print("  -> Recurso confirmado na lista.")
+                self.rastreio.passo('aba4_salvar')
 
             if not self._click_save_and_next(): raise Exception("Falha ao salvar Aba 4.")
+            self._marcar_etapa(aula_info, 'aba4')
             print("[Formulário] Aba 4 salva.")
 
+            self.rastreio.passo('aba5')
             if not self._wait_for_active_step("5 - Atividade"): raise Exception("Aba 5 não ativou.")
             final_button_xpath = "//button[contains(normalize-space(), 'Salvar e Finalizar')]"
             final_button = self.wait.until(EC.element_to_be_clickable((By.XPATH, final_button_xpath)))
             self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", final_button)
+            self._marcar_etapa(aula_info, 'finalizada')
             final_button.click()
             print("[Formulário] Aba 5 finalizada.")
 
+            self.rastreio.passo('modal_atencao')
             print("[Formulário] Aguardando o balão de confirmação final 'Atenção'...")
             modal_atencao_xpath = "//div[@role='dialog' and .//h2[normalize-space()='Atenção']]" # Usando normalize-space()
             self.wait.until(EC.visibility_of_element_located((By.XPATH, modal_atencao_xpath)))
+            self._marcar_etapa(aula_info, ETAPA_CONFIRMADA)
             
             print("  -> Balão 'Atenção' apareceu. Clicando em 'Fechar'...")
             fechar_button_xpath = f"{modal_atencao_xpath}//button[normalize-space()='Fechar']"
@@ -357,39 +629,27 @@ class Registrador:
             print("  -> Botão 'Fechar' clicado. Balão de confirmação fechado.")
 
             print(f"SUCESSO: Aula de {aula_info['disciplina']} em {aula_info['data']} registrada!")
-            
-            self._navigate_back_to_turmas()
+            # Ao fechar o balão, o portal volta para a página 'Registro de aulas' da disciplina:
+            # a próxima aula do mesmo grupo continua dali, sem voltar para a lista de turmas
+            self.rastreio.encerrar(ok=True)
             return True
 
         except Exception as e:
             print(f"\nERRO INESPERADO: Ocorreu uma falha durante o registro da aula.")
             print(f"  -> Detalhe: {e}")
+            self.ultimo_erro = str(e) or type(e).__name__
+            self.rastreio.encerrar(ok=False)
             self._take_screenshot(f"{aula_info['turma']}_{aula_info['data']}")
+            # O formulário ficou em estado desconhecido: recomeça pela lista de turmas
+            self.pagina_atual = None
             self._navigate_back_to_turmas()
             return False
 
-# --- Funções de Parsing (sem alterações) ---
+# --- Funções de Parsing ---
 def parse_plan_file(file_path):
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f: content = f.read()
-    except FileNotFoundError: return None
-    plan_data = {}
-    for line in content.splitlines():
-        if line.startswith('# Data:'): plan_data['data'] = line.split(':', 1)[1].strip()
-        elif line.startswith('# Horário:'): plan_data['horario'] = line.split(':', 1)[1].strip()
-    blocos = ['[CONTEUDO]', '[ESTRATEGIA]', '[RECURSO_TITULO]', '[RECURSO_LINK]', '[RECURSO_COMENTARIO]']
-    for i, bloco_atual in enumerate(blocos):
-        try:
-            start_index = content.index(bloco_atual) + len(bloco_atual)
-            end_index = len(content)
-            if i + 1 < len(blocos):
-                next_block_start = content.find(blocos[i+1], start_index)
-                if next_block_start != -1: end_index = next_block_start
-            valor = content[start_index:end_index].strip()
-            if bloco_atual in ['[CONTEUDO]', '[ESTRATEGIA]'] and (not valor or "Preencher" in valor): return None
-            plan_data[bloco_atual.strip('[]').lower()] = valor
-        except ValueError: continue
-    return plan_data if 'data' in plan_data and 'horario' in plan_data else None
+    """Dados do plano (ver `PlanoAula.como_dict`) se ele estiver pronto para registro; senão None."""
+    plano = PlanoAula.ler(file_path)
+    return plano.como_dict() if plano and plano.completo else None
 
 def find_plans_to_register(project_root, mapa_turmas, turmas_disciplinas):
     aulas_para_registrar = []
@@ -408,11 +668,9 @@ def find_plans_to_register(project_root, mapa_turmas, turmas_disciplinas):
             caminho_arquivo = os.path.join(caminho_pasta_turma, nome_arquivo)
             plano = parse_plan_file(caminho_arquivo)
             if plano:
-                # CORREÇÃO: Atualiza a regex para corresponder ao novo formato de nome de arquivo
-                # que inclui o horário (ex: DISC_AAAAMMDD_HHMM.txt).
-                match = re.match(r'(.+)_(\d{8})_\d{4}\.txt$', nome_arquivo)
-                if not match: continue
-                disciplina_curta = match.group(1)
+                # Nome no formato DISC_AAAAMMDD_HHMM.txt
+                disciplina_curta = disciplina_do_nome(nome_arquivo)
+                if not disciplina_curta: continue
                 nome_curto_turma_normalizado = nome_pasta_turma.replace('_', 'º').replace(' ', '')
                 turma_completa = mapa_turmas_reverso.get(nome_curto_turma_normalizado)
                 disciplina_completa = mapa_disciplinas_reverso.get(disciplina_curta)
@@ -423,6 +681,8 @@ def find_plans_to_register(project_root, mapa_turmas, turmas_disciplinas):
                 aulas_para_registrar.append({'info': aula_info, 'plano': plano})
             else:
                 print(f"INFO: Plano '{nome_arquivo}' ignorado por estar incompleto (contém 'Preencher').")
+    # Agrupa a fila por (turma, disciplina): o Registrador só navega entre páginas na troca de grupo
+    aulas_para_registrar.sort(key=lambda item: (item['info']['turma'], item['info']['disciplina'], item['info']['data'], item['info']['horario']))
     return aulas_para_registrar
 
 class Logger:
@@ -453,6 +713,11 @@ if __name__ == '__main__':
         print(f"ERRO: Arquivo de configuração não encontrado: {e.filename}")
         exit(1)
 
+    # config.json é opcional aqui: usado apenas para preferências (ex: perfil do navegador)
+    config = {}
+    if os.path.exists(os.path.join(DATA_PATH, 'config.json')):
+        with open(os.path.join(DATA_PATH, 'config.json'), 'r', encoding='utf-8-sig') as f: config = json.load(f)
+
     # --- Configuração do Log ---
     AULAS_DIR = os.path.join(PROJECT_ROOT, 'aulas')
     LOGS_DIR = os.path.join(AULAS_DIR, 'logs') # Diretório específico para logs
@@ -461,6 +726,8 @@ if __name__ == '__main__':
     log_filename = f"log_registro_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
     log_filepath = os.path.join(LOGS_DIR, log_filename)
     sys.stdout = Logger(log_filepath)
+    revisao_filepath = os.path.join(LOGS_DIR, log_filename.replace('log_registro_', 'revisao_registro_').replace('.txt', '.json'))
+    trace_filepath = os.path.join(LOGS_DIR, log_filename.replace('log_registro_', 'trace_registro_').replace('.txt', '.jsonl'))
     print(f"--- Log de execução iniciado. Salvo em: {log_filepath} ---")
 
     aulas_para_registrar = find_plans_to_register(PROJECT_ROOT, mapa_turmas, turmas_disciplinas)
@@ -468,11 +735,20 @@ if __name__ == '__main__':
         print("\nNenhum plano de aula encontrado para registrar.")
         exit(0)
 
-    print(f"\nEncontradas {len(aulas_para_registrar)} aulas para registrar.")
+    grupos = {(item['info']['turma'], item['info']['disciplina']) for item in aulas_para_registrar}
+    print(f"\nEncontradas {len(aulas_para_registrar)} aulas para registrar, em {len(grupos)} turma(s)/disciplina(s).")
     
     registrador = Registrador(project_root=PROJECT_ROOT)
+    registrador.config = config
+    registrador.rastreio = RastreioEtapas(trace_filepath)
+    registrador.modo_lote = '--lote' in sys.argv or bool(config.get('registro_em_lote', False))
+    if registrador.modo_lote:
+        print("[Registrador] Modo lote: a fila será registrada sem confirmações; falhas irão para a lista de revisão.")
+    revisao = [] # Aulas não registradas, para conferência manual
+    refazer_interrompidas = '--refazer-interrompidas' in sys.argv
+    registrador._preparar_diario()
     registrador._initialize_driver()
-    registrador._login_and_navigate_to_turmas("https://portal.seduc.pi.gov.br/#!/turmas", creds)
+    registrador._login_and_navigate_to_turmas(resolver_url_portal(config), creds)
     
     try:
         for i, item in enumerate(aulas_para_registrar):
@@ -482,8 +758,20 @@ if __name__ == '__main__':
             print(f"  - Horário:   {info['horario']}")
             print(f"  - Turma:     {info['turma']}")
             print(f"  - Disciplina: {info['disciplina']}")
+            situacao = registrador.situacao_no_diario(info)
+            if situacao == SITUACAO_CONCLUIDA:
+                print(f"  -> O diário indica que esta aula já foi registrada. Removendo arquivo: {info['caminho_arquivo']}")
+                registrador.concluir_aula(info)
+                continue
+            if situacao == SITUACAO_INTERROMPIDA and not refazer_interrompidas:
+                etapa = registrador.etapas_diario[registrador._chave_aula(info)]
+                motivo = f"Registro interrompido após a etapa '{etapa}': o portal pode ter a aula incompleta."
+                print(f"  -> {motivo} Confira no portal (ou rode o scraper) antes de tentar de novo.")
+                revisao.append({**info, 'motivo': motivo})
+                continue
+
             
-            user_choice = input("Deseja registrar esta aula? (s = sim / n = pular / parar = encerrar): ").lower()
+            user_choice = 's' if registrador.modo_lote else input("Deseja registrar esta aula? (s = sim / n = pular / parar = encerrar): ").lower()
 
             if user_choice == 'n':
                 print("  -> Aula pulada pelo usuário. O arquivo será mantido.")
@@ -497,12 +785,22 @@ if __name__ == '__main__':
 
             if registrador.registrar_aula(info, item['plano']):
                 print(f"SUCESSO: Aula registrada. Removendo arquivo: {info['caminho_arquivo']}")
-                os.remove(info['caminho_arquivo'])
+                registrador.concluir_aula(info)
             else:
                 print(f"FALHA: O registro da aula falhou. O arquivo será mantido para nova tentativa.")
-            
-            time.sleep(2)
+                revisao.append({**info, 'motivo': registrador.ultimo_erro})
     finally:
+        registrador.encerrar_diario()
+        if revisao:
+            with open(revisao_filepath, 'w', encoding='utf-8') as f:
+                json.dump(revisao, f, indent=4, ensure_ascii=False)
+            print(f"\n[Revisão] {len(revisao)} aula(s) não registrada(s). Lista salva em: {revisao_filepath}")
+            for item in revisao:
+                print(f"  - {item['turma']} / {item['disciplina']} em {item['data']} {item['horario']}: {item['motivo']}")
+        if registrador.espera:
+            registrador.espera.imprimir_resumo("esperas do registro")
+        registrador.rastreio.imprimir_resumo("etapa do registro")
+        registrador.rastreio.fechar()
         if registrador.driver and registrador.driver.window_handles:
             registrador.driver.quit()
             print("\nProcesso finalizado.")
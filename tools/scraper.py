@@ -1,15 +1,68 @@
 
 import json
 import os
-import time
 import sys
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
+import ast
+import queue
+import threading
+from datetime import datetime
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
-from webdriver_manager.chrome import ChromeDriverManager
+from navegador import argumento_cli, resolver_perfil, resolver_url_portal, iniciar_chrome, PERFIL_RAPIDO
+from sessao_portal import restaurar_sessao, salvar_sessao, VALIDADE_PADRAO_MINUTOS
+from esperas import EsperaAdaptativa, INTERVALO_PADRAO
+from captura_rede import CapturaRede, resolver_backend, aulas_de_outra_disciplina, BACKEND_REDE
+from diario import DiarioJsonl
+from aulas_jsonl import chave_aula, existe_historico, carregar_aulas, GravadorAulas, compactar
+
+# Script executado dentro da página para ler a tabela inteira em uma única chamada
+# ao WebDriver. Retorna os cabeçalhos e as linhas como listas de strings, ou null
+# se a tabela ainda não estiver no DOM (nesse caso o caminho Selenium é usado).
+JS_EXTRAIR_TABELA = """
+const table = document.querySelector('table');
+if (!table) { return null; }
+const texto = (el) => (el.innerText || el.textContent || '').trim();
+const headers = Array.from(table.querySelectorAll('thead th')).map(texto);
+const linhas = Array.from(table.querySelectorAll('tbody tr')).map(
+    (tr) => Array.from(tr.querySelectorAll('td')).map(texto)
+);
+return {headers: headers, linhas: linhas};
+"""
+
+ARQUIVO_MARCAS_COLETA = 'marcas_coleta.json'
+ARQUIVO_DIARIO_COLETA = 'coleta_em_andamento.jsonl'
+FORMATOS_DATA_CADASTRO = ("%d/%m/%Y %H:%M:%S", "%d/%m/%Y %H:%M", "%d/%m/%Y")
+
+
+def parse_data_cadastro(texto):
+    """Converte o texto da coluna 'Data de Cadastro da Aula' em datetime (ou None se não reconhecido)."""
+    texto = (texto or '').strip()
+    for formato in FORMATOS_DATA_CADASTRO:
+        try:
+            return datetime.strptime(texto, formato)
+        except ValueError:
+            continue
+    return None
+
+
+def mesclar_aulas(aulas_existentes, aulas_novas):
+    """
+    Mescla 'aulas_novas' em 'aulas_existentes' mantendo a ordem original.
+    Aulas já conhecidas são atualizadas (ex: mudança de status); as demais são acrescentadas ao final.
+    """
+    resultado = list(aulas_existentes)
+    posicoes = {chave_aula(aula): i for i, aula in enumerate(resultado)}
+    for aula in aulas_novas:
+        chave = chave_aula(aula)
+        if chave in posicoes:
+            resultado[posicoes[chave]] = aula
+        else:
+            posicoes[chave] = len(resultado)
+            resultado.append(aula)
+    return resultado
+
 
 class Scraper:
     """
@@ -17,47 +70,87 @@ class Scraper:
     de um portal educacional, replicando a funcionalidade de um script Puppeteer.
     """
 
+    # Mapeamento dos cabeçalhos da tabela do portal para as chaves do JSON de saída
+    HEADER_MAP = {
+        'Data da Aula': 'dataAula',
+        'Horário (inicial ~ final)': 'horario',
+        'Turma': 'turma',
+        'Componente': 'componenteCurricular',
+        'Data de Cadastro da Aula': 'data_cadastro',
+        'Situação': 'status'
+    }
+
     def __init__(self, project_root):
         self.project_root = project_root
         self.data_path = os.path.join(self.project_root, 'data')
         self.driver = None
         self.wait = None
+        self.espera = None
+        self.espera_workers = None # Medições somadas dos workers da coleta paralela
         self.mapeamento_turmas = {}
         self.mapa_turmas_reverso = {} # NOVO: Para mapear nome curto -> nome completo
         self.turmas_para_coletar = []
         self.nome_professor = ""
+        self.config = {}
 
         # NOVO: Para filtrar disciplinas já completas
         self.disciplinas_completas = set()
         self.dados_antigos_completos = []
 
-    def _initialize_driver(self):
-        """Inicializa o WebDriver do Selenium."""
+        # Coleta incremental: para cada (turma, disciplina), a data de cadastro mais recente
+        # já coletada e o total de aulas. A paginação para ao alcançar registros conhecidos.
+        self.modo_incremental = False
+        self.aulas_existentes = []
+        self.marcas_coleta = {}
+
+        # Extração da tabela via script único na página (False força o modo célula a célula)
+        self.extracao_em_lote = True
+
+        # Backend 'rede': lê as respostas JSON da API do portal (None = leitura da tabela do DOM)
+        self.captura = None
+
+        # Checkpoints: cada disciplina concluída é gravada no diário. Com --resume, as
+        # disciplinas já gravadas por uma execução interrompida não são coletadas de novo.
+        self.diario = None
+        self.disciplinas_retomadas = {} # (turma, disciplina) -> aulas gravadas no diário
+
+        # Histórico em JSON Lines: cada página extraída é gravada imediatamente (aulas_jsonl.py)
+        self.gravador = None
+
+    def _initialize_driver(self, perfil=None):
+        """
+        Inicializa o WebDriver do Selenium.
+        A coleta roda sem supervisão, então o perfil padrão é o 'rapido' (headless).
+        """
         print("[Scraper] Inicializando o WebDriver do Chrome...")
-        options = webdriver.ChromeOptions()
-        options.add_argument("--start-maximized")
-        # options.add_argument("--headless") # Descomente para rodar em segundo plano
-        
+        perfil = perfil or resolver_perfil(self.config, padrao=PERFIL_RAPIDO)
+        capturar_rede = resolver_backend(self.config) == BACKEND_REDE
+
         try:
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=options)
-            self.wait = WebDriverWait(self.driver, 20) # Timeout padrão de 20 segundos
+            self.driver = iniciar_chrome(perfil, capturar_rede=capturar_rede, data_path=self.data_path)
+            self.wait = WebDriverWait(self.driver, 20, poll_frequency=INTERVALO_PADRAO) # Timeout padrão de 20 segundos
+            self.espera = EsperaAdaptativa(self.driver, timeout=20)
         except Exception as e:
             raise RuntimeError(f"Falha ao inicializar o WebDriver: {e}")
 
+        if capturar_rede:
+            print("[Scraper] Backend de coleta: 'rede' (respostas JSON da API, com a tabela como fallback).")
+            captura = CapturaRede(self.driver)
+            self.captura = captura if captura.iniciar() else None
+
     def _analisar_aulas_existentes(self):
         """
-        Lê 'aulas_coletadas.json', identifica disciplinas com 40h ou mais,
+        Lê o histórico de aulas (aulas_coletadas.jsonl/.json), identifica disciplinas com 40h ou mais,
         e as adiciona à lista de exclusão para a coleta.
         """
-        aulas_existentes_path = os.path.join(self.data_path, 'aulas_coletadas.json')
-        if not os.path.exists(aulas_existentes_path):
-            print("[Análise Prévia] Arquivo 'aulas_coletadas.json' não encontrado. Todas as disciplinas serão coletadas.")
+        if not existe_historico(self.data_path):
+            print("[Análise Prévia] Histórico 'aulas_coletadas' não encontrado. Todas as disciplinas serão coletadas.")
             return
 
-        print("[Análise Prévia] Lendo 'aulas_coletadas.json' para otimizar a coleta...")
-        with open(aulas_existentes_path, 'r', encoding='utf-8-sig') as f:
-            aulas_existentes = json.load(f)
+        print("[Análise Prévia] Lendo o histórico de aulas para otimizar a coleta...")
+        aulas_existentes = carregar_aulas(self.data_path)
+        self.aulas_existentes = aulas_existentes
+        self._carregar_marcas_coleta()
 
         # Contagem de aulas por (turma, disciplina)
         contagem = {}
@@ -91,6 +184,82 @@ class Scraper:
         ]
         print(f"[Análise Prévia] {len(self.dados_antigos_completos)} registros de aulas completas foram preservados.")
 
+    def _carregar_marcas_coleta(self):
+        """Lê 'marcas_coleta.json' ({"('turma', 'disciplina')": {...}}) para a coleta incremental."""
+        caminho = os.path.join(self.data_path, ARQUIVO_MARCAS_COLETA)
+        if not os.path.exists(caminho):
+            return
+        try:
+            with open(caminho, 'r', encoding='utf-8') as f:
+                dados = json.load(f)
+            if not isinstance(dados, dict):
+                raise ValueError("conteúdo não é um objeto JSON")
+        except (OSError, ValueError) as e:
+            # Arquivo corrompido (ex: execução interrompida durante a gravação): sem marcas, a coleta é completa
+            print(f"[Incremental] AVISO: '{ARQUIVO_MARCAS_COLETA}' ilegível ({e}). Todas as disciplinas serão coletadas por completo.")
+            return
+        # Mesma convenção de chaves do 'recursos_links.json': tupla serializada como string
+        for chave_str, marca in dados.items():
+            try:
+                self.marcas_coleta[ast.literal_eval(chave_str)] = marca
+            except (ValueError, SyntaxError):
+                print(f"[Incremental] AVISO: Chave inválida ignorada em '{ARQUIVO_MARCAS_COLETA}': {chave_str}")
+
+    def _salvar_marcas_coleta(self, aulas):
+        """Recalcula e salva a marca (data de cadastro mais recente e total) de cada disciplina."""
+        marcas = {}
+        for aula in aulas:
+            chave = (aula.get('turma'), aula.get('componenteCurricular'))
+            if not all(chave):
+                continue
+            marca = marcas.setdefault(chave, {'ultima_data_cadastro': None, 'total': 0})
+            marca['total'] += 1
+            data_cadastro = parse_data_cadastro(aula.get('data_cadastro'))
+            ultima = parse_data_cadastro(marca['ultima_data_cadastro'])
+            if data_cadastro and (ultima is None or data_cadastro > ultima):
+                marca['ultima_data_cadastro'] = aula['data_cadastro']
+
+        caminho = os.path.join(self.data_path, ARQUIVO_MARCAS_COLETA)
+        caminho_temp = caminho + '.tmp'
+        with open(caminho_temp, 'w', encoding='utf-8') as f:
+            json.dump({str(chave): marca for chave, marca in sorted(marcas.items())}, f, ensure_ascii=False, indent=4)
+        os.replace(caminho_temp, caminho)
+        self.marcas_coleta = marcas
+        print(f"[Incremental] Marcas de coleta atualizadas para {len(marcas)} disciplina(s).")
+
+    def _preparar_diario(self, retomar=False):
+        """
+        Abre o diário de checkpoints da coleta. Sem 'retomar', um diário antigo é descartado
+        e a coleta começa do zero; com 'retomar', as disciplinas nele são reaproveitadas.
+        """
+        self.diario = DiarioJsonl(os.path.join(self.data_path, ARQUIVO_DIARIO_COLETA))
+        if not retomar:
+            self.diario.apagar()
+            return
+
+        for entrada in self.diario.ler():
+            self.disciplinas_retomadas[(entrada['turma'], entrada['disciplina'])] = entrada['aulas']
+        if self.disciplinas_retomadas:
+            total = sum(len(aulas) for aulas in self.disciplinas_retomadas.values())
+            print(f"[Retomada] {len(self.disciplinas_retomadas)} disciplina(s) ({total} aulas) recuperadas da execução interrompida.")
+        else:
+            print("[Retomada] Nenhum checkpoint encontrado. A coleta começará do zero.")
+
+    def _registrar_checkpoint(self, nome_turma, nome_disciplina, aulas):
+        """Grava no diário uma disciplina coletada por completo."""
+        if self.diario:
+            self.diario.registrar({
+                'turma': nome_turma,
+                'disciplina': nome_disciplina,
+                'aulas': aulas,
+                'concluida_em': datetime.now().strftime('%d/%m/%Y %H:%M:%S'),
+            })
+
+    def concluir_diario(self):
+        """Descarta o diário depois que o resultado final foi salvo."""
+        if self.diario:
+            self.diario.apagar()
+
     def _load_configs(self):
         """Carrega os arquivos de configuração necessários."""
         print(f"[Scraper] Lendo configurações de: {self.data_path}")
@@ -107,6 +276,7 @@ class Scraper:
             # Executa a análise das aulas existentes ANTES de prosseguir
             self._analisar_aulas_existentes()
 
+            self.config = config_data
             self.nome_professor = config_data.get('professor')
             if not self.nome_professor:
                 raise ValueError('Nome do professor não encontrado em data/config.json')
@@ -164,10 +334,8 @@ class Scraper:
         print(f"Navegando para {url}...")
         self.driver.get(url)
 
-        time.sleep(0.5) # Pausa para observação
         print("Preenchendo formulário de login...")
-        self.wait.until(EC.presence_of_element_located((By.ID, 'username'))).send_keys(credenciais['username'])
-        time.sleep(0.5)
+        self.espera.ate(EC.presence_of_element_located((By.ID, 'username')), 'formulario_login').send_keys(credenciais['username'])
         self.driver.find_element(By.ID, 'password').send_keys(credenciais['password'])
         
         print("Clicando no botão de login...")        
@@ -179,20 +347,18 @@ class Scraper:
             # Etapa: Escolher Perfil
             print("Aguardando seleção de perfil 'Professor(a)'...")
             profile_selector = (By.CSS_SELECTOR, 'a.collection-item[ng-click="selecionarPerfil(perfil)"]')
-            time.sleep(0.5)
-            self.wait.until(EC.element_to_be_clickable(profile_selector)).click()
+            self.espera.clicavel(profile_selector, 'perfil_clicavel').click()
             print("Perfil 'Professor(a)' selecionado.")
 
             # Etapa: Escolher Instituição (dentro de um iframe)
             print("Aguardando iframe de seleção de instituição...")
             iframe_selector = (By.ID, 'iframe-container')
-            self.wait.until(EC.frame_to_be_available_and_switch_to_it(iframe_selector))
+            self.espera.ate(EC.frame_to_be_available_and_switch_to_it(iframe_selector), 'iframe_instituicao')
             
             print("Dentro do iframe, clicando no botão 'ABRIR'...")
             # Em Selenium, usamos XPath para encontrar um elemento pelo texto contido nele
             open_button_selector = (By.XPATH, "//button[contains(., 'ABRIR')]")
-            time.sleep(0.5)
-            self.wait.until(EC.element_to_be_clickable(open_button_selector)).click()
+            self.espera.clicavel(open_button_selector, 'abrir_clicavel').click()
             
             # Sair do iframe atual para o contexto da página principal
             self.driver.switch_to.default_content()
@@ -202,13 +368,29 @@ class Scraper:
             self._take_screenshot("selecao_perfil_instituicao")
             raise TimeoutException(f"Tempo esgotado ao selecionar perfil ou instituição: {e.msg}")
 
+    def _entrar(self, url, credenciais):
+        """
+        Entra no portal até a listagem de turmas. Reaproveita a sessão salva em disco
+        quando válida; caso contrário, faz login e seleção de perfil/instituição e salva a nova sessão.
+        """
+        validade = int(self.config.get('sessao_validade_minutos', VALIDADE_PADRAO_MINUTOS))
+        if restaurar_sessao(self.driver, url, self.data_path, validade, espera=self.espera):
+            return
+
+        self._login(url, credenciais)
+        self._select_profile_and_institution()
+        try:
+            self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, 'iframe[src*="listagem-turmas"]')))
+            salvar_sessao(self.driver, self.data_path)
+        except TimeoutException:
+            print("[Sessão] AVISO: Listagem de turmas não apareceu. A sessão não foi salva.")
+
     def _extract_table_data(self):
         """Extrai os dados da tabela de aulas na página atual."""
         try:
             # Espera o spinner de loading desaparecer
-            spinner_selector = (By.CSS_SELECTOR, "svg.animate-spin")
             print("[Extração] Aguardando tabela carregar (spinner desaparecer)...")
-            self.wait.until(EC.invisibility_of_element_located(spinner_selector))
+            self.espera.spinner_sumir()
         except TimeoutException:
             print("[Extração] AVISO: Spinner de loading não desapareceu no tempo esperado. A tabela pode estar vazia ou já carregada.")
 
@@ -220,8 +402,49 @@ class Scraper:
         except NoSuchElementException:
             pass # É o esperado, significa que a tabela tem dados
 
-        # Extrai os dados
+        if self.extracao_em_lote:
+            linhas_dados = self._extract_table_data_js()
+            if linhas_dados is not None:
+                return linhas_dados
+            print("[Extração] AVISO: Extração em lote indisponível. Usando leitura célula a célula.")
+
+        return self._extract_table_data_selenium()
+
+    def _mapear_linhas(self, headers, linhas):
+        """Converte as linhas da tabela (listas de textos) em dicionários usando o HEADER_MAP."""
         linhas_dados = []
+        for celulas in linhas:
+            if not celulas: continue
+
+            # Pula linhas que são apenas placeholders de "nenhum registro"
+            if len(celulas) == 1 and "Nenhum registro encontrado" in celulas[0]:
+                continue
+
+            linha_dict = {}
+            for i, header_text in enumerate(headers):
+                key = self.HEADER_MAP.get(header_text)
+                if key and i < len(celulas):
+                    linha_dict[key] = celulas[i].strip()
+            linhas_dados.append(linha_dict)
+        return linhas_dados
+
+    def _extract_table_data_js(self):
+        """
+        Lê cabeçalhos e células da tabela com um único execute_script.
+        Retorna None se o script falhar, para que o chamador use o caminho Selenium.
+        """
+        try:
+            tabela = self.driver.execute_script(JS_EXTRAIR_TABELA)
+        except Exception as e:
+            print(f"[Extração] AVISO: Falha no script de extração em lote: {e}")
+            return None
+
+        if not tabela or not tabela.get('headers'):
+            return None
+        return self._mapear_linhas(tabela['headers'], tabela.get('linhas') or [])
+
+    def _extract_table_data_selenium(self):
+        """Extrai a tabela célula a célula via WebDriver (caminho original, usado como fallback)."""
         # CORREÇÃO: Re-localiza a tabela a cada chamada para evitar StaleElementReferenceException.
         # A tabela é buscada aqui, e suas linhas e cabeçalhos são processados imediatamente.
         try:
@@ -231,36 +454,34 @@ class Scraper:
             print("[Extração] AVISO: A tabela ficou obsoleta durante a extração. Tentando novamente...")
             table = self.wait.until(EC.presence_of_element_located((By.TAG_NAME, "table")))
             headers = [th.text.strip() for th in table.find_elements(By.CSS_SELECTOR, "thead th")]
-        header_map = {
-            'Data da Aula': 'dataAula',
-            'Horário (inicial ~ final)': 'horario',
-            'Turma': 'turma',
-            'Componente': 'componenteCurricular',
-            'Data de Cadastro da Aula': 'data_cadastro',
-            'Situação': 'status'
-        }
 
+        # Lê apenas as colunas mapeadas, evitando round-trips desnecessários ao WebDriver
+        indices_uteis = {i for i, header_text in enumerate(headers) if header_text in self.HEADER_MAP}
+        linhas = []
         for linha in table.find_elements(By.CSS_SELECTOR, "tbody tr"):
             celulas = linha.find_elements(By.TAG_NAME, "td")
-            if not celulas: continue
-            
-            # Pula linhas que são apenas placeholders de "nenhum registro"
-            if len(celulas) == 1 and "Nenhum registro encontrado" in celulas[0].text:
+            if len(celulas) == 1:
+                linhas.append([celulas[0].text])
                 continue
+            linhas.append([celula.text if i in indices_uteis else '' for i, celula in enumerate(celulas)])
 
-            linha_dict = {}
-            for i, header_text in enumerate(headers):
-                key = header_map.get(header_text)
-                if key and i < len(celulas):
-                    linha_dict[key] = celulas[i].text.strip()
-            linhas_dados.append(linha_dict)
-        
-        return linhas_dados
+        return self._mapear_linhas(headers, linhas)
 
-    def _collect_with_pagination(self):
+    def _collect_with_pagination(self, marca=None, turma=None, disciplina=None):
         """
         Coleta dados de todas as páginas da tabela, navegando pela paginação.
+        Com 'marca' (coleta incremental), a paginação pode parar na primeira aula anterior à última
+        já coletada, mas só quando o total de aulas da listagem confirma que nenhuma aula nova ficou
+        para trás (a tabela pode não estar ordenada pela data de cadastro); sem essa confirmação,
+        todas as páginas são lidas.
+        'turma' e 'disciplina' identificam a página aberta, para validar as respostas da API.
         """
+        limite_incremental = parse_data_cadastro(marca.get('ultima_data_cadastro')) if marca else None
+        if self.captura:
+            dados_rede = self._collect_via_rede(limite_incremental, turma, disciplina)
+            if dados_rede is not None:
+                return dados_rede
+
         all_data = []
         page_count = 1
         
@@ -275,16 +496,22 @@ class Scraper:
             # Só clica se não estiver já em 50
             if "50 Registros" not in registros_combobox.text:
                 self.driver.execute_script("arguments[0].click();", registros_combobox)
-                time.sleep(0.5) # Pausa para o dropdown abrir
                 
-                # Clica na opção "50"
-                option_50 = self.wait.until(EC.element_to_be_clickable(
-                    (By.XPATH, "//div[contains(@class, 'z-50')]//button[contains(., '50')]")
-                ))
+                # Clica na opção "50" (a espera por ela cobre a abertura do dropdown)
+                option_50 = self.espera.clicavel(
+                    (By.XPATH, "//div[contains(@class, 'z-50')]//button[contains(., '50')]"), 'opcao_50_clicavel'
+                )
+                assinatura = self.espera.assinatura_tabela()
                 self.driver.execute_script("arguments[0].click();", option_50)
                 print("[Paginação] Configurado para 50 registros. Aguardando recarregamento...")
-                # Espera a tabela recarregar após a mudança
-                self.wait.until(EC.invisibility_of_element_located((By.CSS_SELECTOR, "svg.animate-spin")))
+                # Espera a tabela recarregar após a mudança: o combobox passa a exibir "50 Registros"
+                # ou as linhas mudam (quando há mais registros que o tamanho de página anterior)
+                combobox_xpath = "//button[@role='combobox' and contains(., 'Registros')]"
+                self.espera.ate(
+                    lambda d: "50" in d.find_element(By.XPATH, combobox_xpath).text or self.espera.assinatura_tabela() != assinatura,
+                    'tamanho_pagina_aplicado', timeout=10, obrigatoria=False
+                )
+                self.espera.spinner_sumir()
             else:
                 print("[Paginação] Já está configurado para 50 registros por página.")
         except TimeoutException:
@@ -298,12 +525,31 @@ class Scraper:
             # CORREÇÃO: A condição foi simplificada para `if data_on_page:`
             # para garantir que qualquer dado retornado pela extração (incluindo aulas
             # com status "Excluída") seja contabilizado e processado.
+            alcancou_conhecidas = False
+            if data_on_page and limite_incremental:
+                novas_pagina, alcancou_conhecidas, ordenada = self._filtrar_aulas_novas(data_on_page, limite_incremental)
+                if not ordenada:
+                    print("[Incremental] AVISO: Tabela fora da ordem de cadastro. Coletando todas as páginas.")
+                    limite_incremental = None
+                elif alcancou_conhecidas and not self._parada_confirmada(all_data + novas_pagina, marca, limite_incremental):
+                    # Sem confirmação, a página é mantida inteira e a coleta segue até o fim
+                    alcancou_conhecidas = False
+                    limite_incremental = None
+                else:
+                    data_on_page = novas_pagina
+
             if data_on_page: 
                 all_data.extend(data_on_page)
+                if self.gravador:
+                    self.gravador.acrescentar(data_on_page)
                 print(f"[Paginação] {len(data_on_page)} aulas encontradas na página {page_count}. Total até agora: {len(all_data)}")
             else:
                 print("[Paginação] Nenhuma aula encontrada na página atual.")
 
+            if alcancou_conhecidas:
+                print("[Incremental] Aulas já coletadas alcançadas. Fim da paginação para esta disciplina.")
+                break
+
             # Verifica se o botão "Próxima" existe e está habilitado
             try:
                 # Localiza o botão que contém o texto "Próxima"
@@ -319,16 +565,16 @@ class Scraper:
                 
                 # Se não estiver desabilitado, clica para ir para a próxima página
                 print("[Paginação] Clicando no botão 'Próxima'...")
-                time.sleep(0.5) # Pausa antes do clique para estabilidade
+                assinatura = self.espera.assinatura_tabela()
                 self.driver.execute_script("arguments[0].click();", next_button)
                 page_count += 1
                 
-                # Aguarda o recarregamento da tabela (o spinner é um bom indicador)
-                # Esta espera é crucial para evitar coletar dados antigos antes da página atualizar
-                spinner_selector = (By.CSS_SELECTOR, "svg.animate-spin")
-                # Pausa após o clique para dar tempo do spinner aparecer
-                time.sleep(1)
-                self.wait.until(EC.invisibility_of_element_located(spinner_selector))
+                # Aguarda o recarregamento da tabela.
+                # Esta espera é crucial para evitar coletar dados antigos antes da página atualizar:
+                # primeiro as linhas precisam mudar, depois o spinner precisa ter sumido.
+                if self.espera.tabela_mudar(assinatura, timeout=10) is None:
+                    print("[Paginação] AVISO: O conteúdo da tabela não mudou após 'Próxima'.")
+                self.espera.spinner_sumir()
 
             except TimeoutException:
                 # Se o botão "Próxima" não for encontrado, significa que não há mais páginas
@@ -340,116 +586,317 @@ class Scraper:
         
         return all_data
 
-    def _navigate_and_collect(self):
+    def _collect_via_rede(self, limite_incremental=None, turma=None, disciplina=None):
+        """
+        Coleta a disciplina aberta a partir das respostas JSON da API, sem ler a tabela.
+        A listagem capturada é repetida com uma página grande para trazer todas as aulas de uma vez.
+        Retorna None quando a resposta não é reconhecida, pode estar incompleta ou traz aulas de
+        outra turma/disciplina; nesse caso o chamador faz a paginação pela tabela.
+        """
+        self.espera.spinner_sumir(obrigatoria=False)
+        listagem = self.espera.ate(lambda d: self.captura.listagem_aulas(), 'resposta_api', timeout=10, obrigatoria=False)
+        if not listagem:
+            print("[Rede] Listagem de aulas não identificada nas respostas da API. Usando a tabela.")
+            return None
+
+        url, cabecalhos, aulas, total = listagem
+        if total is None or len(aulas) < total:
+            completas = self.captura.repetir_com_pagina_grande(url, cabecalhos)
+            if completas is None:
+                print("[Rede] Não foi possível obter todas as aulas pela API. Usando a tabela.")
+                return None
+            aulas = completas
+        alheias = aulas_de_outra_disciplina(aulas, turma, disciplina)
+        if alheias:
+            print(f"[Rede] AVISO: {len(alheias)} aula(s) da API não são de '{turma}' / '{disciplina}' "
+                  f"(ex: '{alheias[0].get('turma')}' / '{alheias[0].get('componenteCurricular')}'). Usando a tabela.")
+            return None
+        print(f"[Rede] {len(aulas)} aulas lidas da API.")
+
+        if limite_incremental:
+            # A API já trouxe a disciplina inteira: todas as aulas seguem para a mesclagem, que também
+            # atualiza as conhecidas (ex: 'Aguardando confirmação' -> 'Aula confirmada')
+            novas = sum(1 for aula in aulas if (parse_data_cadastro(aula.get('data_cadastro')) or limite_incremental) > limite_incremental)
+            print(f"[Incremental] {novas} aula(s) cadastrada(s) desde a última coleta.")
+        if self.gravador:
+            self.gravador.acrescentar(aulas)
+        return aulas
+
+    def _parada_confirmada(self, aulas_lidas, marca, limite):
+        """
+        True se a paginação incremental pode parar: o total da listagem (informado pela API)
+        é igual ao total da última coleta mais as aulas cadastradas depois dela. Sem total, ou com
+        diferença, pode haver aula nova em outra página (ex: tabela ordenada pela data da aula).
+        """
+        listagem = self.captura.listagem_aulas() if self.captura else None
+        total_listagem = listagem[3] if listagem else None
+        novas = sum(1 for aula in aulas_lidas if (parse_data_cadastro(aula.get('data_cadastro')) or datetime.max) > limite)
+        esperado = (marca or {}).get('total', 0) + novas
+        if total_listagem is None:
+            print("[Incremental] Total da listagem desconhecido: sem como confirmar a parada antecipada. Coletando todas as páginas.")
+            return False
+        if total_listagem != esperado:
+            print(f"[Incremental] A listagem tem {total_listagem} aulas, mas eram esperadas {esperado} "
+                  f"({(marca or {}).get('total', 0)} conhecidas + {novas} novas). Coletando todas as páginas.")
+            return False
+        return True
+
+    def _filtrar_aulas_novas(self, aulas_pagina, limite):
+        """
+        Mantém as aulas cadastradas no mesmo instante ou depois do 'limite'.
+        Retorna (aulas_novas, alcancou_conhecidas, ordenada).
+        Aulas no instante do limite são mantidas e deduplicadas na mesclagem.
+        Se a página não estiver em ordem decrescente de cadastro, não há como parar cedo:
+        todas as aulas são mantidas e 'ordenada' é False.
+        """
+        datas = [parse_data_cadastro(aula.get('data_cadastro')) for aula in aulas_pagina]
+        datas_validas = [d for d in datas if d]
+        if any(anterior < seguinte for anterior, seguinte in zip(datas_validas, datas_validas[1:])):
+            return aulas_pagina, False, False
+
+        novas = [aula for aula, data in zip(aulas_pagina, datas) if data is None or data >= limite]
+        return novas, len(novas) < len(aulas_pagina), True
+
+    def _navigate_and_collect(self, turmas=None):
         """Navega pelas turmas e disciplinas, coletando os dados."""
         all_collected_data = []
+        for dados_turma in self._coletar_turmas(turmas or self.turmas_para_coletar).values():
+            all_collected_data.extend(dados_turma)
+        return all_collected_data
+
+    def _coletar_turmas(self, turmas):
+        """
+        Coleta as turmas informadas (nomes curtos) na ordem recebida.
+        Retorna um dicionário {nome_turma_curto: [aulas]}.
+        """
+        dados_por_turma = {}
 
         # Espera o iframe das turmas aparecer
         turmas_iframe_selector = (By.CSS_SELECTOR, 'iframe[src*="listagem-turmas"]')
         self.wait.until(EC.frame_to_be_available_and_switch_to_it(turmas_iframe_selector))
         print("Iframe de listagem de turmas carregado.")
 
-        for nome_turma_curto in self.turmas_para_coletar:
-            print(f"\n--- [LOOP] Iniciando coleta para a turma: {nome_turma_curto} ---")
-            
-            # CORREÇÃO: Usa o mapa reverso para obter o nome completo da turma.
-            nome_completo_turma = self.mapa_turmas_reverso.get(nome_turma_curto)
-            if not nome_completo_turma:
-                print(f"[LOOP] AVISO: Mapeamento não encontrado para a turma '{nome_turma_curto}'. Pulando...")
-                continue
+        for nome_turma_curto in turmas:
+            dados_por_turma[nome_turma_curto] = self._coletar_turma(nome_turma_curto)
 
-            print(f"[LOOP] Nome completo na página: '{nome_completo_turma}'")
+        # Ao final, retorna para o contexto principal para que o chamador possa continuar
+        self.driver.switch_to.default_content()
+        return dados_por_turma
 
-            # Encontra as disciplinas para a turma atual usando o nome completo
-            # CORREÇÃO 1: Usar "nomeTurma" para corresponder ao JSON.
-            turma_disciplinas_info = next((turma for turma in self.mapeamento_turmas if turma.get("nomeTurma") == nome_completo_turma), None)
-            
-            # CORREÇÃO 2: Extrair apenas o nome da disciplina do objeto.
-            disciplinas_da_turma = [d.get('nomeDisciplina') for d in turma_disciplinas_info.get('disciplinas', [])] if turma_disciplinas_info else []
+    def _coletar_turma(self, nome_turma_curto):
+        """Coleta todas as disciplinas de uma turma. Assume que o driver já está no iframe de turmas."""
+        all_collected_data = []
+        print(f"\n--- [LOOP] Iniciando coleta para a turma: {nome_turma_curto} ---")
+        
+        # CORREÇÃO: Usa o mapa reverso para obter o nome completo da turma.
+        nome_completo_turma = self.mapa_turmas_reverso.get(nome_turma_curto)
+        if not nome_completo_turma:
+            print(f"[LOOP] AVISO: Mapeamento não encontrado para a turma '{nome_turma_curto}'. Pulando...")
+            return all_collected_data
 
-            print(f"[LOOP] Disciplinas a coletar: {', '.join(disciplinas_da_turma)}")
-            
-            # A cada iteração de disciplina, a página recarrega.
-            # Então, para cada disciplina, precisamos re-localizar o card correto.
-            for i, nome_disciplina in enumerate(disciplinas_da_turma):
-                print(f"\n--- [SUB-LOOP] Processando disciplina: '{nome_disciplina}' ({i+1}/{len(disciplinas_da_turma)}) ---")
+        print(f"[LOOP] Nome completo na página: '{nome_completo_turma}'")
+
+        # Encontra as disciplinas para a turma atual usando o nome completo
+        # CORREÇÃO 1: Usar "nomeTurma" para corresponder ao JSON.
+        turma_disciplinas_info = next((turma for turma in self.mapeamento_turmas if turma.get("nomeTurma") == nome_completo_turma), None)
+        
+        # CORREÇÃO 2: Extrair apenas o nome da disciplina do objeto.
+        disciplinas_da_turma = [d.get('nomeDisciplina') for d in turma_disciplinas_info.get('disciplinas', [])] if turma_disciplinas_info else []
 
-                # NOVO: Verifica se a disciplina está na lista de exclusão
-                chave_disciplina = (nome_completo_turma, nome_disciplina)
-                if chave_disciplina in self.disciplinas_completas:
-                    print(f"[SUB-LOOP] IGNORANDO: A disciplina '{nome_disciplina}' da turma '{nome_turma_curto}' já possui 40h ou mais.")
-                    continue # Pula para a próxima disciplina
+        print(f"[LOOP] Disciplinas a coletar: {', '.join(disciplinas_da_turma)}")
+        
+        # A cada iteração de disciplina, a página recarrega.
+        # Então, para cada disciplina, precisamos re-localizar o card correto.
+        for i, nome_disciplina in enumerate(disciplinas_da_turma):
+            print(f"\n--- [SUB-LOOP] Processando disciplina: '{nome_disciplina}' ({i+1}/{len(disciplinas_da_turma)}) ---")
+
+            # NOVO: Verifica se a disciplina está na lista de exclusão
+            chave_disciplina = (nome_completo_turma, nome_disciplina)
+            if chave_disciplina in self.disciplinas_completas:
+                print(f"[SUB-LOOP] IGNORANDO: A disciplina '{nome_disciplina}' da turma '{nome_turma_curto}' já possui 40h ou mais.")
+                continue # Pula para a próxima disciplina
+
+            if chave_disciplina in self.disciplinas_retomadas:
+                print(f"[Retomada] IGNORANDO: '{nome_disciplina}' já foi coletada na execução interrompida.")
+                continue
+
+            
+            try:
+                # Re-localiza todos os cards da turma e seleciona o da disciplina atual
+                card_xpath = f"//div[div/h3[normalize-space()='{nome_completo_turma}'] and div/p[normalize-space()='{nome_disciplina}']]"
+                card = self.wait.until(EC.presence_of_element_located((By.XPATH, card_xpath)))
+
+                # Clica em "Registro de aulas" dentro do card correto
+                registro_aulas_link = card.find_element(By.XPATH, ".//p[normalize-space()='Registro de aulas']")
+                if self.captura:
+                    self.captura.descartar() # Apenas as respostas desta disciplina interessam
+                self.driver.execute_script("arguments[0].click();", registro_aulas_link) # Click com JS para evitar problemas de visibilidade
+                print("[SUB-LOOP] Clicou em 'Registro de aulas'.")
+
+                # Coleta com paginação (incremental: para ao alcançar as aulas já coletadas)
+                marca = self.marcas_coleta.get(chave_disciplina) if self.modo_incremental else None
+                if marca:
+                    print(f"[Incremental] Última aula conhecida cadastrada em {marca.get('ultima_data_cadastro')} ({marca.get('total')} aulas).")
+                dados_disciplina = self._collect_with_pagination(marca, nome_completo_turma, nome_disciplina) # SUBSTITUÍDO
+                all_collected_data.extend(dados_disciplina)
+                self._registrar_checkpoint(nome_completo_turma, nome_disciplina, dados_disciplina)
+                print(f"[SUB-LOOP] {len(dados_disciplina)} aulas coletadas para '{nome_disciplina}'.")
+
+                # Voltar para a lista de disciplinas
+                print("[SUB-LOOP] Voltando para a lista de turmas/disciplinas...")
+                voltar_btn = self.espera.clicavel((By.CSS_SELECTOR, 'button[title="Voltar"]'), 'voltar_clicavel')
+                self.driver.execute_script("arguments[0].click();", voltar_btn)
+                
+                # Espera a lista de cards recarregar
+                self.wait.until(EC.presence_of_element_located((By.XPATH, f"//h3[normalize-space()='{nome_completo_turma}']")))
+                print("[SUB-LOOP] Retornou à lista.")
 
+            except (TimeoutException, StaleElementReferenceException) as e:
+                print(f"[SUB-LOOP] Erro ao processar a disciplina '{nome_disciplina}': {e}")
+                self._take_screenshot(f"erro_disciplina_{nome_turma_curto}_{nome_disciplina}")
                 
+                # Tenta voltar para a lista para continuar com a próxima disciplina/turma
                 try:
-                    # Re-localiza todos os cards da turma e seleciona o da disciplina atual
-                    card_xpath = f"//div[div/h3[normalize-space()='{nome_completo_turma}'] and div/p[normalize-space()='{nome_disciplina}']]"
-                    card = self.wait.until(EC.presence_of_element_located((By.XPATH, card_xpath)))
-
-                    # Clica em "Registro de aulas" dentro do card correto
-                    time.sleep(0.5)
-                    registro_aulas_link = card.find_element(By.XPATH, ".//p[normalize-space()='Registro de aulas']")
-                    self.driver.execute_script("arguments[0].click();", registro_aulas_link) # Click com JS para evitar problemas de visibilidade
-                    print("[SUB-LOOP] Clicou em 'Registro de aulas'.")
-
-                    # Coleta com paginação
-                    dados_disciplina = self._collect_with_pagination() # SUBSTITUÍDO
-                    all_collected_data.extend(dados_disciplina)
-                    print(f"[SUB-LOOP] {len(dados_disciplina)} aulas coletadas para '{nome_disciplina}'.")
-
-                    # Voltar para a lista de disciplinas
-                    print("[SUB-LOOP] Voltando para a lista de turmas/disciplinas...")
-                    time.sleep(0.5)
-                    voltar_btn = self.wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, 'button[title="Voltar"]')))
+                    print("[SUB-LOOP] Tentando voltar para a lista (após erro)...")
+                    voltar_btn = self.espera.clicavel((By.CSS_SELECTOR, 'button[title="Voltar"]'), 'voltar_clicavel')
                     self.driver.execute_script("arguments[0].click();", voltar_btn)
-                    
-                    # Espera a lista de cards recarregar
                     self.wait.until(EC.presence_of_element_located((By.XPATH, f"//h3[normalize-space()='{nome_completo_turma}']")))
-                    print("[SUB-LOOP] Retornou à lista.")
+                    print("[SUB-LOOP] Retornou à lista (após erro).")
+                except Exception as nav_error:
+                    print(f"Falha crítica ao tentar voltar para a lista após erro: {nav_error}. Interrompendo o scraper.")
+                    raise
+                continue # Pula para a próxima disciplina
+
+        return all_collected_data
+
+    def _criar_worker(self):
+        """Cria um Scraper independente que compartilha as configurações já carregadas."""
+        worker = Scraper(project_root=self.project_root)
+        worker.mapeamento_turmas = self.mapeamento_turmas
+        worker.mapa_turmas_reverso = self.mapa_turmas_reverso
+        worker.nome_professor = self.nome_professor
+        worker.config = self.config
+        worker.disciplinas_completas = self.disciplinas_completas
+        worker.extracao_em_lote = self.extracao_em_lote
+        worker.modo_incremental = self.modo_incremental
+        worker.marcas_coleta = self.marcas_coleta
+        worker.diario = self.diario # O diário tem trava própria; todos os workers gravam no mesmo arquivo
+        worker.disciplinas_retomadas = self.disciplinas_retomadas
+        worker.gravador = self.gravador
+        return worker
+
+    def _coletar_em_paralelo(self, url, credenciais, num_workers):
+        """
+        Distribui as turmas entre N navegadores independentes, cada um com seu próprio login.
+        Os workers retiram turmas de uma fila compartilhada e o resultado é montado
+        na ordem de 'turmas_para_coletar', independente de qual worker terminou primeiro.
+        """
+        fila_turmas = queue.Queue()
+        for nome_turma_curto in self.turmas_para_coletar:
+            fila_turmas.put(nome_turma_curto)
+
+        dados_por_turma = {}
+        falhas = {}
+        lock = threading.Lock()
+        self.espera_workers = EsperaAdaptativa(None)
+
+        def executar_worker(indice):
+            worker = self._criar_worker()
+            try:
+                print(f"[Worker {indice}] Inicializando navegador e realizando login...")
+                worker._initialize_driver()
+                worker._entrar(url, credenciais)
 
-                except (TimeoutException, StaleElementReferenceException) as e:
-                    print(f"[SUB-LOOP] Erro ao processar a disciplina '{nome_disciplina}': {e}")
-                    self._take_screenshot(f"erro_disciplina_{nome_turma_curto}_{nome_disciplina}")
-                    
-                    # Tenta voltar para a lista para continuar com a próxima disciplina/turma
+                turmas_iframe_selector = (By.CSS_SELECTOR, 'iframe[src*="listagem-turmas"]')
+                worker.wait.until(EC.frame_to_be_available_and_switch_to_it(turmas_iframe_selector))
+
+                while True:
+                    try:
+                        nome_turma_curto = fila_turmas.get_nowait()
+                    except queue.Empty:
+                        break
+                    print(f"[Worker {indice}] Coletando turma '{nome_turma_curto}'...")
                     try:
-                        print("[SUB-LOOP] Tentando voltar para a lista (após erro)...")
-                        time.sleep(0.5)
-                        voltar_btn = self.wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, 'button[title="Voltar"]')))
-                        self.driver.execute_script("arguments[0].click();", voltar_btn)
-                        self.wait.until(EC.presence_of_element_located((By.XPATH, f"//h3[normalize-space()='{nome_completo_turma}']")))
-                        print("[SUB-LOOP] Retornou à lista (após erro).")
-                    except Exception as nav_error:
-                        print(f"Falha crítica ao tentar voltar para a lista após erro: {nav_error}. Interrompendo o scraper.")
+                        dados_turma = worker._coletar_turma(nome_turma_curto)
+                    except Exception as e:
+                        with lock:
+                            falhas[nome_turma_curto] = e
                         raise
-                    continue # Pula para a próxima disciplina
-        
-        # Ao final, retorna para o contexto principal para que o chamador possa continuar
-        self.driver.switch_to.default_content()
+                    with lock:
+                        dados_por_turma[nome_turma_curto] = dados_turma
+            except Exception as e:
+                print(f"[Worker {indice}] Erro fatal: {e}")
+                worker._take_screenshot(f"erro_worker_{indice}")
+            finally:
+                if worker.espera:
+                    with lock:
+                        self.espera_workers.incorporar(worker.espera)
+                if worker.driver:
+                    worker.driver.quit()
+
+        num_workers = max(1, min(num_workers, len(self.turmas_para_coletar)))
+        print(f"[Paralelo] Iniciando coleta com {num_workers} navegador(es) para {len(self.turmas_para_coletar)} turma(s).")
+        threads = [threading.Thread(target=executar_worker, args=(i + 1,)) for i in range(num_workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Turmas que ficaram na fila (todos os workers falharam antes de pegá-las) também são falhas
+        pendentes = [t for t in self.turmas_para_coletar if t not in dados_por_turma and t not in falhas]
+        if falhas or pendentes:
+            turmas_falhas = list(falhas) + pendentes
+            raise RuntimeError(f"A coleta paralela falhou para a(s) turma(s): {', '.join(turmas_falhas)}")
+
+        all_collected_data = []
+        for nome_turma_curto in self.turmas_para_coletar:
+            all_collected_data.extend(dados_por_turma[nome_turma_curto])
         return all_collected_data
-    
-    def capturar_dados(self, url, credenciais, disciplina_alvo=None):
+
+    def capturar_dados(self, url, credenciais, disciplina_alvo=None, num_workers=1):
         """
 Método principal que orquestra todo o processo de scraping.
+Com num_workers > 1, as turmas são coletadas em paralelo por navegadores independentes
+e o driver principal não é utilizado.
         """
         # MODIFICAÇÃO: Não carrega mais configs nem inicializa o driver aqui.
         # Isso será feito pelo script que o chama.
         try:
-            self._login(url, credenciais)
-            self._select_profile_and_institution()
-
-            # Se uma disciplina específica for fornecida, a lógica de navegação mudará.
-            # Esta parte pode ser expandida se a navegação direta for necessária.
-            # Por enquanto, a lógica principal de coleta já itera sobre as turmas.
-            collected_data = self._navigate_and_collect()
+            if num_workers > 1:
+                collected_data = self._coletar_em_paralelo(url, credenciais, num_workers)
+            else:
+                self._entrar(url, credenciais)
+
+                # Se uma disciplina específica for fornecida, a lógica de navegação mudará.
+                # Esta parte pode ser expandida se a navegação direta for necessária.
+                # Por enquanto, a lógica principal de coleta já itera sobre as turmas.
+                collected_data = self._navigate_and_collect()
+
+            if self.disciplinas_retomadas:
+                # As disciplinas da execução interrompida entram antes das recém-coletadas
+                aulas_retomadas = [aula for aulas in self.disciplinas_retomadas.values() for aula in aulas]
+                print(f"\n[Retomada] Incluindo {len(aulas_retomadas)} aulas recuperadas do diário.")
+                collected_data = aulas_retomadas + collected_data
             
+            if self.modo_incremental:
+                # Incremental: as aulas novas/atualizadas são mescladas ao histórico completo,
+                # que já inclui as disciplinas completas.
+                total_anterior = len(self.aulas_existentes)
+                collected_data = mesclar_aulas(self.aulas_existentes, collected_data)
+                print(f"\n[Incremental] Histórico mesclado: {total_anterior} -> {len(collected_data)} aulas.")
             # NOVO: Adiciona os dados das disciplinas que já estavam completas de volta ao resultado
-            if self.dados_antigos_completos:
+            elif self.dados_antigos_completos:
                 print(f"\n[Consolidação] Adicionando {len(self.dados_antigos_completos)} registros de aulas (que foram ignoradas na coleta) ao resultado final.")
                 collected_data.extend(self.dados_antigos_completos)
+                if self.gravador:
+                    self.gravador.acrescentar(self.dados_antigos_completos)
 
             print(f"\n--- FIM DO SCRAPING ---")
             print(f"Total de aulas coletadas de todas as turmas: {len(collected_data)}")
+            espera = self.espera_workers if num_workers > 1 else self.espera
+            if espera:
+                espera.imprimir_resumo("esperas da coleta")
+            self._salvar_marcas_coleta(collected_data)
             return collected_data
 
         except Exception as e:
@@ -503,10 +950,12 @@ Método principal que orquestra todo o processo de scraping.
             card = self.wait.until(EC.presence_of_element_located((By.XPATH, card_xpath)))
 
             registro_aulas_link = card.find_element(By.XPATH, ".//p[normalize-space()='Registro de aulas']")
+            if self.captura:
+                self.captura.descartar()
             self.driver.execute_script("arguments[0].click();", registro_aulas_link)
             print("Clicou em 'Registro de aulas'.")
 
-            dados_disciplina = self._collect_with_pagination()
+            dados_disciplina = self._collect_with_pagination(turma=nome_turma_completo, disciplina=nome_disciplina_completo)
             print(f"{len(dados_disciplina)} aulas coletadas para '{nome_disciplina_completo}'.")
 
             # Volta para a lista de disciplinas para a próxima iteração do loop no planejador
@@ -554,25 +1003,43 @@ if __name__ == '__main__':
         print("ERRO: O arquivo 'data/credentials.json' está mal formatado.")
         exit(1)
 
-    TARGET_URL = "https://portal.seduc.pi.gov.br/#!/turmas" # Substitua se necessário
-
     scraper_instance = Scraper(project_root=PROJECT_ROOT)    
     try:
         # A inicialização e carregamento de configs agora acontecem aqui para execução direta
         scraper_instance._load_configs()
-        scraper_instance._initialize_driver()
 
-        final_data = scraper_instance.capturar_dados(TARGET_URL, creds)
+        # Número de navegadores em paralelo: --workers N na linha de comando ou 'scraper_workers' no config.json
+        num_workers = int(argumento_cli('--workers', scraper_instance.config.get('scraper_workers', 1)))
+        # Coleta incremental: --incremental ou "coleta_incremental": true no config.json
+        scraper_instance.modo_incremental = '--incremental' in sys.argv or bool(scraper_instance.config.get('coleta_incremental'))
+        # Checkpoints por disciplina: --resume retoma uma coleta interrompida
+        retomar = '--resume' in sys.argv
+        scraper_instance._preparar_diario(retomar=retomar)
+        # Coleta completa grava uma nova geração do histórico; a incremental acrescenta ao existente
+        scraper_instance.gravador = GravadorAulas(
+            scraper_instance.data_path, nova_geracao=not scraper_instance.modo_incremental, retomar=retomar
+        )
+        if num_workers <= 1:
+            scraper_instance._initialize_driver()
+
+        # Endereço do portal: --url ou "url_portal" no config.json (ex: portal simulado)
+        TARGET_URL = resolver_url_portal(scraper_instance.config)
+        final_data = scraper_instance.capturar_dados(TARGET_URL, creds, num_workers=num_workers)
         
-        # Salva os dados coletados em um arquivo JSON
+        # As aulas já foram gravadas no .jsonl durante a coleta; a compactação
+        # remove repetições e regrava o aulas_coletadas.json legado
+        scraper_instance.gravador.concluir()
+        total = compactar(scraper_instance.data_path)
         output_path = os.path.join(PROJECT_ROOT, 'data', 'aulas_coletadas.json')
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(final_data, f, ensure_ascii=False, indent=4)
-        
-        print(f"\nDados salvos com sucesso em: {output_path}")
+        print(f"\nDados salvos com sucesso em: {output_path} ({total} aulas, também em 'aulas_coletadas.jsonl')")
+        scraper_instance.concluir_diario()
 
     except Exception as e:
         print(f"\nO processo de scraping falhou. Causa: {e}")
+        if scraper_instance.gravador:
+            scraper_instance.gravador.fechar()
+        if scraper_instance.diario and scraper_instance.diario.existe():
+            print("As disciplinas já concluídas foram salvas. Execute novamente com --resume para continuar de onde parou.")
     finally:
         # Garante que o driver seja fechado ao executar diretamente
         if scraper_instance and scraper_instance.driver:
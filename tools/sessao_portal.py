@@ -0,0 +1,244 @@
+"""
+Cache da sessão do portal Seduc em disco (`data/sessao_portal.json`).
+
+Após um login completo (usuário/senha, perfil e instituição), os cookies de todos os
+domínios e o localStorage/sessionStorage da página principal e do iframe de turmas são
+salvos. Nas execuções seguintes, dentro do prazo de validade, a sessão é restaurada e o
+navegador vai direto para a listagem de turmas. Se o portal rejeitar a sessão, o arquivo
+é descartado e o chamador faz o login completo normalmente.
+"""
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import NoSuchFrameException
+from esperas import EsperaAdaptativa
+
+ARQUIVO_SESSAO = 'sessao_portal.json'
+VALIDADE_PADRAO_MINUTOS = 60
+
+SELETOR_IFRAME_TURMAS = 'iframe[src*="listagem-turmas"]'
+SELETOR_IFRAME_INSTITUICAO = 'iframe#iframe-container:not([src*="listagem-turmas"])'
+SELETOR_PERFIL = 'a.collection-item[ng-click="selecionarPerfil(perfil)"]'
+
+# Lê o armazenamento do documento atual (página principal ou iframe)
+JS_LER_STORAGE = """
+const copiar = (s) => { const d = {}; for (let i = 0; i < s.length; i++) { const k = s.key(i); d[k] = s.getItem(k); } return d; };
+return {origem: window.location.origin, local: copiar(window.localStorage), session: copiar(window.sessionStorage)};
+"""
+
+# Script injetado em todos os frames antes dos scripts do portal: repõe o storage salvo
+# para a origem do frame, sem sobrescrever chaves que a aplicação já tenha definido.
+JS_SEMEAR_STORAGE = """
+(() => {
+    const dados = %s;
+    const entrada = dados[window.location.origin];
+    if (!entrada) { return; }
+    const repor = (s, itens) => { for (const k in itens) { if (s.getItem(k) === null) { s.setItem(k, itens[k]); } } };
+    try { repor(window.localStorage, entrada.local || {}); repor(window.sessionStorage, entrada.session || {}); } catch (e) {}
+})();
+"""
+
+
+def _caminho_sessao(data_path):
+    return os.path.join(data_path, ARQUIVO_SESSAO)
+
+
+def invalidar_sessao(data_path):
+    """Remove a sessão salva (ex: quando o portal a rejeita)."""
+    try:
+        os.remove(_caminho_sessao(data_path))
+    except FileNotFoundError:
+        pass # Já removida (ex: por outro navegador da coleta paralela)
+
+
+def carregar_sessao(data_path, validade_minutos=VALIDADE_PADRAO_MINUTOS):
+    """Retorna a sessão salva se ela existir e estiver dentro da validade, ou None."""
+    caminho = _caminho_sessao(data_path)
+    if validade_minutos <= 0 or not os.path.exists(caminho):
+        return None
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            sessao = json.load(f)
+        idade_minutos = (time.time() - sessao['salva_em']) / 60
+    except (json.JSONDecodeError, KeyError, TypeError, OSError) as e:
+        print(f"[Sessão] AVISO: Sessão salva inválida ({e}). Será feito um novo login.")
+        invalidar_sessao(data_path)
+        return None
+
+    if idade_minutos > validade_minutos:
+        print(f"[Sessão] Sessão salva expirou ({idade_minutos:.0f} min > {validade_minutos} min).")
+        invalidar_sessao(data_path)
+        return None
+    return sessao
+
+
+def salvar_sessao(driver, data_path):
+    """
+    Salva cookies e storage da sessão atual. Deve ser chamado com o driver no contexto
+    principal, após o iframe de listagem de turmas estar disponível.
+    """
+    try:
+        try:
+            cookies = driver.execute_cdp_cmd('Network.getAllCookies', {}).get('cookies', [])
+        except Exception:
+            cookies = driver.get_cookies()
+
+        storage = {}
+        principal = driver.execute_script(JS_LER_STORAGE)
+        storage[principal['origem']] = {'local': principal['local'], 'session': principal['session']}
+
+        iframes = driver.find_elements(By.CSS_SELECTOR, SELETOR_IFRAME_TURMAS)
+        if iframes:
+            driver.switch_to.frame(iframes[0])
+            try:
+                frame = driver.execute_script(JS_LER_STORAGE)
+                storage[frame['origem']] = {'local': frame['local'], 'session': frame['session']}
+            finally:
+                driver.switch_to.default_content()
+
+        sessao = {
+            'salva_em': time.time(),
+            'salva_em_legivel': datetime.now().strftime('%d/%m/%Y %H:%M:%S'),
+            'origem': principal['origem'],
+            'cookies': cookies,
+            'storage': storage,
+        }
+        caminho = _caminho_sessao(data_path)
+        # Temporário com nome único: vários navegadores da coleta paralela podem salvar ao mesmo tempo
+        descritor, caminho_temp = tempfile.mkstemp(prefix=ARQUIVO_SESSAO + '.', suffix='.tmp', dir=data_path)
+        try:
+            with os.fdopen(descritor, 'w', encoding='utf-8') as f:
+                json.dump(sessao, f, ensure_ascii=False)
+            os.replace(caminho_temp, caminho)
+        except BaseException:
+            try:
+                os.remove(caminho_temp)
+            except OSError:
+                pass
+            raise
+        print(f"[Sessão] Sessão salva em '{caminho}' ({len(cookies)} cookies).")
+    except Exception as e:
+        # Falhar ao salvar não impede a execução atual; apenas o próximo login será completo
+        print(f"[Sessão] AVISO: Não foi possível salvar a sessão: {e}")
+
+
+def _aplicar_cookies(driver, sessao):
+    """Repõe os cookies salvos. Usa CDP (todos os domínios) e cai para add_cookie se indisponível."""
+    agora = time.time()
+    cookies = [c for c in sessao.get('cookies', []) if not c.get('expires', -1) > 0 or c['expires'] > agora]
+    try:
+        parametros = []
+        for c in cookies:
+            cookie = {k: c[k] for k in ('name', 'value', 'domain', 'path', 'secure', 'httpOnly', 'sameSite', 'expires') if k in c}
+            if cookie.get('expires', -1) <= 0:
+                cookie.pop('expires', None) # Cookie de sessão
+            parametros.append(cookie)
+        driver.execute_cdp_cmd('Network.setCookies', {'cookies': parametros})
+    except Exception:
+        # Sem CDP: só é possível definir cookies do domínio atualmente aberto
+        driver.get(sessao['origem'])
+        for c in cookies:
+            cookie = {k: c[k] for k in ('name', 'value', 'path', 'secure', 'httpOnly', 'expiry') if k in c}
+            try:
+                driver.add_cookie(cookie)
+            except Exception:
+                continue
+
+
+def _estado_pagina(driver):
+    """Identifica em que etapa do fluxo de entrada o portal está."""
+    driver.switch_to.default_content()
+    if driver.find_elements(By.CSS_SELECTOR, SELETOR_IFRAME_TURMAS):
+        return 'turmas'
+    if any(e.is_displayed() for e in driver.find_elements(By.ID, 'username')):
+        return 'login'
+    if driver.find_elements(By.CSS_SELECTOR, SELETOR_PERFIL):
+        return 'perfil'
+    if driver.find_elements(By.CSS_SELECTOR, SELETOR_IFRAME_INSTITUICAO):
+        return 'instituicao'
+    return None
+
+
+def _estado_acionavel(driver):
+    """
+    Estado do fluxo de entrada quando há algo a fazer nele: na instituição, só depois que o
+    botão 'ABRIR' estiver habilitado. Devolve None enquanto a página ainda está carregando.
+    """
+    estado = _estado_pagina(driver)
+    if estado != 'instituicao':
+        return estado
+    try:
+        driver.switch_to.frame(driver.find_element(By.CSS_SELECTOR, SELETOR_IFRAME_INSTITUICAO))
+        botoes = driver.find_elements(By.XPATH, "//button[contains(., 'ABRIR')]")
+        pronto = bool(botoes) and botoes[0].is_enabled()
+    except NoSuchFrameException:
+        pronto = False # O iframe foi recriado entre a consulta e a troca de contexto
+    finally:
+        driver.switch_to.default_content()
+    return estado if pronto else None
+
+
+def restaurar_sessao(driver, url, data_path, validade_minutos=VALIDADE_PADRAO_MINUTOS, timeout=15, espera=None):
+    """
+    Tenta entrar no portal com a sessão salva.
+    Retorna True se a listagem de turmas foi alcançada (driver no contexto principal).
+    Retorna False se não há sessão válida ou se o portal exigiu novo login.
+    Cada etapa (perfil, instituição, turmas) é aguardada por 'espera' (EsperaAdaptativa do chamador),
+    para que o tempo da restauração apareça no resumo de esperas e no rastreio.
+    """
+    sessao = carregar_sessao(data_path, validade_minutos)
+    if not sessao:
+        return False
+
+    print(f"[Sessão] Restaurando sessão salva em {sessao.get('salva_em_legivel', '?')}...")
+    id_script = None
+    try:
+        _aplicar_cookies(driver, sessao)
+        try:
+            resposta = driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
+                'source': JS_SEMEAR_STORAGE % json.dumps(sessao.get('storage', {}))
+            })
+            id_script = resposta.get('identifier')
+        except Exception:
+            pass # Sem CDP, confia apenas nos cookies
+
+        driver.get(url)
+
+        espera = espera or EsperaAdaptativa(driver, timeout=timeout)
+        limite = time.monotonic() + timeout
+        acionado = None # Última etapa em que se clicou: espera-se sair dela antes de agir de novo
+
+        def proxima_etapa(d):
+            estado = _estado_acionavel(d)
+            return estado if estado != acionado else None
+
+        while time.monotonic() < limite:
+            estado = espera.ate(proxima_etapa, 'sessao_restaurada', timeout=max(limite - time.monotonic(), 0.1), obrigatoria=False)
+            if estado == 'turmas':
+                print("[Sessão] Sessão aceita. Login ignorado.")
+                return True
+            if estado in (None, 'login'):
+                break
+            if estado == 'perfil':
+                driver.find_element(By.CSS_SELECTOR, SELETOR_PERFIL).click()
+            elif estado == 'instituicao':
+                driver.switch_to.frame(driver.find_element(By.CSS_SELECTOR, SELETOR_IFRAME_INSTITUICAO))
+                driver.find_element(By.XPATH, "//button[contains(., 'ABRIR')]").click()
+                driver.switch_to.default_content()
+            acionado = estado
+    except Exception as e:
+        print(f"[Sessão] AVISO: Erro ao restaurar a sessão: {e}")
+    finally:
+        if id_script:
+            try:
+                driver.execute_cdp_cmd('Page.removeScriptToEvaluateOnNewDocument', {'identifier': id_script})
+            except Exception:
+                pass
+        driver.switch_to.default_content()
+
+    print("[Sessão] Sessão rejeitada pelo portal. Será feito o login completo.")
+    invalidar_sessao(data_path)
+    return False
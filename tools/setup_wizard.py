@@ -2,6 +2,10 @@ import json
 import os
 import sys
 import re
+try:
+    from .aulas_jsonl import existe_historico, carregar_aulas # Importado como pacote (ex: interfaces/gui_app.py)
+except ImportError:
+    from aulas_jsonl import existe_historico, carregar_aulas
 
 def get_root():
     if getattr(sys, 'frozen', False):
@@ -131,7 +135,7 @@ def _gerar_conteudo_json(data_dir, sobrescrever_sensiveis=False):
         print(f"  [OK] Arquivo salvo: .env")
 
     # 9. aulas_coletadas.json (vazio por padrão)
-    if not os.path.exists(os.path.join(data_dir, 'aulas_coletadas.json')):
+    if not existe_historico(data_dir):
         save_json(os.path.join(data_dir, 'aulas_coletadas.json'), [])
 
     # 10. recursos_links.json (com exemplo)
@@ -164,10 +168,9 @@ def obter_dados_disciplinas_calendario():
     """
     root = get_root()
     data_dir = os.path.join(root, 'data')
-    aulas_json_path = os.path.join(data_dir, 'aulas_coletadas.json')
     calendario_path = os.path.join(data_dir, 'calendario_letivo.json')
 
-    if not os.path.exists(aulas_json_path):
+    if not existe_historico(data_dir):
         print("❌ Erro: 'data/aulas_coletadas.json' não encontrado.")
         print("   Execute o 'scraper.py' (Opção 1 do menu principal) para baixar seu histórico primeiro.")
         return None, None, None
@@ -177,8 +180,7 @@ def obter_dados_disciplinas_calendario():
         return None, None, None
 
     try:
-        with open(aulas_json_path, 'r', encoding='utf-8-sig') as f:
-            aulas = json.load(f)
+        aulas = carregar_aulas(data_dir)
         with open(calendario_path, 'r', encoding='utf-8-sig') as f:
             calendario = json.load(f)
     except Exception as e:
@@ -257,17 +259,15 @@ def gerar_configuracao_via_historico(sobrescrever=None, callback_conflito=None):
     """
     root = get_root()
     data_dir = os.path.join(root, 'data')
-    aulas_json_path = os.path.join(data_dir, 'aulas_coletadas.json')
 
-    if not os.path.exists(aulas_json_path):
+    if not existe_historico(data_dir):
         print("❌ Erro: 'data/aulas_coletadas.json' não encontrado.")
         print("   Execute o 'scraper.py' (Opção 1 do menu principal) para baixar seu histórico primeiro.")
         return
 
     print("\n--- Analisando Histórico (aulas_coletadas.json) ---")
     try:
-        with open(aulas_json_path, 'r', encoding='utf-8') as f:
-            aulas = json.load(f)
+        aulas = carregar_aulas(data_dir)
     except Exception as e:
         print(f"❌ Erro ao ler JSON: {e}")
         return
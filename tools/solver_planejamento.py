@@ -0,0 +1,146 @@
+"""
+Modo solver do Preparador: distribui os slots livres entre todas as disciplinas de uma vez.
+
+O planejamento guloso preenche os primeiros slots livres de cada disciplina na ordem de
+`turmas_com_disciplinas.json`, e uma disciplina anterior pode ocupar os horários de que
+uma posterior (com janela de `restricoes_planejamento`) precisava. Aqui a alocação é um
+problema de fluxo máximo em grafo bipartido:
+
+    origem -> disciplina (capacidade = aulas que faltam) -> slot livre (1) -> destino (1)
+
+Cada slot (data, horário, turma) é usado no máximo uma vez, o que impede aulas duplicadas
+na mesma turma. O fluxo é resolvido com o algoritmo de Dinic; os slots de cada disciplina
+são explorados em ordem cronológica, o que favorece as datas mais cedo.
+
+Se o fluxo máximo não cobrir toda a demanda, o planejamento é inviável. O corte mínimo
+identifica o grupo de disciplinas que disputam os mesmos slots e quantos faltam.
+"""
+from collections import deque
+
+
+class _Grafo:
+    """Rede de fluxo com listas de adjacência (arestas e reversas em pares)."""
+
+    def __init__(self, total_nos):
+        self.adjacencia = [[] for _ in range(total_nos)]
+        self.destino = []
+        self.capacidade = []
+
+    def aresta(self, origem, destino, capacidade):
+        self.adjacencia[origem].append(len(self.destino))
+        self.destino.append(destino)
+        self.capacidade.append(capacidade)
+        self.adjacencia[destino].append(len(self.destino))
+        self.destino.append(origem)
+        self.capacidade.append(0)
+
+    def _niveis(self, fonte, sumidouro):
+        nivel = [-1] * len(self.adjacencia)
+        nivel[fonte] = 0
+        fila = deque([fonte])
+        while fila:
+            no = fila.popleft()
+            for indice in self.adjacencia[no]:
+                vizinho = self.destino[indice]
+                if self.capacidade[indice] > 0 and nivel[vizinho] < 0:
+                    nivel[vizinho] = nivel[no] + 1
+                    fila.append(vizinho)
+        return nivel if nivel[sumidouro] >= 0 else None
+
+    def _aumentar(self, no, sumidouro, limite, nivel, proxima):
+        if no == sumidouro:
+            return limite
+        arestas = self.adjacencia[no]
+        while proxima[no] < len(arestas):
+            indice = arestas[proxima[no]]
+            vizinho = self.destino[indice]
+            if self.capacidade[indice] > 0 and nivel[vizinho] == nivel[no] + 1:
+                enviado = self._aumentar(vizinho, sumidouro, min(limite, self.capacidade[indice]), nivel, proxima)
+                if enviado:
+                    self.capacidade[indice] -= enviado
+                    self.capacidade[indice ^ 1] += enviado
+                    return enviado
+            proxima[no] += 1
+        return 0
+
+    def fluxo_maximo(self, fonte, sumidouro):
+        total = 0
+        while True:
+            nivel = self._niveis(fonte, sumidouro)
+            if nivel is None:
+                return total
+            proxima = [0] * len(self.adjacencia)
+            while True:
+                enviado = self._aumentar(fonte, sumidouro, float('inf'), nivel, proxima)
+                if not enviado:
+                    break
+                total += enviado
+
+    def alcancaveis(self, fonte):
+        """Nós alcançáveis da fonte no grafo residual (lado da fonte do corte mínimo)."""
+        visitados = {fonte}
+        fila = deque([fonte])
+        while fila:
+            no = fila.popleft()
+            for indice in self.adjacencia[no]:
+                vizinho = self.destino[indice]
+                if self.capacidade[indice] > 0 and vizinho not in visitados:
+                    visitados.add(vizinho)
+                    fila.append(vizinho)
+        return visitados
+
+
+def resolver_alocacao(demandas):
+    """
+    Aloca slots para todas as demandas ao mesmo tempo.
+
+    'demandas' é uma lista de dicts com 'necessarias' (aulas que faltam) e 'candidatos'
+    (slots livres (data, horário, turma) em ordem cronológica). Retorna (alocacao, gargalo):
+    - alocacao: lista paralela a 'demandas' com os slots atribuídos a cada uma, em ordem cronológica;
+    - gargalo: None se toda a demanda foi atendida; senão um dict com os índices das demandas
+      que disputam os mesmos slots ('demandas'), a soma do que elas precisam ('necessarias')
+      e quantos slots distintos elas têm à disposição ('disponiveis').
+    """
+    indice_slot = {}
+    for demanda in demandas:
+        for slot in demanda['candidatos']:
+            indice_slot.setdefault(slot, len(indice_slot))
+
+    fonte, sumidouro = 0, 1
+    primeiro_demanda = 2
+    primeiro_slot = primeiro_demanda + len(demandas)
+    grafo = _Grafo(primeiro_slot + len(indice_slot))
+
+    for i, demanda in enumerate(demandas):
+        grafo.aresta(fonte, primeiro_demanda + i, demanda['necessarias'])
+    arestas_demanda = []
+    for i, demanda in enumerate(demandas):
+        arestas = []
+        for slot in demanda['candidatos']:
+            arestas.append((len(grafo.destino), slot))
+            grafo.aresta(primeiro_demanda + i, primeiro_slot + indice_slot[slot], 1)
+        arestas_demanda.append(arestas)
+    for posicao in indice_slot.values():
+        grafo.aresta(primeiro_slot + posicao, sumidouro, 1)
+
+    total = grafo.fluxo_maximo(fonte, sumidouro)
+
+    # Uma aresta disciplina -> slot com capacidade zerada é um slot atribuído
+    alocacao = [
+        sorted(slot for indice, slot in arestas if grafo.capacidade[indice] == 0)
+        for arestas in arestas_demanda
+    ]
+
+    demanda_total = sum(demanda['necessarias'] for demanda in demandas)
+    if total >= demanda_total:
+        return alocacao, None
+
+    alcancados = grafo.alcancaveis(fonte)
+    grupo = [i for i in range(len(demandas)) if primeiro_demanda + i in alcancados]
+    slots_grupo = {slot for i in grupo for slot in demandas[i]['candidatos']}
+    gargalo = {
+        'demandas': grupo,
+        'necessarias': sum(demandas[i]['necessarias'] for i in grupo),
+        'disponiveis': len(slots_grupo),
+    }
+    return alocacao, gargalo
@@ -1,18 +1,19 @@
 import json
 import os
-from collections import defaultdict
-from datetime import datetime
+from aulas_jsonl import existe_historico
+from banco_aulas import BancoAulas
 
 def carregar_dados(data_path):
     """Carrega os arquivos JSON necessários."""
     try:
-        with open(os.path.join(data_path, 'aulas_coletadas.json'), 'r', encoding='utf-8') as f:
-            aulas_coletadas = json.load(f)
+        if not existe_historico(data_path):
+            raise FileNotFoundError(2, 'Histórico de aulas não encontrado', os.path.join(data_path, 'aulas_coletadas.json'))
+        banco = BancoAulas.abrir(data_path)
         with open(os.path.join(data_path, 'turmas_com_disciplinas.json'), 'r', encoding='utf-8') as f:
             turmas_disciplinas = json.load(f)
         with open(os.path.join(data_path, 'mapa_turmas.json'), 'r', encoding='utf-8') as f:
             mapa_turmas = json.load(f)
-        return aulas_coletadas, turmas_disciplinas, mapa_turmas
+        return banco, turmas_disciplinas, mapa_turmas
     except FileNotFoundError as e:
         print(f"ERRO: Arquivo de dados não encontrado: {e.filename}")
         print("Por favor, execute o 'scraper.py' primeiro para gerar o 'aulas_coletadas.json'.")
@@ -21,9 +22,9 @@ def carregar_dados(data_path):
         print(f"ERRO ao carregar arquivos de dados: {e}")
         return None, None, None
 
-def ver_por_disciplina(aulas_coletadas, turmas_disciplinas):
+def ver_por_disciplina(banco, turmas_disciplinas):
     """Conta as aulas por disciplina e exibe um resumo."""
-    if not aulas_coletadas:
+    if not banco.total():
         print("Nenhuma aula coletada para analisar.")
         return
 
@@ -40,17 +41,14 @@ def ver_por_disciplina(aulas_coletadas, turmas_disciplinas):
                 }
 
     # 2. Contar aulas por nome completo da disciplina
-    contagem_disciplinas = defaultdict(int)
-    for aula in aulas_coletadas:
-        # Considera apenas aulas com status que indicam que a aula foi dada
-        if aula.get('status') in ['Aula confirmada', 'Aguardando confirmação']:
-            nome_disciplina = aula.get('componenteCurricular')
-            if nome_disciplina:
-                contagem_disciplinas[nome_disciplina] += 1
+    # Considera apenas aulas com status que indicam que a aula foi dada
+    contagem_disciplinas = banco.contagem_por_componente()
 
     # 3. Preparar dados para exibição
     dados_tabela = []
     for nome_completo, contagem in contagem_disciplinas.items():
+        if not nome_completo:
+            continue
         info_disciplina = mapa_disciplinas.get(nome_completo, {"codigo": "N/A", "nome": nome_completo})
         dados_tabela.append((info_disciplina['codigo'], info_disciplina['nome'], contagem))
 
@@ -72,21 +70,18 @@ def ver_por_disciplina(aulas_coletadas, turmas_disciplinas):
     print("-" * len(header))
     print(f"Total de disciplinas encontradas: {len(dados_tabela)}")
 
-def ver_por_turma(aulas_coletadas, mapa_turmas):
+def ver_por_turma(banco, mapa_turmas):
     """Conta as aulas por turma e exibe um resumo."""
-    if not aulas_coletadas:
+    if not banco.total():
         print("Nenhuma aula coletada para analisar.")
         return
 
-    contagem_turmas = defaultdict(int)
-    for aula in aulas_coletadas:
-        if aula.get('status') in ['Aula confirmada', 'Aguardando confirmação']:
-            nome_turma = aula.get('turma')
-            if nome_turma:
-                contagem_turmas[nome_turma] += 1
+    contagem_turmas = banco.contagem_por_turma()
 
     dados_tabela = []
     for nome_completo, contagem in contagem_turmas.items():
+        if not nome_completo:
+            continue
         nome_curto = mapa_turmas.get(nome_completo, "N/A")
         dados_tabela.append((nome_curto, nome_completo, contagem))
 
@@ -105,28 +100,14 @@ def ver_por_turma(aulas_coletadas, mapa_turmas):
     print("-" * len(header))
     print(f"Total de turmas encontradas: {len(dados_tabela)}")
 
-def ver_por_data(aulas_coletadas):
+def ver_por_data(banco):
     """Conta as aulas por data e exibe um resumo."""
-    if not aulas_coletadas:
+    if not banco.total():
         print("Nenhuma aula coletada para analisar.")
         return
 
-    contagem_data = defaultdict(int)
-    for aula in aulas_coletadas:
-        if aula.get('status') in ['Aula confirmada', 'Aguardando confirmação']:
-            data_aula = aula.get('dataAula')
-            if data_aula:
-                contagem_data[data_aula] += 1
-
-    dados_tabela = []
-    for data_str, contagem in contagem_data.items():
-        try:
-            data_obj = datetime.strptime(data_str, "%d/%m/%Y")
-            dados_tabela.append((data_obj, contagem))
-        except ValueError:
-            continue # Ignora datas mal formatadas
-
-    dados_tabela.sort()
+    # Já vem em ordem cronológica; datas mal formatadas são ignoradas pela consulta
+    dados_tabela = banco.contagem_por_data()
 
     print("\n--- Resumo de Aulas Registradas por Data ---")
     header = f"{'Data':<15} | {'Aulas Registradas'}"
@@ -143,9 +124,9 @@ if __name__ == "__main__":
     PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     DATA_PATH = os.path.join(PROJECT_ROOT, 'data')
 
-    aulas, disciplinas_map, turmas_map = carregar_dados(DATA_PATH)
+    banco, disciplinas_map, turmas_map = carregar_dados(DATA_PATH)
 
-    if aulas:
+    if banco and banco.total():
         while True:
             print("\n--- Menu de Visualização ---")
             print("1. Ver por Disciplina")
@@ -156,13 +137,16 @@ if __name__ == "__main__":
             escolha = input("Escolha uma opção: ")
 
             if escolha == '1':
-                ver_por_disciplina(aulas, disciplinas_map)
+                ver_por_disciplina(banco, disciplinas_map)
             elif escolha == '2':
-                ver_por_turma(aulas, turmas_map)
+                ver_por_turma(banco, turmas_map)
             elif escolha == '3':
-                ver_por_data(aulas)
+                ver_por_data(banco)
             elif escolha == '0':
                 print("Saindo...")
                 break
             else:
-                print("Opção inválida. Tente novamente.")
\ No newline at end of file
+                print("Opção inválida. Tente novamente.")
+
+    if banco:
+        banco.fechar()